@@ -0,0 +1,91 @@
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.service import VectorDBService
+from src.data.vectors.store import build_chunk_records
+
+TERMS = [
+    "chest pain",
+    "shortness of breath",
+    "hypertension",
+    "type 2 diabetes",
+    "metformin",
+    "atrial fibrillation",
+    "warfarin",
+    "pneumonia",
+    "chest x-ray",
+    "troponin",
+    "discharge",
+    "follow-up",
+    "MRI",
+    "fracture",
+    "physical therapy",
+    "insulin",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Throughput of batched vs. sequential semantic search")
+    parser.add_argument("--backend", default="local", choices=["local", "milvus"])
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 8, 32, 128])
+    parser.add_argument("--top-k", type=int, default=5)
+    return parser.parse_args()
+
+
+def make_texts(rng: np.random.Generator, count: int, length: int):
+    return [" ".join(rng.choice(TERMS, size=length)) for _ in range(count)]
+
+
+def benchmark_batch_search():
+    args = parse_args()
+    rng = np.random.default_rng(0)
+
+    workdir = tempfile.mkdtemp()
+    config = VectorDBConfig(
+        backend=args.backend,
+        db_path=workdir,
+        collection_name="benchmark_batch_search",
+    )
+    service = VectorDBService(config)
+    try:
+        records = build_chunk_records("benchmark", make_texts(rng, args.size, 24), {})
+        for offset in range(0, len(records), 5_000):
+            service.insert(records[offset : offset + 5_000], flush=False)
+        service.flush()
+        service.warm_up()
+
+        for batch_size in args.batch_sizes:
+            queries = make_texts(rng, batch_size, 6)
+
+            start = time.perf_counter()
+            for query in queries:
+                service.search(query, args.top_k)
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            service.search_many(queries, args.top_k)
+            batched = time.perf_counter() - start
+
+            print(
+                f"{args.backend:>6} batch={batch_size:>4}  "
+                f"sequential {batch_size / sequential:>8.1f} q/s  "
+                f"batched {batch_size / batched:>8.1f} q/s  "
+                f"speedup {sequential / batched:>5.1f}x"
+            )
+    finally:
+        if args.backend == "milvus":
+            from pymilvus import utility
+
+            utility.drop_collection(config.collection_name)
+        service.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    benchmark_batch_search()
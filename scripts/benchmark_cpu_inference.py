@@ -0,0 +1,97 @@
+import argparse
+import multiprocessing
+import resource
+import time
+
+import torch
+
+from src.models.inference.base_model import BaseModel
+from src.models.model_config import InferenceConfig, ModelConfig
+
+SENTENCES = [
+    "Patient presents with chest pain radiating to the left arm.",
+    "History of hypertension and type 2 diabetes mellitus.",
+    "Discharge instructions were reviewed with the patient and family.",
+    "No known drug allergies. Vital signs stable on admission.",
+    "Follow up with cardiology in two weeks for stress testing.",
+]
+MODES = {
+    "fp32": (torch.float32, 0),
+    "bf16": (torch.bfloat16, 0),
+    "int8": (torch.float32, 8),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Tokens/sec and memory of CPU inference modes")
+    parser.add_argument("--model", default="HuggingFaceTB/SmolLM2-135M")
+    parser.add_argument("--revision", default="main")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--prompt-tokens", type=int, default=256)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--compile", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(args: argparse.Namespace, mode: str, results):
+    torch_dtype, quantization_bits = MODES[mode]
+    start = time.perf_counter()
+    model = BaseModel(
+        ModelConfig(
+            model_name=args.model,
+            revision=args.revision,
+            quantization_bits=quantization_bits,
+            torch_dtype=torch_dtype,
+            device="cpu",
+            cpu_threads=args.threads,
+            compile=args.compile,
+        ),
+        InferenceConfig(do_sample=False, repetition_penalty=1.0),
+    )
+    load_time = time.perf_counter() - start
+
+    text = " ".join(SENTENCES[i % len(SENTENCES)] for i in range(args.prompt_tokens))
+    input_ids = model.tokenizer(text, add_special_tokens=False)["input_ids"][: args.prompt_tokens]
+    prompt = model.tokenizer.decode(input_ids)
+
+    def generate():
+        # Pinning the length keeps every mode decoding the same number of tokens
+        model.generate(prompt, max_new_tokens=args.max_new_tokens, min_new_tokens=args.max_new_tokens)
+
+    generate()
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        generate()
+        timings.append(time.perf_counter() - start)
+
+    results.put((mode, load_time, args.max_new_tokens / min(timings), peak_rss_mb()))
+
+
+def benchmark_cpu_inference():
+    args = parse_args()
+    # One process per mode so peak RSS reflects only that mode's model
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+
+    print(f"Model {args.model}, {args.prompt_tokens} prompt tokens, {args.max_new_tokens} new tokens")
+    for mode in args.modes:
+        process = context.Process(target=run_mode, args=(args, mode, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print(f"{mode:>5}  failed with exit code {process.exitcode}")
+            continue
+        mode, load_time, tokens_per_second, rss = results.get()
+        print(f"{mode:>5}  load {load_time:>6.1f} s  {tokens_per_second:>8.1f} tokens/s  peak RSS {rss:>8.0f} MB")
+
+
+if __name__ == "__main__":
+    benchmark_cpu_inference()
@@ -0,0 +1,93 @@
+import argparse
+import time
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.milvus_store import MilvusVectorStore
+from src.data.vectors.store import ChunkRecord
+
+DIMENSION = 384
+DEPARTMENTS = [f"department_{i}" for i in range(32)]
+DOCUMENT_TYPES = ["progress_note", "discharge_summary", "lab_report", "radiology_report", "prescription"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Filtered search latency: JSON metadata vs. typed scalar columns")
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    return parser.parse_args()
+
+
+def make_corpus(size: int):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(size, DIMENSION)).astype(np.float32)
+    start = datetime(2020, 1, 1, tzinfo=UTC)
+    metadata = [
+        {
+            "department": DEPARTMENTS[rng.integers(len(DEPARTMENTS))],
+            "document_type": DOCUMENT_TYPES[rng.integers(len(DOCUMENT_TYPES))],
+            "patient_id": f"P{rng.integers(size // 10):07d}",
+            "creation_date": (start + timedelta(days=int(rng.integers(1800)))).isoformat(),
+        }
+        for _ in range(size)
+    ]
+    return vectors, metadata
+
+
+FILTERS = {
+    "department eq": {"department": "department_3"},
+    "type in": {"document_type": {"in": ["lab_report", "prescription"]}},
+    "patient eq": {"patient_id": "P0000042"},
+    "dept + date range": {
+        "department": "department_7",
+        "creation_date": {"gte": "2023-01-01T00:00:00+00:00", "lt": "2023-07-01T00:00:00+00:00"},
+    },
+}
+
+
+def benchmark_filters():
+    args = parse_args()
+    vectors, metadata = make_corpus(args.size)
+    queries = np.random.default_rng(1).normal(size=(args.queries, DIMENSION)).astype(np.float32)
+
+    for promoted in (False, True):
+        label = "scalar columns" if promoted else "JSON metadata"
+        config = VectorDBConfig(
+            collection_name=f"benchmark_filters_{'promoted' if promoted else 'json'}",
+            promote_metadata_fields=promoted,
+        )
+        store = MilvusVectorStore(config, DIMENSION)
+        try:
+            for offset in range(0, args.size, 10_000):
+                store.add(
+                    [
+                        ChunkRecord(str(row), str(row), 0, "", "", metadata[row], embedding.tolist())
+                        for row, embedding in enumerate(vectors[offset : offset + 10_000], offset)
+                    ]
+                )
+            store.flush()
+            store.load()
+
+            for name, filters in FILTERS.items():
+                if not promoted and "creation_date" in filters:
+                    print(f"{label:>15} {name:>18}  n/a (needs the creation_date column)")
+                    continue
+                latencies = []
+                for query in queries:
+                    start = time.perf_counter()
+                    store.search(query.tolist(), args.top_k, filters)
+                    latencies.append(time.perf_counter() - start)
+                p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+                print(f"{label:>15} {name:>18}  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+        finally:
+            from pymilvus import utility
+
+            utility.drop_collection(config.collection_name)
+            store.close()
+
+
+if __name__ == "__main__":
+    benchmark_filters()
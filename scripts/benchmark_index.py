@@ -0,0 +1,99 @@
+import argparse
+import time
+
+import numpy as np
+
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.indexing import IndexSpec
+from src.data.vectors.milvus_store import MilvusVectorStore
+from src.data.vectors.store import ChunkRecord
+
+DIMENSION = 384
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recall vs. latency of Milvus index configurations")
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=256)
+    return parser.parse_args()
+
+
+def make_corpus(size: int, queries: int, clusters: int):
+    # Clustered data is closer to real embeddings than uniform noise and
+    # makes IVF probing behave realistically.
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(clusters, DIMENSION)).astype(np.float32)
+    corpus = centers[rng.integers(clusters, size=size)] + 0.3 * rng.normal(size=(size, DIMENSION))
+    query_vectors = centers[rng.integers(clusters, size=queries)] + 0.3 * rng.normal(size=(queries, DIMENSION))
+    return corpus.astype(np.float32), query_vectors.astype(np.float32)
+
+
+def exact_neighbours(corpus: np.ndarray, queries: np.ndarray, top_k: int) -> np.ndarray:
+    norms = np.einsum("ij,ij->i", corpus, corpus)
+    distances = norms[None, :] - 2 * queries @ corpus.T
+    top = np.argpartition(distances, top_k, axis=1)[:, :top_k]
+    return np.take_along_axis(top, np.argsort(np.take_along_axis(distances, top, axis=1), axis=1), axis=1)
+
+
+def configurations(size: int):
+    nlist = min(max(int(4 * np.sqrt(size)), 16), 65_536)
+    yield IndexSpec("FLAT"), [{}]
+    for index_type in ("IVF_FLAT", "IVF_SQ8"):
+        yield (
+            IndexSpec(index_type, {"nlist": nlist}, {"nprobe": 8}),
+            [{"nprobe": nprobe} for nprobe in (1, 8, 32, 128) if nprobe <= nlist],
+        )
+    yield IndexSpec("HNSW", {"M": 16, "efConstruction": 200}, {"ef": 64}), [{"ef": ef} for ef in (16, 64, 256)]
+
+
+def benchmark_index():
+    args = parse_args()
+    corpus, queries = make_corpus(args.size, args.queries, args.clusters)
+    truth = exact_neighbours(corpus, queries, args.top_k)
+
+    config = VectorDBConfig(collection_name="benchmark_index", index_type="FLAT")
+    store = MilvusVectorStore(config, DIMENSION)
+    try:
+        for offset in range(0, args.size, 10_000):
+            batch = corpus[offset : offset + 10_000]
+            store.add(
+                [
+                    ChunkRecord(str(row), str(row), 0, "", "", {}, embedding.tolist())
+                    for row, embedding in enumerate(batch, offset)
+                ]
+            )
+        store.collection.flush()
+
+        print(
+            f"{'index':>9} {'params':>14} {'recall@' + str(args.top_k):>10} {'p50 ms':>8} {'p95 ms':>8} {'build s':>8}"
+        )
+        for spec, effort_levels in configurations(args.size):
+            start = time.perf_counter()
+            store.rebuild_index(spec)
+            build_time = time.perf_counter() - start
+
+            for effort in effort_levels:
+                latencies = []
+                hits = 0
+                for query, expected in zip(queries, truth):
+                    start = time.perf_counter()
+                    results = store.search(query.tolist(), args.top_k, search_params=effort)
+                    latencies.append(time.perf_counter() - start)
+                    found = {int(result["id"]) for result in results}
+                    hits += len(found & set(expected.tolist()))
+
+                recall = hits / (len(queries) * args.top_k)
+                p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+                label = ",".join(f"{key}={value}" for key, value in effort.items()) or "-"
+                print(f"{spec.index_type:>9} {label:>14} {recall:>10.3f} {p50:>8.2f} {p95:>8.2f} {build_time:>8.1f}")
+    finally:
+        from pymilvus import utility
+
+        utility.drop_collection(config.collection_name)
+        store.close()
+
+
+if __name__ == "__main__":
+    benchmark_index()
@@ -0,0 +1,93 @@
+import argparse
+import multiprocessing
+import resource
+import time
+
+import torch
+from transformers import AutoModelForCausalLM
+
+from src.models.model_config import TrainingConfig
+from src.models.training.lora import apply_lora
+
+MODES = ["full", "full+checkpointing", "lora", "lora+checkpointing"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Memory and throughput of full fine-tuning vs. LoRA")
+    parser.add_argument("--model", default="HuggingFaceTB/SmolLM2-135M")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--seq-len", type=int, default=512)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--lora-r", type=int, default=8)
+    return parser.parse_args()
+
+
+def peak_memory_mb(device: str) -> float:
+    if device == "cuda":
+        return torch.cuda.max_memory_allocated() / 2**20
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(args: argparse.Namespace, mode: str, results):
+    torch.manual_seed(0)
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    config = TrainingConfig(lora_r=args.lora_r, gradient_checkpointing=mode.endswith("+checkpointing"))
+
+    model = AutoModelForCausalLM.from_pretrained(args.model, torch_dtype=torch.float32).to(device)
+    model.config.use_cache = False
+    if config.gradient_checkpointing:
+        model.gradient_checkpointing_enable(gradient_checkpointing_kwargs={"use_reentrant": False})
+    if mode.startswith("lora"):
+        model = apply_lora(model, config)
+    model.train()
+
+    params = [param for param in model.parameters() if param.requires_grad]
+    optimizer = torch.optim.AdamW(params, lr=config.learning_rate)
+    input_ids = torch.randint(0, model.config.vocab_size, (args.batch_size, args.seq_len), device=device)
+
+    def step():
+        loss = model(input_ids=input_ids, labels=input_ids).loss
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad(set_to_none=True)
+
+    # The first step allocates optimizer states
+    step()
+    if device == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        step()
+    if device == "cuda":
+        torch.cuda.synchronize()
+    elapsed = time.perf_counter() - start
+
+    tokens_per_second = args.steps * input_ids.numel() / elapsed
+    results.put((mode, sum(param.numel() for param in params), tokens_per_second, peak_memory_mb(device)))
+
+
+def benchmark_lora():
+    args = parse_args()
+    # One process per mode so peak memory reflects only that mode
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+
+    print(f"Model {args.model}, batch {args.batch_size} x {args.seq_len} tokens, {args.steps} steps")
+    for mode in args.modes:
+        process = context.Process(target=run_mode, args=(args, mode, results))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            print(f"{mode:>20}  failed with exit code {process.exitcode}")
+            continue
+        mode, trainable, tokens_per_second, peak = results.get()
+        print(
+            f"{mode:>20}  trainable {trainable / 1e6:>8.2f}M  "
+            f"{tokens_per_second:>8.1f} tokens/s  peak memory {peak:>8.0f} MB"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_lora()
@@ -0,0 +1,92 @@
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+import torch
+from prometheus_client import REGISTRY
+
+from src.models.inference.base_model import BaseModel
+from src.models.model_config import InferenceConfig, ModelConfig
+
+DTYPES = {"fp32": torch.float32, "bf16": torch.bfloat16}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cold start of BaseModel from the hub vs. a cached artifact")
+    parser.add_argument("--model", default="HuggingFaceTB/SmolLM2-135M")
+    parser.add_argument("--revision", default="main")
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--dtype", default="fp32", choices=list(DTYPES))
+    parser.add_argument("--quantization-bits", type=int, default=0)
+    parser.add_argument("--artifact-dir", type=Path, default=None, help="Defaults to a temporary directory")
+    return parser.parse_args()
+
+
+def mapped_weights_mb() -> float:
+    # Weights still backed by the safetensors files rather than copied into
+    # private memory; other processes mapping the same artifact share them
+    total_kb, in_weights = 0, False
+    with open("/proc/self/smaps") as smaps:
+        for line in smaps:
+            fields = line.split()
+            if "-" in fields[0] and not fields[0].endswith(":"):
+                in_weights = len(fields) > 5 and fields[5].endswith(".safetensors")
+            elif in_weights and fields[0] == "Size:":
+                total_kb += int(fields[1])
+    return total_kb / 1024
+
+
+def load_phases() -> dict:
+    return {
+        sample.labels["phase"]: sample.value
+        for metric in REGISTRY.collect()
+        if metric.name == "model_load_phase_seconds"
+        for sample in metric.samples
+    }
+
+
+def run_load(args: argparse.Namespace, artifact_dir, results):
+    start = time.perf_counter()
+    model = BaseModel(
+        ModelConfig(
+            model_name=args.model,
+            revision=args.revision,
+            quantization_bits=args.quantization_bits,
+            torch_dtype=DTYPES[args.dtype],
+            device=args.device,
+            artifact_dir=artifact_dir,
+        ),
+        InferenceConfig(),
+    )
+    elapsed = time.perf_counter() - start
+    # Measured while the model is alive, since it holds the mappings
+    results.put((elapsed, load_phases(), mapped_weights_mb()))
+    del model
+
+
+def benchmark_model_load():
+    args = parse_args()
+    # A fresh process per load so nothing is reused from a previous one
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_dir = str(args.artifact_dir or tmp)
+        print(f"Model {args.model} on {args.device}, {args.dtype}, artifacts in {artifact_dir}")
+        runs = [("hub", None), ("hub+convert", artifact_dir), ("artifact", artifact_dir)]
+        for name, directory in runs:
+            process = context.Process(target=run_load, args=(args, directory, results))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                print(f"{name:>12}  failed with exit code {process.exitcode}")
+                continue
+            elapsed, phases, mapped = results.get()
+            breakdown = "  ".join(f"{phase} {seconds:.2f}s" for phase, seconds in sorted(phases.items()))
+            print(f"{name:>12}  {elapsed:>6.2f} s  mapped weights {mapped:>7.0f} MB  {breakdown}")
+
+
+if __name__ == "__main__":
+    benchmark_model_load()
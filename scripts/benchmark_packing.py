@@ -0,0 +1,132 @@
+import argparse
+import random
+import time
+
+import torch
+from datasets import Dataset
+from torch.utils.data import DataLoader
+from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers.trainer_pt_utils import LengthGroupedSampler
+
+from src.models.training.collators import DynamicPaddingCollator, PackedSequenceCollator, pack_sequences
+
+SENTENCES = [
+    "Patient presents with chest pain radiating to the left arm.",
+    "History of hypertension and type 2 diabetes mellitus.",
+    "Discharge instructions were reviewed with the patient and family.",
+    "No known drug allergies. Vital signs stable on admission.",
+    "Follow up with cardiology in two weeks for stress testing.",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Training throughput with max-length padding, dynamic padding and packing"
+    )
+    parser.add_argument("--model", default="HuggingFaceTB/SmolLM2-135M")
+    parser.add_argument("--documents", type=int, default=256)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=20)
+    return parser.parse_args()
+
+
+def make_notes(count: int, max_sentences: int):
+    # Clinical notes are mostly short with a long tail
+    rng = random.Random(0)
+    lengths = [min(max(int(rng.lognormvariate(2.0, 0.9)), 1), max_sentences) for _ in range(count)]
+    return [" ".join(rng.choice(SENTENCES) for _ in range(length)) for length in lengths]
+
+
+def counting(collate):
+    # Records how many real (non-padding) tokens each batch carries
+    def collate_and_count(features):
+        batch = collate(features)
+        batch["num_tokens"] = sum(len(feature["input_ids"]) for feature in features)
+        return batch
+
+    return collate_and_count
+
+
+def padded_loader(tokenizer, texts, args) -> DataLoader:
+    # Previous behaviour: every row padded to max_length
+    def collate(features):
+        encoded = tokenizer.pad(features, padding="max_length", max_length=args.max_length, return_tensors="pt")
+        encoded["labels"] = encoded["input_ids"].masked_fill(encoded["attention_mask"] == 0, -100)
+        return encoded
+
+    dataset = Dataset.from_dict(
+        {"input_ids": tokenizer(texts, truncation=True, max_length=args.max_length)["input_ids"]}
+    )
+    return DataLoader(dataset, batch_size=args.batch_size, shuffle=True, collate_fn=counting(collate))
+
+
+def dynamic_loader(tokenizer, texts, args) -> DataLoader:
+    dataset = Dataset.from_dict(
+        {"input_ids": tokenizer(texts, truncation=True, max_length=args.max_length)["input_ids"]}
+    )
+    sampler = LengthGroupedSampler(args.batch_size, lengths=[len(ids) for ids in dataset["input_ids"]])
+    return DataLoader(
+        dataset,
+        batch_size=args.batch_size,
+        sampler=sampler,
+        collate_fn=counting(DynamicPaddingCollator(tokenizer.pad_token_id)),
+    )
+
+
+def packed_loader(tokenizer, texts, args) -> DataLoader:
+    dataset = Dataset.from_dict({"input_ids": tokenizer(texts)["input_ids"]})
+    dataset = dataset.map(
+        pack_sequences,
+        batched=True,
+        remove_columns=["input_ids"],
+        fn_kwargs={"block_size": args.max_length, "eos_token_id": tokenizer.eos_token_id},
+    )
+    return DataLoader(
+        dataset,
+        batch_size=args.batch_size,
+        shuffle=True,
+        collate_fn=counting(PackedSequenceCollator(tokenizer.pad_token_id)),
+    )
+
+
+def run(model, loader: DataLoader, steps: int):
+    optimizer = torch.optim.SGD(model.parameters(), lr=1e-5)
+    real_tokens, total_tokens, step = 0, 0, 0
+    start = time.perf_counter()
+    while step < steps:
+        for batch in loader:
+            num_tokens = batch.pop("num_tokens")
+            batch = {key: value.to(model.device) for key, value in batch.items()}
+            loss = model(**batch).loss
+            loss.backward()
+            optimizer.step()
+            optimizer.zero_grad()
+
+            real_tokens += num_tokens
+            total_tokens += batch["input_ids"].numel()
+            step += 1
+            if step == steps:
+                break
+    elapsed = time.perf_counter() - start
+    return real_tokens / elapsed, 1 - real_tokens / total_tokens
+
+
+def benchmark_packing():
+    args = parse_args()
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    model = AutoModelForCausalLM.from_pretrained(args.model, torch_dtype=torch.float32)
+    model.config.use_cache = False
+    model.train()
+
+    texts = make_notes(args.documents, max_sentences=args.max_length // 8)
+    print(f"{len(texts)} notes, max_length {args.max_length}, batch size {args.batch_size}, {args.steps} steps")
+    for name, build in (("max-length", padded_loader), ("dynamic", dynamic_loader), ("packed", packed_loader)):
+        tokens_per_second, padding_ratio = run(model, build(tokenizer, texts, args), args.steps)
+        print(f"{name:>10}  {tokens_per_second:>9.1f} effective tokens/s  padding {padding_ratio:>6.1%}")
+
+
+if __name__ == "__main__":
+    benchmark_packing()
@@ -0,0 +1,67 @@
+import argparse
+import time
+
+import numpy as np
+
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.milvus_store import MilvusVectorStore
+from src.data.vectors.store import ChunkRecord
+
+DIMENSION = 384
+DEPARTMENTS = [f"department_{i}" for i in range(16)]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Department-scoped search latency with and without partitions")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[50_000, 200_000, 500_000])
+    parser.add_argument("--shard-size", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    return parser.parse_args()
+
+
+def benchmark_partitions():
+    args = parse_args()
+    rng = np.random.default_rng(0)
+    queries = rng.normal(size=(args.queries, DIMENSION)).astype(np.float32)
+
+    for size in args.sizes:
+        vectors = rng.normal(size=(size, DIMENSION)).astype(np.float32)
+        metadata = [{"department": DEPARTMENTS[i % len(DEPARTMENTS)]} for i in range(size)]
+
+        for partition_by in (None, "department"):
+            config = VectorDBConfig(
+                collection_name=f"benchmark_partitions_{'department' if partition_by else 'none'}",
+                partition_by=partition_by,
+                max_elements_per_shard=args.shard_size,
+            )
+            store = MilvusVectorStore(config, DIMENSION)
+            try:
+                for offset in range(0, size, 10_000):
+                    store.add(
+                        [
+                            ChunkRecord(str(row), str(row), 0, "", "", metadata[row], embedding.tolist())
+                            for row, embedding in enumerate(vectors[offset : offset + 10_000], offset)
+                        ]
+                    )
+                store.flush()
+                store.load()
+
+                latencies = []
+                for i, query in enumerate(queries):
+                    filters = {"department": DEPARTMENTS[i % len(DEPARTMENTS)]}
+                    start = time.perf_counter()
+                    store.search(query.tolist(), args.top_k, filters)
+                    latencies.append(time.perf_counter() - start)
+                p50, p95 = np.percentile(latencies, [50, 95]) * 1000
+                label = f"partitioned by {partition_by}" if partition_by else "single partition"
+                print(f"n={size:>8}  {label:>26}  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+            finally:
+                from pymilvus import utility
+
+                utility.drop_collection(config.collection_name)
+                store.close()
+
+
+if __name__ == "__main__":
+    benchmark_partitions()
@@ -0,0 +1,70 @@
+import random
+import re
+import time
+
+from src.data.processors.phi import DEFAULT_PHI_PATTERNS, PHIRedactor
+
+SENTENCES = [
+    "Patient presents with chest pain radiating to the left arm.",
+    "History of hypertension and type 2 diabetes mellitus.",
+    "Discharge instructions were reviewed with the patient and family.",
+    "No known drug allergies. Vital signs stable on admission.",
+    "Follow up with cardiology in two weeks for stress testing.",
+]
+PHI_SAMPLES = [
+    "SSN 123-45-6789",
+    "DOB 012/345/1980",
+    "MRN A12345678",
+    "phone 5551234567",
+]
+
+
+def make_note(size_bytes: int, phi_rate: float = 0.05) -> str:
+    rng = random.Random(42)
+    parts = []
+    size = 0
+    while size < size_bytes:
+        part = rng.choice(PHI_SAMPLES) if rng.random() < phi_rate else rng.choice(SENTENCES)
+        parts.append(part)
+        size += len(part) + 1
+    return " ".join(parts)
+
+
+def legacy_redact(text: str, patterns) -> tuple:
+    # Previous behaviour: one findall per pattern for validation, then one sub per pattern
+    phi_count = sum(len(re.findall(pattern, text)) for pattern in patterns)
+    for pattern in patterns:
+        text = re.sub(pattern, "[REDACTED]", text)
+    return text, phi_count
+
+
+def best_of(func, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_phi():
+    note = make_note(1_000_000)
+    patterns = list(DEFAULT_PHI_PATTERNS.values())
+    redactor = PHIRedactor()
+
+    legacy_text, legacy_count = legacy_redact(note, patterns)
+    redacted_text, counts = redactor.redact(note)
+    assert redacted_text == legacy_text, "Redacted output differs from the legacy implementation"
+    assert sum(counts.values()) == legacy_count, "PHI counts differ from the legacy implementation"
+
+    legacy_time = best_of(lambda: legacy_redact(note, patterns))
+    engine_time = best_of(lambda: redactor.redact(note))
+
+    print(f"Note size: {len(note) / 1e6:.2f} MB, PHI matches: {counts}")
+    print(f"Legacy (2 x {len(patterns)} scans): {legacy_time * 1000:.1f} ms")
+    print(f"Single-pass engine: {engine_time * 1000:.1f} ms")
+    print(f"Speedup: {legacy_time / engine_time:.2f}x")
+
+
+if __name__ == "__main__":
+    benchmark_phi()
@@ -0,0 +1,81 @@
+import argparse
+import time
+
+import torch
+from prometheus_client import REGISTRY
+
+from src.models.inference.base_model import BaseModel
+from src.models.model_config import InferenceConfig, ModelConfig
+
+PROMPTS = [
+    "Patient presents with chest pain radiating to the left arm. The differential diagnosis includes",
+    "Discharge summary: 67-year-old male admitted for community-acquired pneumonia. Hospital course:",
+    "Metformin is a first-line treatment for type 2 diabetes because",
+    "Follow up with cardiology in two weeks for stress testing. Instructions for the patient:",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Latency of speculative vs. regular greedy decoding")
+    parser.add_argument("--model", default="HuggingFaceTB/SmolLM2-360M")
+    parser.add_argument("--draft-model", default="HuggingFaceTB/SmolLM2-135M")
+    parser.add_argument("--revision", default="main")
+    parser.add_argument("--num-draft-tokens", type=int, default=5)
+    parser.add_argument("--max-new-tokens", type=int, default=128)
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+def draft_tokens(result: str) -> float:
+    return REGISTRY.get_sample_value("speculative_draft_tokens_total", {"result": result}) or 0.0
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_speculative():
+    args = parse_args()
+    model = BaseModel(
+        ModelConfig(
+            model_name=args.model,
+            revision=args.revision,
+            quantization_bits=0,
+            torch_dtype=torch.float32,
+            device="cpu",
+            draft_model_name=args.draft_model,
+            num_draft_tokens=args.num_draft_tokens,
+        ),
+        InferenceConfig(max_new_tokens=args.max_new_tokens, do_sample=False, repetition_penalty=1.0),
+    )
+
+    print(f"Target {args.model}, draft {args.draft_model}, {args.max_new_tokens} new tokens")
+    regular_total, speculative_total = 0.0, 0.0
+    for prompt in PROMPTS:
+        # assistant_model=None switches the draft off for the baseline
+        regular = model.generate(prompt, assistant_model=None)
+        accepted, rejected = draft_tokens("accepted"), draft_tokens("rejected")
+        speculative = model.generate(prompt)
+        accepted, rejected = draft_tokens("accepted") - accepted, draft_tokens("rejected") - rejected
+        assert speculative == regular, f"Speculative output differs from greedy decoding for {prompt!r}"
+
+        regular_time = best_of(lambda: model.generate(prompt, assistant_model=None), args.repeat)
+        speculative_time = best_of(lambda: model.generate(prompt), args.repeat)
+        regular_total += regular_time
+        speculative_total += speculative_time
+        print(
+            f"regular {regular_time * 1000:>8.1f} ms  speculative {speculative_time * 1000:>8.1f} ms  "
+            f"speedup {regular_time / speculative_time:>5.2f}x  "
+            f"acceptance {accepted / max(accepted + rejected, 1):>5.1%}"
+        )
+
+    print(f"Outputs identical for all {len(PROMPTS)} prompts; overall speedup {regular_total / speculative_total:.2f}x")
+
+
+if __name__ == "__main__":
+    benchmark_speculative()
@@ -0,0 +1,92 @@
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.store import ChunkRecord, create_vector_store
+
+DIMENSION = 384
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare vector store backends on a synthetic corpus")
+    parser.add_argument("--backends", nargs="+", default=["local", "milvus"], choices=["local", "milvus"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    return parser.parse_args()
+
+
+def benchmark_backend(backend: str, size: int, queries: int, top_k: int):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(size, DIMENSION)).astype(np.float32)
+    query_vectors = rng.normal(size=(queries, DIMENSION)).astype(np.float32)
+    departments = ["cardiology", "oncology", "pediatrics", "radiology"]
+
+    workdir = tempfile.mkdtemp()
+    config = VectorDBConfig(
+        backend=backend,
+        db_path=workdir,
+        collection_name=f"benchmark_vectors_{size}",
+    )
+    store = create_vector_store(config, DIMENSION)
+    try:
+        start = time.perf_counter()
+        for offset in range(0, size, 5_000):
+            batch = vectors[offset : offset + 5_000]
+            store.add(
+                [
+                    ChunkRecord(
+                        id=str(i),
+                        document_id=str(i),
+                        chunk_index=0,
+                        content=f"chunk {i}",
+                        content_hash="",
+                        metadata={"department": departments[i % len(departments)]},
+                        embedding=embedding.tolist(),
+                    )
+                    for i, embedding in enumerate(batch, offset)
+                ]
+            )
+        store.flush()
+        store.load()
+        insert_time = time.perf_counter() - start
+
+        results = {}
+        for label, filters in (("unfiltered", None), ("filtered", {"department": "oncology"})):
+            latencies = []
+            for query in query_vectors:
+                start = time.perf_counter()
+                store.search(query.tolist(), top_k, filters)
+                latencies.append(time.perf_counter() - start)
+            results[label] = np.percentile(latencies, [50, 95]) * 1000
+
+        print(
+            f"{backend:>6} n={size:>7}  insert {size / insert_time:>9.0f} vec/s  "
+            f"search p50/p95 {results['unfiltered'][0]:.2f}/{results['unfiltered'][1]:.2f} ms  "
+            f"filtered p50/p95 {results['filtered'][0]:.2f}/{results['filtered'][1]:.2f} ms"
+        )
+    finally:
+        if backend == "milvus":
+            from pymilvus import utility
+
+            utility.drop_collection(config.collection_name)
+        store.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def benchmark_vector_store():
+    args = parse_args()
+    for backend in args.backends:
+        for size in args.sizes:
+            try:
+                benchmark_backend(backend, size, args.queries, args.top_k)
+            except Exception as e:
+                print(f"{backend:>6} n={size:>7}  skipped: {e}")
+
+
+if __name__ == "__main__":
+    benchmark_vector_store()
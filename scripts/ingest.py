@@ -0,0 +1,53 @@
+import argparse
+from pathlib import Path
+
+from src.data.services.ingestion import BulkIngestionPipeline, iter_records
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.service import VectorDBService
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk ingest documents into Milvus")
+    parser.add_argument("source", type=Path, help="NDJSON file, Document JSON file or directory of them")
+    parser.add_argument("--workers", type=int, default=4, help="Processes used for PHI redaction and chunking")
+    parser.add_argument("--batch-size", type=int, default=4096, help="Chunks per Milvus insert")
+    parser.add_argument("--checkpoint", type=Path, default=None, help="Checkpoint file used to resume a run")
+    parser.add_argument("--document-type", default=None, help="Default document_type for records without one")
+    parser.add_argument("--author", default=None, help="Default author for records without one")
+    return parser.parse_args()
+
+
+def ingest():
+    args = parse_args()
+    if not args.source.exists():
+        raise FileNotFoundError(f"Source not found: {args.source}")
+
+    default_metadata = {
+        key: value
+        for key, value in (("document_type", args.document_type), ("author", args.author))
+        if value is not None
+    }
+
+    vector_db = VectorDBService(VectorDBConfig())
+    try:
+        pipeline = BulkIngestionPipeline(
+            vector_db,
+            workers=args.workers,
+            insert_batch_size=args.batch_size,
+            checkpoint_path=args.checkpoint,
+        )
+        stats = pipeline.run(
+            iter_records(args.source, default_metadata),
+            source=str(args.source.resolve()),
+        ).to_dict()
+    finally:
+        vector_db.close()
+
+    print(f"Documents ingested: {stats['documents']} (skipped {stats['skipped']})")
+    print(f"Chunks ingested: {stats['chunks']}")
+    print(f"Elapsed: {stats['elapsed_seconds']}s")
+    print(f"Throughput: {stats['docs_per_sec']} docs/sec, {stats['chunks_per_sec']} chunks/sec")
+
+
+if __name__ == "__main__":
+    ingest()
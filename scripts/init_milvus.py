@@ -13,6 +13,12 @@ def init_milvus():
     print(f"Embedding dimension: {config.embedding_dimension}")
     print(f"Document count: {vector_db.get_document_count()}")
 
+    # Index migration happens here, not on the write path, since rebuilding
+    # releases the collection and fails concurrent searches
+    if vector_db.ensure_index():
+        print("Rebuilt the embedding index for the current collection size")
+    print(f"Index: {vector_db.get_collection_stats().get('index_type')}")
+
     vector_db.close()
 
 
@@ -1,23 +1,55 @@
+import argparse
 from pathlib import Path
 
+from src.models.model_config import TrainingConfig
 from src.models.training.trainer import ModelTrainer
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Fine-tune the base model on Document JSON files")
+    parser.add_argument("--model", default="meta-llama/Llama-2-7b-hf")
+    parser.add_argument("--data-dir", type=Path, default=Path("scripts/data/documents"))
+    parser.add_argument(
+        "--cache-dir", type=Path, default=None, help="Tokenized shard cache (default: next to data-dir)"
+    )
+    parser.add_argument("--output-dir", default="output")
+    parser.add_argument("--workers", type=int, default=4, help="Processes used for tokenization")
+    parser.add_argument("--no-packing", action="store_true", help="Pad each batch instead of packing documents")
+    parser.add_argument("--lora", action="store_true", help="Train LoRA adapters with the TrainingConfig defaults")
+    parser.add_argument("--max-steps", type=int, default=None, help="Overrides TrainingConfig.max_steps with --lora")
+    return parser.parse_args()
+
+
 def train_model():
+    args = parse_args()
     print("Starting model training...")
 
+    training_config = None
+    if args.lora:
+        training_config = TrainingConfig()
+        if args.max_steps is not None:
+            training_config.max_steps = args.max_steps
+
     # Initialize trainer
-    trainer = ModelTrainer()
+    trainer = ModelTrainer(
+        model_name=args.model,
+        packing=not args.no_packing,
+        training_config=training_config,
+    )
 
     # Load training data
-    data_path = Path("scripts/data/documents")
-    if not data_path.exists():
+    if not args.data_dir.exists():
         raise FileNotFoundError(
-            f"Training data directory not found: {data_path}",
+            f"Training data directory not found: {args.data_dir}",
         )
 
-    # Train model
-    trainer.train(data_path)
+    # Train model; documents are streamed from disk, not loaded into memory
+    trainer.train(
+        args.data_dir,
+        output_dir=args.output_dir,
+        cache_dir=args.cache_dir,
+        workers=args.workers,
+    )
 
     print("Model training completed successfully!")
 
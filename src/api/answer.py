@@ -0,0 +1,82 @@
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import Field
+
+from src.api.dependencies import get_answer_service
+from src.api.routes import SearchOptions
+from src.data.services.answer_service import AnswerService, PreparedAnswer
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/api/v1", tags=["answer"])
+
+
+class AnswerRequest(SearchOptions):
+    question: str = Field(..., min_length=1, description="Question to answer from the indexed documents")
+    max_new_tokens: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Upper bound on generated tokens; defaults to the model's inference setting",
+    )
+    temperature: Optional[float] = Field(None, gt=0, description="Sampling temperature")
+    adapter: Optional[str] = Field(None, description="LoRA adapter to answer with; defaults to the base model")
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _stream_events(
+    answer_service: AnswerService,
+    prepared: PreparedAnswer,
+    handle: Any,
+) -> AsyncIterator[str]:
+    try:
+        async for event in answer_service.stream(prepared, handle):
+            yield _sse(event["event"], event["data"])
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.error("Answer streaming failed: %s", e)
+        yield _sse("error", {"detail": "Generation failed"})
+
+
+@router.post("/answer")
+@metrics.track_request("answer")
+async def answer(
+    request: AnswerRequest,
+    answer_service: AnswerService = Depends(get_answer_service),
+) -> StreamingResponse:
+    try:
+        prepared = await answer_service.prepare(
+            question=request.question,
+            n_results=request.n_results,
+            filters=request.filters,
+            search_params=request.search_params(),
+            max_new_tokens=request.max_new_tokens,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+    generate_kwargs = {"temperature": request.temperature} if request.temperature is not None else {}
+    if request.adapter is not None:
+        generate_kwargs["adapter"] = request.adapter
+    try:
+        handle = await answer_service.start(prepared, **generate_kwargs)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=exc.args[0]) from exc
+    except RuntimeError as exc:
+        # The scheduler's queue is full or it is shutting down
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+    return StreamingResponse(
+        _stream_events(answer_service, prepared, handle),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
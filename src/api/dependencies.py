@@ -0,0 +1,25 @@
+from fastapi import HTTPException, Request
+
+from src.data.services.answer_service import AnswerService
+from src.data.services.container import ServiceContainer
+from src.data.services.document_service import DocumentService
+
+
+def get_services(request: Request) -> ServiceContainer:
+    services = getattr(request.app.state, "services", None)
+    if services is None or not services.ready:
+        raise HTTPException(status_code=503, detail="Services are not ready")
+    return services
+
+
+def get_document_service(request: Request) -> DocumentService:
+    return get_services(request).document_service
+
+
+def get_answer_service(request: Request) -> AnswerService:
+    services = get_services(request)
+    if services.answer_service is None:
+        raise HTTPException(status_code=503, detail="Answer generation is disabled")
+    if not services.model_ready:
+        raise HTTPException(status_code=503, detail="Answer model is still loading")
+    return services.answer_service
@@ -1,14 +1,12 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel, Field
 
-from dr_llama.data.processors.document_processor import DocumentProcessor
-from dr_llama.data.services.document_service import DocumentService
-from dr_llama.data.vectors.config import VectorDBConfig
-from dr_llama.data.vectors.service import VectorDBService
-from dr_llama.utils.metrics import metrics
+from src.api.dependencies import get_document_service
+from src.data.services.document_service import DocumentService
+from src.utils.metrics import metrics
 
 router = APIRouter(prefix="/api/v1/documents", tags=["documents"])
 
@@ -70,25 +68,48 @@ class DocumentResponse(BaseModel):
 
 
 class SimilarDocument(BaseModel):
+    document_id: str
+    chunk_index: int
     content: str
     metadata: Dict[str, Any]
     relevance: float
 
 
-class DocumentQuery(BaseModel):
-    query: str = Field(..., description="Search query")
+class SearchOptions(BaseModel):
     n_results: int = Field(5, description="Number of results to return")
     filters: Optional[Dict[str, Any]] = Field(
         None,
-        description="Filter criteria",
+        description=(
+            "Filter criteria on department, document_type, patient_id or creation_date, "
+            'e.g. {"department": "cardiology", "creation_date": {"gte": "2024-01-01"}}'
+        ),
     )
+    nprobe: Optional[int] = Field(
+        None,
+        ge=1,
+        description="IVF clusters to probe; higher is slower but more accurate",
+    )
+    ef: Optional[int] = Field(
+        None,
+        ge=1,
+        description="HNSW search breadth; higher is slower but more accurate",
+    )
+
+    def search_params(self) -> Dict[str, Any]:
+        return {"nprobe": self.nprobe, "ef": self.ef}
+
+
+class DocumentQuery(SearchOptions):
+    query: str = Field(..., description="Search query")
 
 
-async def get_document_service() -> DocumentService:
-    config = VectorDBConfig()
-    vector_db = VectorDBService(config)
-    processor = DocumentProcessor()
-    return DocumentService(vector_db, processor)
+class DocumentBatchQuery(SearchOptions):
+    queries: List[str] = Field(
+        ...,
+        min_length=1,
+        max_length=256,
+        description="Search queries; filters and search parameters apply to all of them",
+    )
 
 
 @router.post("/", response_model=DocumentResponse)
@@ -99,7 +120,7 @@ async def create_document(
 ) -> DocumentResponse:
     try:
         result = await document_service.ingest_document(
-            text=document.text, metadata=document.metadata.dict()
+            text=document.text, metadata=document.metadata.model_dump(mode="json")
         )
         return DocumentResponse(**result)
     except ValueError as exc:
@@ -108,6 +129,32 @@ async def create_document(
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
+async def _iter_ndjson_documents(request: Request) -> AsyncIterator[Dict[str, Any]]:
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield DocumentCreate.model_validate_json(line).model_dump(mode="json")
+    if buffer.strip():
+        yield DocumentCreate.model_validate_json(buffer).model_dump(mode="json")
+
+
+@router.post("/bulk")
+@metrics.track_request("bulk_create_documents")
+async def bulk_create_documents(
+    request: Request,
+    document_service: DocumentService = Depends(get_document_service),
+) -> Dict[str, Any]:
+    try:
+        return await document_service.ingest_bulk(_iter_ndjson_documents(request))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
 @router.get("/search", response_model=List[SimilarDocument])
 @metrics.track_request("search_documents")
 async def search_documents(
@@ -116,9 +163,34 @@ async def search_documents(
 ) -> List[SimilarDocument]:
     try:
         results = await document_service.retrieve_similar_documents(
-            query=query.query, n_results=query.n_results, filters=query.filters
+            query=query.query,
+            n_results=query.n_results,
+            filters=query.filters,
+            search_params=query.search_params(),
         )
         return [SimilarDocument(**result) for result in results]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+
+
+@router.post("/search/batch", response_model=List[List[SimilarDocument]])
+@metrics.track_request("search_documents_batch")
+async def search_documents_batch(
+    query: DocumentBatchQuery,
+    document_service: DocumentService = Depends(get_document_service),
+) -> List[List[SimilarDocument]]:
+    try:
+        results = await document_service.retrieve_similar_documents_batch(
+            queries=query.queries,
+            n_results=query.n_results,
+            filters=query.filters,
+            search_params=query.search_params(),
+        )
+        return [[SimilarDocument(**result) for result in query_results] for query_results in results]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
@@ -131,16 +203,16 @@ async def update_document(
     document_service: DocumentService = Depends(get_document_service),
 ):
     try:
-        await document_service.update_document(
+        result = await document_service.update_document(
             document_id=document_id,
             text=update.text,
-            metadata=update.metadata.dict() if update.metadata else None,
+            metadata=update.metadata.model_dump(mode="json") if update.metadata else None,
         )
-        return {"status": "success"}
+        return {"status": "success", **result}
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail="Document not found") from exc
     except Exception as exc:
-        raise HTTPException(
-            status_code=500, detail="Failed to update document"
-        ) from exc
+        raise HTTPException(status_code=500, detail="Failed to update document") from exc
 
 
 @router.delete("/{document_id}")
@@ -153,9 +225,7 @@ async def delete_document(
         await document_service.delete_document([document_id])
         return {"status": "success"}
     except Exception as exc:
-        raise HTTPException(
-            status_code=500, detail="Failed to delete document"
-        ) from exc
+        raise HTTPException(status_code=500, detail="Failed to delete document") from exc
 
 
 @router.get("/stats")
@@ -166,6 +236,4 @@ async def get_stats(
     try:
         return await document_service.get_database_stats()
     except Exception as exc:
-        raise HTTPException(
-            status_code=500, detail="Failed to get database stats"
-        ) from exc
+        raise HTTPException(status_code=500, detail="Failed to get database stats") from exc
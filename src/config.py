@@ -11,9 +11,40 @@ class ModelSettings(BaseSettings):
     quantization_bits: int = 4  # 4-bit quantization for efficiency
     max_sequence_length: int = 2048
     device: str = "cuda"  # or "cpu"
+    # CPU inference: quantization_bits > 0 selects dynamic int8, otherwise
+    # weights load in cpu_dtype. cpu_threads 0 keeps torch's default.
+    cpu_dtype: str = "float32"
+    cpu_threads: int = 0
+    compile_model: bool = False
+    # Speculative decoding for BaseModel.generate (scripts and CLI); the draft
+    # must share the base model's tokenizer. The server answers through the
+    # batching InferenceScheduler, which has no draft support, so it never
+    # loads the draft.
+    draft_model_name: Optional[str] = None
+    num_draft_tokens: int = 5
     batch_size: int = 32
     num_gpus_per_replica: float = 0.5  # Share GPUs between replicas
     max_concurrent_requests: int = 10
+    # Load the generator and serve /api/v1/answer. Off by default so the
+    # document API starts without downloading or loading an LLM.
+    enable_generation: bool = False
+    # Keys/values of prompt prefixes shared between requests, e.g. the RAG
+    # instructions, are kept on the device and reused; 0 disables it
+    prefix_cache_mb: int = 512
+    # Generations beyond max_concurrent_requests wait; beyond this many
+    # waiting, /answer returns 503
+    max_queued_requests: int = 100
+    # LoRA adapters saved by ModelTrainer, one sub-directory each, selectable
+    # per /answer request; loaded adapters are unloaded LRU beyond the budget
+    adapter_dir: Optional[Path] = None
+    adapter_cache_mb: int = 1024
+    # Loaded weights are cached here as safetensors, in the serving dtype, so
+    # restarts skip the hub and the conversion; None disables it
+    model_artifact_dir: Optional[Path] = Path("data/model_artifacts")
+    # Weights load in the background at startup; /ready stays 200 and reports
+    # model_ready false until they are in, and /api/v1/answer returns 503.
+    # With lazy_load they load on the first /answer request instead.
+    lazy_load: bool = False
 
 
 class VectorDBSettings(BaseSettings):
@@ -22,6 +53,30 @@ class VectorDBSettings(BaseSettings):
     dimension: int = 384
     distance_metric: str = "cosine"
     max_elements_per_shard: int = 100_000
+    # Cached /documents/search results, invalidated on every write
+    search_cache_size: int = 1024
+    search_cache_ttl_seconds: float = 30.0
+
+
+class ProcessingSettings(BaseSettings):
+    # JSON object mapping PHI category names to regular expressions
+    phi_patterns_file: Optional[Path] = None
+    phi_replacement: str = "[REDACTED]"
+
+    # Character-based chunking, used when no tokenizer is available
+    chunk_max_chars: int = 1000
+    chunk_overlap_chars: int = 100
+    # Token-based chunking with the embedding model's tokenizer
+    chunk_by_tokens: bool = True
+    chunk_overlap_tokens: int = 32
+
+    # Chunks whose text matches exactly (up to whitespace) are stored once per
+    # scope. The stored copy records each referencing document's filterable
+    # fields, so filters outside the scope (patient, date) still find it.
+    dedup_enabled: bool = True
+    dedup_max_entries: int = 1_000_000
+    dedup_max_references: int = 1000
+    dedup_scope_fields: List[str] = ["department", "document_type"]
 
 
 class APISettings(BaseSettings):
@@ -54,6 +109,7 @@ class Settings(BaseSettings):
 
     model: ModelSettings = ModelSettings()
     vector_db: VectorDBSettings = VectorDBSettings()
+    processing: ProcessingSettings = ProcessingSettings()
     api: APISettings = APISettings()
     security: SecuritySettings = SecuritySettings()
     monitoring: MonitoringSettings = MonitoringSettings()
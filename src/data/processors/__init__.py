@@ -1,3 +1,6 @@
+from .chunking import TextChunker
+from .dedup import ChunkDeduplicator
 from .document_processor import DocumentProcessor
+from .phi import PHIRedactor
 
-__all__ = ["DocumentProcessor"]
+__all__ = ["ChunkDeduplicator", "DocumentProcessor", "PHIRedactor", "TextChunker"]
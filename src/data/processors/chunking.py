@@ -0,0 +1,123 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterator, List, Optional, Tuple
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+_PARAGRAPH_BOUNDARY = re.compile(r"\n[ \t]*\n\s*")
+
+# Long texts are tokenized as a batch of segments so the fast tokenizer can
+# spread the work over its thread pool instead of running one huge encode.
+_TOKENIZE_SEGMENT_CHARS = 16_384
+
+
+class TextChunker:
+    def __init__(
+        self,
+        max_chunk_size: int = 1000,
+        overlap: int = 100,
+        tokenizer: Optional[Any] = None,
+    ):
+        if overlap >= max_chunk_size:
+            raise ValueError("Chunk overlap must be smaller than the chunk size")
+        # Sizes are in characters, or in tokens when a tokenizer is given
+        self.max_chunk_size = max_chunk_size
+        self.overlap = overlap
+        self.tokenizer = tokenizer
+
+    @classmethod
+    def from_pretrained(
+        cls,
+        model_name: str,
+        max_tokens: int = 254,
+        overlap: int = 32,
+    ) -> "TextChunker":
+        from transformers import AutoTokenizer
+
+        return cls(max_tokens, overlap, AutoTokenizer.from_pretrained(model_name, use_fast=True))
+
+    @staticmethod
+    def boundaries(text: str) -> Tuple[List[int], List[int]]:
+        sentences = [match.start() for match in _SENTENCE_BOUNDARY.finditer(text)]
+        paragraphs = [match.start() for match in _PARAGRAPH_BOUNDARY.finditer(text)]
+        return sentences, paragraphs
+
+    def token_starts(self, text: str) -> List[int]:
+        sentences, paragraphs = self.boundaries(text)
+        cuts = sorted(set(sentences) | set(paragraphs))
+        segments = []
+        start = 0
+        while start < len(text):
+            end = min(start + _TOKENIZE_SEGMENT_CHARS, len(text))
+            if end < len(text):
+                cut = bisect_right(cuts, end) - 1
+                if cut >= 0 and cuts[cut] > start:
+                    end = cuts[cut]
+            segments.append((start, end))
+            start = end
+
+        encodings = self.tokenizer(
+            [text[start:end] for start, end in segments],
+            add_special_tokens=False,
+            return_offsets_mapping=True,
+        )
+        return [
+            segment_start + token_start
+            for (segment_start, _), offsets in zip(segments, encodings["offset_mapping"])
+            for token_start, token_end in offsets
+            if token_end > token_start
+        ]
+
+    def iter_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        length = len(text)
+        sentences, paragraphs = self.boundaries(text)
+        token_starts = self.token_starts(text) if self.tokenizer is not None else None
+
+        def units(position: int) -> int:
+            return position if token_starts is None else bisect_left(token_starts, position)
+
+        def position(unit: int) -> int:
+            if token_starts is None:
+                return min(unit, length)
+            return token_starts[unit] if unit < len(token_starts) else length
+
+        start = 0
+        previous_end = 0
+        while start < length:
+            while start < length and text[start].isspace():
+                start += 1
+            if start >= length:
+                return
+
+            start_unit = units(start)
+            limit = position(start_unit + self.max_chunk_size)
+            if limit >= length:
+                end = length
+            else:
+                # Prefer a paragraph break in the second half of the window,
+                # then the last sentence end, then a hard cut at the limit.
+                # Breaks inside the overlap would only repeat part of the
+                # previous chunk, so every chunk ends past the previous one.
+                end = limit
+                paragraph = bisect_right(paragraphs, limit) - 1
+                sentence = bisect_right(sentences, limit) - 1
+                midpoint = position(start_unit + self.max_chunk_size // 2)
+                if paragraph >= 0 and paragraphs[paragraph] > max(midpoint, previous_end):
+                    end = paragraphs[paragraph]
+                elif sentence >= 0 and sentences[sentence] > max(start, previous_end):
+                    end = sentences[sentence]
+
+            chunk_end = end
+            while chunk_end > start and text[chunk_end - 1].isspace():
+                chunk_end -= 1
+            if chunk_end > start:
+                yield start, chunk_end
+
+            if end >= length:
+                return
+            previous_end = end
+            # Step back by the overlap, unless the chunk is shorter than it
+            next_start = position(max(units(end) - self.overlap, 0))
+            start = next_start if next_start > start else end
+
+    def chunk(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.iter_spans(text)]
@@ -0,0 +1,93 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def text_key(text: str) -> str:
+    # Whitespace is the only difference ignored: any other change to the text
+    # may carry meaning, so those chunks are stored separately.
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CanonicalChunk:
+    id: str
+    document_id: str
+    key: str
+    scope: Tuple[Any, ...]
+
+
+class ChunkDeduplicator:
+    def __init__(
+        self,
+        max_entries: int = 1_000_000,
+        max_references: int = 1000,
+        scope_fields: Optional[List[str]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_references = max_references
+        self.scope_fields = scope_fields or []
+
+        self._entries: OrderedDict[str, CanonicalChunk] = OrderedDict()
+        self._keys: Dict[Tuple[Any, ...], str] = {}
+        self._lock = threading.Lock()
+
+    def scope(self, metadata: Dict[str, Any]) -> Tuple[Any, ...]:
+        return tuple(str(metadata.get(field)) for field in self.scope_fields)
+
+    def match(
+        self,
+        chunk_id: str,
+        document_id: str,
+        text: str,
+        metadata: Dict[str, Any],
+    ) -> Optional[CanonicalChunk]:
+        entry = CanonicalChunk(chunk_id, document_id, text_key(text), self.scope(metadata))
+
+        with self._lock:
+            canonical_id = self._keys.get((entry.scope, entry.key))
+            if canonical_id is not None:
+                self._entries.move_to_end(canonical_id)
+                return self._entries[canonical_id]
+
+            self._add(entry)
+            return None
+
+    def _add(self, entry: CanonicalChunk):
+        self._entries[entry.id] = entry
+        self._keys[(entry.scope, entry.key)] = entry.id
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, chunk_id: str):
+        entry = self._entries.pop(chunk_id, None)
+        if entry is not None and self._keys.get((entry.scope, entry.key)) == chunk_id:
+            del self._keys[(entry.scope, entry.key)]
+
+    def register(
+        self,
+        chunk_id: str,
+        document_id: str,
+        text: str,
+        metadata: Dict[str, Any],
+    ):
+        entry = CanonicalChunk(chunk_id, document_id, text_key(text), self.scope(metadata))
+        with self._lock:
+            self._remove(chunk_id)
+            self._add(entry)
+
+    def forget(self, chunk_ids: List[str]):
+        with self._lock:
+            for chunk_id in chunk_ids:
+                self._remove(chunk_id)
+
+    def reassign(self, chunk_id: str, document_id: str):
+        with self._lock:
+            entry = self._entries.get(chunk_id)
+            if entry is not None:
+                entry.document_id = document_id
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,6 +1,8 @@
-import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from src.config import settings
+from src.data.processors.chunking import TextChunker
+from src.data.processors.phi import PHIRedactor
 from src.utils.logger import get_logger
 from src.utils.metrics import metrics
 
@@ -8,13 +10,23 @@ logger = get_logger(__name__)
 
 
 class DocumentProcessor:
-    def __init__(self):
-        self.phi_patterns = [
-            r"\d{3}-\d{2}-\d{4}",   # SSN
-            r"\d{3}/\d{3}/\d{4}",   # Date of birth
-            r"[A-Z]\d{8}",          # Medical record number
-            r"\d{10}",              # Phone numbers
-        ]
+    def __init__(
+        self,
+        redactor: Optional[PHIRedactor] = None,
+        chunker: Optional[TextChunker] = None,
+    ):
+        self.redactor = redactor or self._default_redactor()
+        self.chunker = chunker or TextChunker(
+            settings.processing.chunk_max_chars,
+            settings.processing.chunk_overlap_chars,
+        )
+
+    @staticmethod
+    def _default_redactor() -> PHIRedactor:
+        processing = settings.processing
+        if processing.phi_patterns_file is not None:
+            return PHIRedactor.from_file(processing.phi_patterns_file, processing.phi_replacement)
+        return PHIRedactor(replacement=processing.phi_replacement)
 
     @metrics.track_request("document_processing")
     async def process_document(
@@ -23,52 +35,51 @@ class DocumentProcessor:
         metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         try:
-            processed_text = self._remove_phi(text)
-            chunks = self.chunk_text(processed_text)
-
-            return {
-                "chunks": chunks,
-                "metadata": self.process_metadata(metadata),
-                "stats": {
-                    "original_length": len(text),
-                    "processed_length": len(processed_text),
-                    "chunk_count": len(chunks),
-                },
-            }
+            return self.prepare_document(text, metadata)
         except Exception as e:
             logger.error("Document processing failed: %s", e)
             raise
 
+    def prepare_document(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        # Redaction and PHI counting share a single scan of the text
+        processed_text, phi_counts = self.redactor.redact(text)
+        chunks = self.chunk_text(processed_text)
+
+        return {
+            "chunks": chunks,
+            "metadata": self.process_metadata(metadata),
+            "stats": {
+                "original_length": len(text),
+                "processed_length": len(processed_text),
+                "chunk_count": len(chunks),
+            },
+            "validation": self._build_validation(text, metadata, phi_counts),
+        }
+
     def _remove_phi(self, text: str) -> str:
-        for pattern in self.phi_patterns:
-            text = re.sub(pattern, "[REDACTED]", text)
-        return text
+        return self.redactor.redact(text)[0]
 
     def chunk_text(
         self,
         text: str,
-        max_chunk_size: int = 1000,
-        overlap: int = 100,
+        max_chunk_size: Optional[int] = None,
+        overlap: Optional[int] = None,
     ) -> List[str]:
-        chunks = []
-        current_pos = 0
-
-        while current_pos < len(text):
-            end_pos = min(current_pos + max_chunk_size, len(text))
-
-            if end_pos < len(text):
-                # Try to find a good breaking point
-                last_period = text.rfind(". ", current_pos, end_pos)
-                if last_period != -1:
-                    end_pos = last_period + 1
-
-            chunk = text[current_pos:end_pos].strip()
-            if chunk:
-                chunks.append(chunk)
-
-            current_pos = end_pos - overlap
+        chunker = self.chunker
+        if max_chunk_size is not None or overlap is not None:
+            chunker = TextChunker(
+                max_chunk_size if max_chunk_size is not None else chunker.max_chunk_size,
+                overlap if overlap is not None else chunker.overlap,
+                chunker.tokenizer,
+            )
+        return chunker.chunk(text)
 
-        return chunks
+    def iter_chunk_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        return self.chunker.iter_spans(text)
 
     def process_metadata(
         self,
@@ -93,21 +104,26 @@ class DocumentProcessor:
         metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         try:
-            phi_count = sum(
-                len(re.findall(pattern, text))
-                for pattern in self.phi_patterns
-            )
-
-            return {
-                "has_phi": phi_count > 0,
-                "phi_count": phi_count,
-                "length": len(text),
-                "metadata_complete": self._validate_metadata(metadata),
-            }
+            return self._build_validation(text, metadata, self.redactor.count(text))
         except Exception as e:
             logger.error("Document validation failed: %s", e)
             raise
 
+    def _build_validation(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]],
+        phi_counts: Dict[str, int],
+    ) -> Dict[str, Any]:
+        phi_count = sum(phi_counts.values())
+        return {
+            "has_phi": phi_count > 0,
+            "phi_count": phi_count,
+            "phi_counts": phi_counts,
+            "length": len(text),
+            "metadata_complete": self._validate_metadata(metadata),
+        }
+
     def _validate_metadata(self, metadata: Optional[Dict[str, Any]]) -> bool:
         if not metadata:
             return False
@@ -0,0 +1,114 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+DEFAULT_PHI_PATTERNS: Dict[str, str] = {
+    "ssn": r"\d{3}-\d{2}-\d{4}",
+    "date_of_birth": r"\d{3}/\d{3}/\d{4}",
+    "medical_record_number": r"[A-Z]\d{8}",
+    "phone_number": r"\d{10}",
+}
+
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: r"\d",
+    sre_constants.CATEGORY_WORD: r"\w",
+    sre_constants.CATEGORY_SPACE: r"\s",
+}
+
+
+def _first_chars(items) -> Optional[List[str]]:
+    if not items:
+        return None
+    op, av = items[0]
+    if op is sre_constants.LITERAL:
+        return [re.escape(chr(av))]
+    if op is sre_constants.IN:
+        chars = []
+        for item_op, item_av in av:
+            if item_op is sre_constants.LITERAL:
+                chars.append(re.escape(chr(item_av)))
+            elif item_op is sre_constants.RANGE:
+                chars.append(f"{re.escape(chr(item_av[0]))}-{re.escape(chr(item_av[1]))}")
+            elif item_op is sre_constants.CATEGORY and item_av in _CATEGORIES:
+                chars.append(_CATEGORIES[item_av])
+            else:
+                return None
+        return chars
+    if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+        return _first_chars(av[2])
+    if op is sre_constants.SUBPATTERN and not av[1] & re.IGNORECASE:
+        return _first_chars(av[-1])
+    if op is sre_constants.BRANCH:
+        chars = []
+        for branch in av[1]:
+            branch_chars = _first_chars(branch)
+            if branch_chars is None:
+                return None
+            chars.extend(branch_chars)
+        return chars
+    return None
+
+
+def _leading_char_class(patterns: List[str]) -> Optional[str]:
+    # The regex engine cannot skip ahead on an alternation of groups, so every
+    # position is tried against every branch. A lookahead on the union of the
+    # branches' first characters restores the fast skip for typical patterns.
+    chars = []
+    for pattern in patterns:
+        try:
+            parsed = sre_parse.parse(pattern)
+            pattern_chars = None if parsed.state.flags & re.IGNORECASE else _first_chars(list(parsed))
+        except (re.error, TypeError, IndexError, AttributeError):
+            return None
+        if pattern_chars is None:
+            return None
+        chars.extend(pattern_chars)
+    return f"[{''.join(dict.fromkeys(chars))}]"
+
+
+class PHIRedactor:
+    def __init__(
+        self,
+        patterns: Optional[Dict[str, str]] = None,
+        replacement: str = "[REDACTED]",
+    ):
+        self.patterns = dict(patterns or DEFAULT_PHI_PATTERNS)
+        self.replacement = replacement
+
+        for name in self.patterns:
+            if not name.isidentifier():
+                raise ValueError(f"Invalid PHI category name: {name!r}")
+
+        # One alternation with a named group per category lets a single scan
+        # both redact and attribute every match. Order sets precedence.
+        alternation = "|".join(f"(?P<{name}>{pattern})" for name, pattern in self.patterns.items())
+        guard = _leading_char_class(list(self.patterns.values()))
+        self.pattern = re.compile(f"(?={guard})(?:{alternation})" if guard else alternation)
+
+    @classmethod
+    def from_file(cls, path: Path, replacement: str = "[REDACTED]") -> "PHIRedactor":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")), replacement)
+
+    def redact(self, text: str) -> Tuple[str, Dict[str, int]]:
+        counts = dict.fromkeys(self.patterns, 0)
+
+        def replace(match: re.Match) -> str:
+            counts[match.lastgroup] += 1
+            return self.replacement
+
+        return self.pattern.sub(replace, text), counts
+
+    def count(self, text: str) -> Dict[str, int]:
+        counts = dict.fromkeys(self.patterns, 0)
+        for match in self.pattern.finditer(text):
+            counts[match.lastgroup] += 1
+        return counts
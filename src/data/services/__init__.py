@@ -1,3 +1,5 @@
+from .container import ServiceContainer
 from .document_service import DocumentService
+from .search_cache import SearchResultCache
 
-__all__ = ["DocumentService"]
+__all__ = ["DocumentService", "SearchResultCache", "ServiceContainer"]
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from src.data.services.document_service import DocumentService
+from src.models.inference.prompt import build_rag_prompt
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PreparedAnswer:
+    prompt: str
+    sources: List[Dict[str, Any]]
+    max_new_tokens: int
+
+
+class AnswerService:
+    def __init__(
+        self,
+        document_service: DocumentService,
+        scheduler: Any,
+    ):
+        self.document_service = document_service
+        self.scheduler = scheduler
+        self.model = scheduler.model
+
+    async def prepare(
+        self,
+        question: str,
+        n_results: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+        max_new_tokens: Optional[int] = None,
+    ) -> PreparedAnswer:
+        max_new_tokens = max_new_tokens or self.model.inference_config.max_new_tokens
+        max_prompt_tokens = self.model.max_sequence_length - max_new_tokens
+        if max_prompt_tokens <= 0:
+            raise ValueError(f"max_new_tokens must be below the model's {self.model.max_sequence_length}-token context")
+
+        results = await self.document_service.retrieve_similar_documents(
+            query=question,
+            n_results=n_results,
+            filters=filters,
+            search_params=search_params,
+        )
+
+        loop = asyncio.get_running_loop()
+        prompt, used = await loop.run_in_executor(
+            None,
+            build_rag_prompt,
+            self.model.tokenizer,
+            question,
+            [result["content"] for result in results],
+            max_prompt_tokens,
+        )
+        sources = [
+            {
+                "document_id": result["document_id"],
+                "chunk_index": result["chunk_index"],
+                "relevance": result["relevance"],
+            }
+            for result in results[:used]
+        ]
+        return PreparedAnswer(prompt=prompt, sources=sources, max_new_tokens=max_new_tokens)
+
+    async def start(self, prepared: PreparedAnswer, **generate_kwargs) -> Any:
+        # Raises SchedulerOverloadedError before any response has been sent
+        return await self.scheduler.submit(
+            prepared.prompt,
+            max_new_tokens=prepared.max_new_tokens,
+            **generate_kwargs,
+        )
+
+    async def stream(
+        self,
+        prepared: PreparedAnswer,
+        handle: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        yield {"event": "context", "data": {"sources": prepared.sources}}
+
+        start = time.perf_counter()
+        try:
+            async for piece in handle:
+                yield {"event": "token", "data": {"text": piece}}
+        finally:
+            # Also runs when the client disconnects, freeing the batch slot
+            handle.cancel()
+
+        yield {
+            "event": "done",
+            "data": {
+                "generated_tokens": handle.generated_tokens,
+                "time_to_first_token": handle.time_to_first_token,
+                "elapsed_seconds": time.perf_counter() - start,
+            },
+        }
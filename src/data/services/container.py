@@ -0,0 +1,140 @@
+from typing import Optional
+
+from src.config import settings
+from src.data.processors.chunking import TextChunker
+from src.data.processors.dedup import ChunkDeduplicator
+from src.data.processors.document_processor import DocumentProcessor
+from src.data.services.answer_service import AnswerService
+from src.data.services.document_service import DocumentService
+from src.data.services.search_cache import SearchResultCache
+from src.data.vectors.async_service import AsyncVectorDBService
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.service import VectorDBService
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ServiceContainer:
+    def __init__(self, vector_db_config: Optional[VectorDBConfig] = None):
+        self.vector_db_config = vector_db_config or VectorDBConfig()
+        self.vector_db: Optional[AsyncVectorDBService] = None
+        self.processor: Optional[DocumentProcessor] = None
+        self.document_service: Optional[DocumentService] = None
+        self.answer_service: Optional[AnswerService] = None
+
+    def start(self):
+        logger.info("Building service container...")
+        self.vector_db = AsyncVectorDBService(VectorDBService(self.vector_db_config))
+        self.processor = DocumentProcessor(chunker=self._build_chunker())
+        self.document_service = DocumentService(
+            self.vector_db,
+            self.processor,
+            deduplicator=self._build_deduplicator(),
+            search_cache=self._build_search_cache(),
+        )
+        self.answer_service = self._build_answer_service()
+        self.warm_up()
+
+    def _build_chunker(self) -> Optional[TextChunker]:
+        if not settings.processing.chunk_by_tokens:
+            return None
+        # Size chunks to what the embedding model actually sees, leaving room
+        # for the [CLS]/[SEP] tokens it adds around every input.
+        embedding_model = self.vector_db.service.embedding_model
+        return TextChunker(
+            max_chunk_size=embedding_model.max_seq_length - 2,
+            overlap=settings.processing.chunk_overlap_tokens,
+            tokenizer=embedding_model.tokenizer,
+        )
+
+    def _build_deduplicator(self) -> Optional[ChunkDeduplicator]:
+        if not settings.processing.dedup_enabled:
+            return None
+        scope_fields = list(settings.processing.dedup_scope_fields)
+        # Searches only visit the partitions matching their filters, so a
+        # shared chunk must sit in the partition of every document using it
+        partition_by = self.vector_db_config.partition_by
+        if partition_by is not None:
+            partition_field = "creation_date" if partition_by == "month" else partition_by
+            if partition_field not in scope_fields:
+                scope_fields.append(partition_field)
+        return ChunkDeduplicator(
+            max_entries=settings.processing.dedup_max_entries,
+            max_references=settings.processing.dedup_max_references,
+            scope_fields=scope_fields,
+        )
+
+    def _build_search_cache(self) -> Optional[SearchResultCache]:
+        if settings.vector_db.search_cache_size <= 0:
+            return None
+        return SearchResultCache(
+            max_entries=settings.vector_db.search_cache_size,
+            ttl_seconds=settings.vector_db.search_cache_ttl_seconds,
+        )
+
+    def _build_answer_service(self) -> Optional[AnswerService]:
+        if not settings.model.enable_generation:
+            return None
+        # Imported here so the document API can run without torch installed
+        import torch
+
+        from src.models.inference.base_model import BaseModel
+        from src.models.inference.scheduler import InferenceScheduler
+        from src.models.model_config import InferenceConfig, ModelConfig
+
+        on_cpu = settings.model.device == "cpu"
+        model = BaseModel(
+            ModelConfig(
+                model_name=settings.model.base_model_name,
+                revision=settings.model.model_revision,
+                quantization_bits=settings.model.quantization_bits,
+                max_sequence_length=settings.model.max_sequence_length,
+                prefix_cache_bytes=settings.model.prefix_cache_mb * 1024 * 1024,
+                torch_dtype=getattr(torch, settings.model.cpu_dtype) if on_cpu else torch.bfloat16,
+                device=settings.model.device,
+                cpu_threads=settings.model.cpu_threads,
+                compile=settings.model.compile_model,
+                adapter_dir=str(settings.model.adapter_dir) if settings.model.adapter_dir else None,
+                adapter_cache_bytes=settings.model.adapter_cache_mb * 1024 * 1024,
+                artifact_dir=str(settings.model.model_artifact_dir) if settings.model.model_artifact_dir else None,
+                # The scheduler thread loads the weights, so startup is not blocked
+                lazy_load=True,
+            ),
+            InferenceConfig(),
+        )
+        scheduler = InferenceScheduler(
+            model,
+            max_batch_size=settings.model.batch_size,
+            max_concurrent_requests=settings.model.max_concurrent_requests,
+            max_queued_requests=settings.model.max_queued_requests,
+            preload=not settings.model.lazy_load,
+        )
+        return AnswerService(self.document_service, scheduler)
+
+    def warm_up(self):
+        logger.info("Warming up services...")
+        self.vector_db.warm_up()
+
+    def close(self):
+        if self.vector_db is not None:
+            logger.info("Closing vector database connection...")
+            self.vector_db.close()
+        if self.answer_service is not None:
+            logger.info("Stopping inference scheduler...")
+            self.answer_service.scheduler.close()
+        self.vector_db = None
+        self.processor = None
+        self.document_service = None
+        self.answer_service = None
+
+    @property
+    def ready(self) -> bool:
+        return self.document_service is not None
+
+    @property
+    def model_ready(self) -> bool:
+        # A lazily loaded model loads with the first request instead
+        if self.answer_service is None or settings.model.lazy_load:
+            return True
+        return self.answer_service.model.loaded
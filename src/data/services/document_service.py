@@ -1,8 +1,24 @@
+import asyncio
 import uuid
-from typing import Any, Dict, List, Optional
+from collections import defaultdict
+from datetime import UTC, datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 
+from src.data.processors.dedup import ChunkDeduplicator
 from src.data.processors.document_processor import DocumentProcessor
-from src.data.vectors.service import VectorDBService
+from src.data.services.ingestion import IngestionStats, prepare_record
+from src.data.services.search_cache import SearchResultCache
+from src.data.vectors.async_service import AsyncVectorDBService
+from src.data.vectors.filters import FILTER_FIELDS, Condition, matches_all, normalise_field, parse_filters
+from src.data.vectors.store import (
+    REFERENCE_FIELDS_KEY,
+    REFERENCES_KEY,
+    ChunkRecord,
+    build_chunk_records,
+    chunk_references,
+    document_reference,
+    with_references,
+)
 from src.utils.logger import get_logger
 from src.utils.metrics import metrics
 
@@ -12,11 +28,17 @@ logger = get_logger(__name__)
 class DocumentService:
     def __init__(
         self,
-        vector_db: VectorDBService,
+        vector_db: AsyncVectorDBService,
         processor: DocumentProcessor,
+        deduplicator: Optional[ChunkDeduplicator] = None,
+        search_cache: Optional[SearchResultCache] = None,
     ):
         self.vector_db = vector_db
         self.processor = processor
+        self.deduplicator = deduplicator
+        self.search_cache = search_cache
+        # Reference lists are read-modify-write on stored chunks
+        self._references_lock = asyncio.Lock()
 
     @metrics.track_request("document_ingestion")
     async def ingest_document(
@@ -25,87 +47,373 @@ class DocumentService:
         metadata: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         try:
-            # Validate document first
-            validation = await self.processor.validate_document(text, metadata)
-            if not validation["metadata_complete"]:
+            # Fail fast on metadata before paying for redaction and chunking
+            if not self.processor._validate_metadata(metadata):
                 raise ValueError("Incomplete metadata")
 
-            # Process document
+            # Redaction also yields the PHI validation counts in the same pass
             processed = await self.processor.process_document(text, metadata)
-
-            # Generate unique IDs for chunks
-            chunk_ids = [str(uuid.uuid4()) for _ in processed["chunks"]]
+            validation = processed["validation"]
 
             # Add to vector database
-            await self.vector_db.add_documents(
-                documents=processed["chunks"],
-                metadatas=[processed["metadata"]] * len(processed["chunks"]),
-                ids=chunk_ids,
-            )
+            document_id = str(uuid.uuid4())
+            try:
+                chunk_ids, duplicates = await self._store_records(
+                    build_chunk_records(document_id, processed["chunks"], processed["metadata"])
+                )
+                await self.vector_db.flush()
+            finally:
+                self._invalidate_search_cache()
 
             return {
-                "document_id": str(uuid.uuid4()),
+                "document_id": document_id,
                 "chunk_ids": chunk_ids,
-                "stats": processed["stats"],
+                "stats": {
+                    **processed["stats"],
+                    "duplicate_chunks": duplicates,
+                    "dedup_ratio": duplicates / len(chunk_ids) if chunk_ids else 0.0,
+                },
                 "validation": validation,
             }
         except Exception as e:
             logger.error("Document ingestion failed: %s", e)
             raise
 
+    @metrics.track_request("document_bulk_ingestion")
+    async def ingest_bulk(
+        self,
+        records: AsyncIterator[Dict[str, Any]],
+        batch_size: int = 256,
+    ) -> Dict[str, Any]:
+        stats = IngestionStats()
+        try:
+            batch = []
+            async for record in records:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    await self._ingest_batch(batch, stats)
+                    batch = []
+            if batch:
+                await self._ingest_batch(batch, stats)
+
+            await self.vector_db.flush()
+            return stats.to_dict()
+        except Exception as e:
+            logger.error("Bulk ingestion failed after %s: %s", stats.to_dict(), e)
+            raise
+
+    async def _ingest_batch(
+        self,
+        records: List[Dict[str, Any]],
+        stats: IngestionStats,
+    ):
+        loop = asyncio.get_running_loop()
+        prepared = await loop.run_in_executor(
+            None,
+            lambda: [prepare_record(record, self.processor) for record in records],
+        )
+
+        chunk_records = []
+        for record, result in zip(records, prepared):
+            if result is None:
+                stats.skipped += 1
+                continue
+            document_id = record.get("document_id") or str(uuid.uuid4())
+            chunk_records.extend(build_chunk_records(document_id, result["chunks"], result["metadata"]))
+            stats.documents += 1
+            stats.chunks += len(result["chunks"])
+
+        try:
+            _, duplicates = await self._store_records(chunk_records)
+        finally:
+            self._invalidate_search_cache()
+        stats.duplicates += duplicates
+
+    def _invalidate_search_cache(self):
+        if self.search_cache is not None:
+            self.search_cache.invalidate()
+
+    async def _store_records(self, records: List[ChunkRecord]) -> Tuple[List[str], int]:
+        if self.deduplicator is None:
+            if records:
+                await self.vector_db.add_records(records, flush=False)
+            return [record.id for record in records], 0
+
+        # Only the first copy of a chunk is embedded and stored; later copies of
+        # the same text are recorded as references on that canonical chunk.
+        unique: Dict[str, ChunkRecord] = {}
+        duplicates_of: Dict[str, List[ChunkRecord]] = defaultdict(list)
+        owners: Dict[str, str] = {}
+        stored_as: Dict[str, str] = {}
+        for record in records:
+            canonical = self.deduplicator.match(record.id, record.document_id, record.content, record.metadata)
+            if canonical is None:
+                unique[record.id] = record
+                stored_as[record.id] = record.id
+            elif canonical.id in unique:
+                _add_reference(unique[canonical.id], record)
+                stored_as[record.id] = canonical.id
+            else:
+                duplicates_of[canonical.id].append(record)
+                owners[canonical.id] = canonical.document_id
+                stored_as[record.id] = canonical.id
+
+        async with self._references_lock:
+            unresolved = await self._add_references(duplicates_of, owners) if duplicates_of else set()
+            for canonical_id in unresolved:
+                # The canonical chunk is gone or its reference list is full,
+                # so the first duplicate takes over as the stored copy.
+                self.deduplicator.forget([canonical_id])
+                first, *rest = duplicates_of[canonical_id]
+                self.deduplicator.register(first.id, first.document_id, first.content, first.metadata)
+                unique[first.id] = first
+                for record in duplicates_of[canonical_id]:
+                    _add_reference(first, record)
+                    stored_as[record.id] = first.id
+
+            if unique:
+                await self.vector_db.add_records(list(unique.values()), flush=False)
+
+        return [stored_as[record.id] for record in records], len(records) - len(unique)
+
+    async def _add_references(
+        self,
+        duplicates_of: Dict[str, List[ChunkRecord]],
+        owners: Dict[str, str],
+    ) -> Set[str]:
+        stored = {
+            chunk["id"]: chunk
+            for chunk in await self.vector_db.get_document_chunks(list(set(owners.values())))
+            if chunk["id"] in duplicates_of
+        }
+        stored = {
+            chunk_id: chunk
+            for chunk_id, chunk in stored.items()
+            if len(chunk["metadata"].get(REFERENCES_KEY, [])) < self.deduplicator.max_references
+        }
+        embeddings = await self.vector_db.get_embeddings(list(stored))
+
+        updates = []
+        for chunk_id, chunk in stored.items():
+            record = _record_from_chunk(chunk, embeddings[chunk_id])
+            changed = [_add_reference(record, duplicate) for duplicate in duplicates_of[chunk_id]]
+            if any(changed):
+                updates.append(record)
+        if updates:
+            await self.vector_db.upsert_records(updates, flush=False)
+        return set(duplicates_of) - set(stored)
+
+    async def _document_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]:
+        # Chunks the documents own, plus deduplicated chunks stored under
+        # another document that list them as references
+        chunks = await self.vector_db.get_document_chunks(document_ids)
+        if self.deduplicator is None:
+            return chunks
+        owned = {chunk["id"] for chunk in chunks}
+        referencing = await self.vector_db.get_referencing_chunks(document_ids)
+        return chunks + [chunk for chunk in referencing if chunk["id"] not in owned]
+
+    async def _release_chunks(
+        self,
+        chunks: List[Dict[str, Any]],
+        removed_document_ids: Set[str],
+    ) -> int:
+        # The removed documents are dropped from every reference list first. A
+        # shared chunk outlives its owner: it is handed over to the next
+        # remaining document that references it instead of being deleted.
+        updates: Dict[str, Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]]]] = {}
+        stale_ids = []
+        for chunk in chunks:
+            stored_references = chunk_references(chunk["metadata"])
+            references = [
+                reference for reference in stored_references if reference["document_id"] not in removed_document_ids
+            ]
+            if chunk["document_id"] not in removed_document_ids:
+                if len(references) != len(stored_references):
+                    updates[chunk["id"]] = (chunk, {"document_id": chunk["document_id"]}, references)
+            elif references:
+                updates[chunk["id"]] = (chunk, references[0], references[1:])
+            else:
+                stale_ids.append(chunk["id"])
+
+        async with self._references_lock:
+            if updates:
+                embeddings = await self.vector_db.get_embeddings(list(updates))
+                records = []
+                for chunk_id, (chunk, owner, references) in updates.items():
+                    record = _record_from_chunk(chunk, embeddings[chunk_id])
+                    # A new owner brings its own filterable fields along
+                    record.document_id = owner["document_id"]
+                    record.metadata = with_references({**chunk["metadata"], **_reference_fields(owner)}, references)
+                    records.append(record)
+                    if self.deduplicator is not None and record.document_id != chunk["document_id"]:
+                        self.deduplicator.reassign(chunk_id, record.document_id)
+                await self.vector_db.upsert_records(records, flush=False)
+            if stale_ids:
+                await self.vector_db.delete_chunks(stale_ids)
+                if self.deduplicator is not None:
+                    self.deduplicator.forget(stale_ids)
+        return len(stale_ids)
+
     @metrics.track_request("document_retrieval")
     async def retrieve_similar_documents(
         self,
         query: str,
         n_results: int = 5,
         filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
         try:
-            results = await self.vector_db.query(
-                query_text=query,
-                n_results=n_results,
-                where=filters,
+            if self.search_cache is None:
+                return await self._search(query, n_results, filters, search_params)
+            return await self.search_cache.get_or_compute(
+                self.search_cache.key(query, n_results, filters, search_params),
+                lambda: self._search(query, n_results, filters, search_params),
             )
-
-            return [
-                {
-                    "content": result["document"],
-                    "metadata": result["metadata"],
-                    # Convert distance to similarity
-                    "relevance": 1 - result["distance"],
-                }
-                for result in results
-            ]
         except Exception as e:
             logger.error("Document retrieval failed: %s", e)
             raise
 
+    @metrics.track_request("document_batch_retrieval")
+    async def retrieve_similar_documents_batch(
+        self,
+        queries: List[str],
+        n_results: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        try:
+            results: List[Optional[List[Dict[str, Any]]]] = [None] * len(queries)
+            keys = []
+            if self.search_cache is not None:
+                keys = [self.search_cache.key(query, n_results, filters, search_params) for query in queries]
+                results = [self.search_cache.get(key) for key in keys]
+
+            # Everything the cache could not answer goes out as one batched search
+            missing = [i for i, result in enumerate(results) if result is None]
+            if missing:
+                generation = self.search_cache.generation if self.search_cache is not None else 0
+                hits = await self.vector_db.search_many(
+                    queries=[queries[i] for i in missing],
+                    top_k=n_results,
+                    filters=filters,
+                    search_params=search_params,
+                )
+                conditions = parse_filters(filters)
+                for i, query_hits in zip(missing, hits):
+                    results[i] = _similar_documents(query_hits, conditions, self.vector_db.relevance)
+                    if self.search_cache is not None:
+                        self.search_cache.put(keys[i], generation, results[i])
+            return results
+        except Exception as e:
+            logger.error("Batch document retrieval failed: %s", e)
+            raise
+
+    async def _search(
+        self,
+        query: str,
+        n_results: int,
+        filters: Optional[Dict[str, Any]],
+        search_params: Optional[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        results = await self.vector_db.search(
+            query=query,
+            top_k=n_results,
+            filters=filters,
+            search_params=search_params,
+        )
+
+        return _similar_documents(results, parse_filters(filters), self.vector_db.relevance)
+
     @metrics.track_request("document_update")
     async def update_document(
         self,
         document_id: str,
         text: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
-    ):
+    ) -> Dict[str, Any]:
         try:
+            # A document whose chunks were all deduplicated owns no rows and is
+            # only found through the references of other documents' chunks
+            existing = await self._document_chunks([document_id])
+            if not existing:
+                raise KeyError(document_id)
+            existing_by_id = {chunk["id"]: chunk for chunk in existing}
+            owned = [chunk for chunk in existing if chunk["document_id"] == document_id]
+            shared = [chunk for chunk in existing if chunk["document_id"] != document_id]
+
             if text:
-                processed = await self.processor.process_document(
-                    text=text,
-                    metadata=metadata,
-                )
-                await self.vector_db.update_document(
-                    document_id=document_id,
-                    document=(
-                        processed["chunks"][0] if processed["chunks"] else None
-                    ),
-                    metadata=processed["metadata"],
-                )
+                if metadata is None:
+                    metadata = _document_metadata((owned or shared)[0], document_id)
+                processed = await self.processor.process_document(text=text, metadata=metadata)
+                records = build_chunk_records(document_id, processed["chunks"], processed["metadata"])
             elif metadata:
                 processed_metadata = self.processor.process_metadata(metadata)
-                await self.vector_db.update_document(
-                    document_id=document_id,
-                    metadata=processed_metadata,
+                records = [
+                    ChunkRecord(
+                        id=chunk["id"],
+                        document_id=document_id,
+                        chunk_index=chunk["chunk_index"],
+                        content=chunk["content"],
+                        content_hash=chunk["content_hash"],
+                        metadata=processed_metadata,
+                    )
+                    for chunk in owned
+                ]
+                # Shared chunks are re-stored under this document with the new
+                # metadata; deduplication puts them back on a matching chunk
+                records += build_chunk_records(
+                    document_id,
+                    [chunk["content"] for chunk in sorted(shared, key=lambda chunk: chunk["chunk_index"])],
+                    processed_metadata,
                 )
+            else:
+                return {"document_id": document_id, "embedded": 0, "reused": 0, "deleted": 0}
+
+            for record in records:
+                if record.id in existing_by_id:
+                    record.metadata = with_references(
+                        record.metadata, chunk_references(existing_by_id[record.id]["metadata"])
+                    )
+
+            # Chunk ids are content-addressed: a known id means the text is
+            # unchanged, so only new chunks go through the embedding model.
+            new_records = [record for record in records if record.id not in existing_by_id]
+            kept_records = [
+                record
+                for record in records
+                if record.id in existing_by_id
+                and (
+                    record.chunk_index != existing_by_id[record.id]["chunk_index"]
+                    or record.metadata != existing_by_id[record.id]["metadata"]
+                )
+            ]
+            stale_ids = list(existing_by_id.keys() - {record.id for record in records})
+
+            if kept_records:
+                embeddings = await self.vector_db.get_embeddings([record.id for record in kept_records])
+                for record in kept_records:
+                    record.embedding = embeddings[record.id]
+
+            deleted = 0
+            try:
+                if stale_ids:
+                    deleted = await self._release_chunks(
+                        [existing_by_id[chunk_id] for chunk_id in stale_ids], {document_id}
+                    )
+                if kept_records:
+                    await self.vector_db.upsert_records(kept_records, flush=False)
+                _, duplicates = await self._store_records(new_records)
+                await self.vector_db.flush()
+            finally:
+                self._invalidate_search_cache()
+
+            return {
+                "document_id": document_id,
+                "embedded": len(new_records) - duplicates,
+                "reused": len(records) - len(new_records) + duplicates,
+                "deleted": deleted,
+            }
         except Exception as e:
             logger.error("Document update failed: %s", e)
             raise
@@ -113,10 +421,106 @@ class DocumentService:
     @metrics.track_request("document_deletion")
     async def delete_document(self, document_ids: List[str]):
         try:
-            await self.vector_db.delete_documents(document_ids)
+            if self.deduplicator is None:
+                await self.vector_db.delete_documents(document_ids)
+            else:
+                chunks = await self._document_chunks(document_ids)
+                await self._release_chunks(chunks, set(document_ids))
+                await self.vector_db.flush()
         except Exception as e:
             logger.error("Document deletion failed: %s", e)
             raise
+        finally:
+            self._invalidate_search_cache()
 
     async def get_database_stats(self) -> Dict[str, Any]:
-        return self.vector_db.get_collection_stats()
+        return await self.vector_db.get_collection_stats()
+
+
+def _similar_documents(
+    results: List[Dict[str, Any]],
+    conditions: List[Condition],
+    relevance: Callable[[float], float],
+) -> List[Dict[str, Any]]:
+    documents = []
+    for result in results:
+        document = _similar_document(result, conditions, relevance)
+        if document is not None:
+            documents.append(document)
+    return documents
+
+
+def _similar_document(
+    result: Dict[str, Any],
+    conditions: List[Condition],
+    relevance: Callable[[float], float],
+) -> Optional[Dict[str, Any]]:
+    # A shared chunk is reported for the document the filters matched: its
+    # owner when that matches, otherwise the first matching reference.
+    metadata = result["metadata"]
+    owner = {field: normalise_field(field, metadata.get(field)) for field in FILTER_FIELDS}
+    if matches_all(conditions, owner):
+        document_id, metadata = result["document_id"], _own_metadata(metadata)
+    else:
+        reference = next(
+            (reference for reference in chunk_references(metadata) if matches_all(conditions, reference)), None
+        )
+        if reference is None:
+            return None
+        document_id, metadata = reference["document_id"], _document_metadata(result, reference["document_id"])
+    return {
+        "document_id": document_id,
+        "chunk_index": result["chunk_index"],
+        "content": result["content"],
+        "metadata": metadata,
+        "relevance": relevance(result["score"]),
+    }
+
+
+def _record_from_chunk(chunk: Dict[str, Any], embedding: List[float]) -> ChunkRecord:
+    return ChunkRecord(
+        id=chunk["id"],
+        document_id=chunk["document_id"],
+        chunk_index=chunk["chunk_index"],
+        content=chunk["content"],
+        content_hash=chunk["content_hash"],
+        metadata=chunk["metadata"],
+        embedding=embedding,
+    )
+
+
+def _add_reference(record: ChunkRecord, duplicate: ChunkRecord) -> bool:
+    references = chunk_references(record.metadata)
+    if duplicate.document_id == record.document_id or any(
+        reference["document_id"] == duplicate.document_id for reference in references
+    ):
+        return False
+    # Chunks of one document share a metadata dict, so never mutate it in place
+    record.metadata = with_references(
+        record.metadata, references + [document_reference(duplicate.document_id, duplicate.metadata)]
+    )
+    return True
+
+
+def _reference_fields(reference: Dict[str, Any]) -> Dict[str, Any]:
+    fields = {field: value for field, value in reference.items() if field != "document_id"}
+    # References keep dates as timestamps so they can be filtered on
+    if fields.get("creation_date") is not None:
+        fields["creation_date"] = datetime.fromtimestamp(fields["creation_date"], tz=UTC).isoformat()
+    return fields
+
+
+def _own_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in metadata.items() if key not in (REFERENCES_KEY, REFERENCE_FIELDS_KEY)}
+
+
+def _document_metadata(chunk: Dict[str, Any], document_id: str) -> Dict[str, Any]:
+    # The metadata of one document sharing the chunk: the stored metadata with
+    # that document's own filterable fields when it is not the owner
+    metadata = _own_metadata(chunk["metadata"])
+    if chunk["document_id"] == document_id:
+        return metadata
+    for reference in chunk_references(chunk["metadata"]):
+        if reference["document_id"] == document_id:
+            return {**metadata, **_reference_fields(reference)}
+    return metadata
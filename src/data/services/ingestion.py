@@ -0,0 +1,221 @@
+import itertools
+import json
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from src.config import settings
+from src.data.processors.chunking import TextChunker
+from src.data.processors.document_processor import DocumentProcessor
+from src.data.vectors.service import VectorDBService
+from src.data.vectors.store import ChunkRecord, build_chunk_records
+from src.models.document import Document
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_processor: Optional[DocumentProcessor] = None
+
+
+def _init_worker(embedding_model: Optional[str] = None, max_tokens: int = 254):
+    global _processor
+    chunker = None
+    if embedding_model is not None and settings.processing.chunk_by_tokens:
+        chunker = TextChunker.from_pretrained(
+            embedding_model,
+            max_tokens=max_tokens,
+            overlap=settings.processing.chunk_overlap_tokens,
+        )
+    _processor = DocumentProcessor(chunker=chunker)
+
+
+def prepare_record(
+    record: Dict[str, Any],
+    processor: Optional[DocumentProcessor] = None,
+) -> Optional[Dict[str, Any]]:
+    processor = processor or _processor or DocumentProcessor()
+    metadata = record.get("metadata")
+    if not processor._validate_metadata(metadata):
+        return None
+    return processor.prepare_document(record["text"], metadata)
+
+
+def iter_records(
+    path: Path,
+    default_metadata: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    files = sorted(path.rglob("*")) if path.is_dir() else [path]
+    for file in files:
+        if file.suffix in (".ndjson", ".jsonl"):
+            with open(file, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        record["metadata"] = {**(default_metadata or {}), **(record.get("metadata") or {})}
+                        yield record
+        elif file.suffix in (".json", ".txt") and file.is_file():
+            # Single Document JSON files as used for training data
+            try:
+                document = Document.model_validate_json(file.read_text(encoding="utf-8"))
+            except ValueError as e:
+                logger.warning("Skipping %s: %s", file, e)
+                continue
+            creation_date = datetime.fromtimestamp(file.stat().st_mtime, tz=UTC)
+            yield {
+                "text": document.get_text_content(),
+                "metadata": {
+                    "creation_date": creation_date.isoformat(),
+                    **(default_metadata or {}),
+                    **document.get_metadata(),
+                },
+            }
+
+
+def iter_ndjson_lines(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+@dataclass
+class IngestionStats:
+    documents: int = 0
+    chunks: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = max(self.elapsed, 1e-9)
+        return {
+            "documents": self.documents,
+            "chunks": self.chunks,
+            "skipped": self.skipped,
+            "duplicate_chunks": self.duplicates,
+            "dedup_ratio": round(self.duplicates / self.chunks, 4) if self.chunks else 0.0,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "docs_per_sec": round(self.documents / elapsed, 2),
+            "chunks_per_sec": round(self.chunks / elapsed, 2),
+        }
+
+
+class BulkIngestionPipeline:
+    def __init__(
+        self,
+        vector_db: VectorDBService,
+        workers: int = 4,
+        insert_batch_size: int = 4096,
+        prepare_chunksize: int = 16,
+        checkpoint_path: Optional[Path] = None,
+        report_every: int = 1000,
+    ):
+        self.vector_db = vector_db
+        self.workers = workers
+        self.insert_batch_size = insert_batch_size
+        self.prepare_chunksize = prepare_chunksize
+        self.checkpoint_path = checkpoint_path
+        self.report_every = report_every
+
+    def _load_checkpoint(self, source: str) -> int:
+        if self.checkpoint_path is None or not self.checkpoint_path.exists():
+            return 0
+        checkpoint = json.loads(self.checkpoint_path.read_text())
+        if checkpoint.get("source") != source:
+            logger.warning("Ignoring checkpoint for a different source: %s", checkpoint.get("source"))
+            return 0
+        return checkpoint["records"]
+
+    def _save_checkpoint(self, source: str, records: int):
+        if self.checkpoint_path is None:
+            return
+        tmp_path = self.checkpoint_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({"source": source, "records": records}))
+        tmp_path.replace(self.checkpoint_path)
+
+    def run(self, records: Iterable[Dict[str, Any]], source: str = "") -> IngestionStats:
+        offset = self._load_checkpoint(source)
+        if offset:
+            logger.info("Resuming %s after %d records", source, offset)
+        records = itertools.islice(records, offset, None)
+
+        stats = IngestionStats()
+        chunk_records: List[ChunkRecord] = []
+        consumed = offset
+        pending_insert: Optional[Future] = None
+        window = self.workers * self.prepare_chunksize * 4
+
+        with (
+            ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(
+                    self.vector_db.config.embedding_model,
+                    self.vector_db.embedding_model.max_seq_length - 2,
+                ),
+            ) as pool,
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-insert") as inserter,
+        ):
+            while True:
+                # Executor.map submits its whole input, so feed it bounded windows
+                batch = list(itertools.islice(records, window))
+                if not batch:
+                    break
+
+                for record, prepared in zip(batch, pool.map(prepare_record, batch, chunksize=self.prepare_chunksize)):
+                    consumed += 1
+                    if prepared is None:
+                        stats.skipped += 1
+                        continue
+                    document_id = record.get("document_id") or str(uuid.uuid4())
+                    chunk_records.extend(build_chunk_records(document_id, prepared["chunks"], prepared["metadata"]))
+                    stats.documents += 1
+                    stats.chunks += len(prepared["chunks"])
+                    if stats.documents % self.report_every == 0:
+                        logger.info("Ingestion progress: %s", stats.to_dict())
+
+                    if len(chunk_records) >= self.insert_batch_size:
+                        pending_insert = self._submit_insert(inserter, pending_insert, chunk_records, source, consumed)
+                        chunk_records = []
+
+            if chunk_records:
+                pending_insert = self._submit_insert(inserter, pending_insert, chunk_records, source, consumed)
+            if pending_insert is not None:
+                pending_insert.result()
+
+        # Sealing segments is expensive in Milvus, so flush once at the very end
+        self.vector_db.flush()
+        self._save_checkpoint(source, consumed)
+        logger.info("Ingestion finished: %s", stats.to_dict())
+        return stats
+
+    def _submit_insert(
+        self,
+        inserter: ThreadPoolExecutor,
+        pending_insert: Optional[Future],
+        chunk_records: List[ChunkRecord],
+        source: str,
+        consumed: int,
+    ) -> Future:
+        # Encode on this thread while the previous batch is still being inserted
+        embeddings = self.vector_db.encode([record.content for record in chunk_records])
+        for record, embedding in zip(chunk_records, embeddings):
+            record.embedding = embedding
+        if pending_insert is not None:
+            pending_insert.result()
+
+        def insert():
+            # A checkpoint must not get ahead of what the store has made
+            # durable (the local store persists its row count on flush), so
+            # checkpointed runs flush every batch.
+            self.vector_db.insert(chunk_records, flush=self.checkpoint_path is not None)
+            self._save_checkpoint(source, consumed)
+
+        return inserter.submit(insert)
@@ -0,0 +1,98 @@
+import asyncio
+import hashlib
+import json
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.utils.metrics import metrics
+
+
+class SearchResultCache:
+    # Only touched from the event loop, so no locking is needed
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # Bumped on every write to the collection; results computed under an
+        # older generation are never served or stored.
+        self.generation = 0
+        self._entries: OrderedDict[str, Tuple[float, List[Dict[str, Any]]]] = OrderedDict()
+        self._inflight: Dict[Tuple[int, str], asyncio.Task] = {}
+
+    @staticmethod
+    def key(
+        query: str,
+        n_results: int,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        payload = json.dumps(
+            [
+                " ".join(unicodedata.normalize("NFC", query).split()),
+                n_results,
+                filters or {},
+                search_params or {},
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, results = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            metrics.track_search_cache("expired")
+            return None
+        self._entries.move_to_end(key)
+        metrics.track_search_cache("hit")
+        return results
+
+    def put(self, key: str, generation: int, results: List[Dict[str, Any]]):
+        if generation != self.generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            metrics.track_search_cache("eviction")
+        metrics.update_search_cache_size(len(self._entries))
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[List[Dict[str, Any]]]],
+    ) -> List[Dict[str, Any]]:
+        results = self.get(key)
+        if results is not None:
+            return results
+
+        flight_key = (self.generation, key)
+        task = self._inflight.get(flight_key)
+        if task is None:
+            metrics.track_search_cache("miss")
+            task = asyncio.ensure_future(compute())
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda done: self._complete(flight_key, done))
+        else:
+            metrics.track_search_cache("coalesced")
+        # Shield so one caller disconnecting does not cancel the shared search
+        return await asyncio.shield(task)
+
+    def _complete(self, flight_key: Tuple[int, str], task: asyncio.Task):
+        self._inflight.pop(flight_key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        generation, key = flight_key
+        self.put(key, generation, task.result())
+
+    def invalidate(self):
+        self.generation += 1
+        self._entries.clear()
+        metrics.track_search_cache("invalidation")
+        metrics.update_search_cache_size(0)
@@ -1,4 +1,12 @@
+from .async_service import AsyncVectorDBService
 from .config import VectorDBConfig
 from .service import VectorDBService
+from .store import VectorStore, create_vector_store
 
-__all__ = ["VectorDBConfig", "VectorDBService"]
+__all__ = [
+    "AsyncVectorDBService",
+    "VectorDBConfig",
+    "VectorDBService",
+    "VectorStore",
+    "create_vector_store",
+]
@@ -0,0 +1,179 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.data.vectors.batching import EmbeddingPriority, EmbeddingScheduler
+from src.data.vectors.cache import EmbeddingCache
+from src.data.vectors.service import VectorDBService
+from src.data.vectors.store import ChunkRecord
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class MeteredExecutor:
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"vector-{name}",
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        submitted_at = time.perf_counter()
+        self._update_queued(1)
+
+        def task():
+            self._update_queued(-1)
+            metrics.observe_executor_wait(self.name, time.perf_counter() - submitted_at)
+            return func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, task)
+
+    def _update_queued(self, delta: int):
+        with self._lock:
+            self._queued += delta
+            metrics.update_executor_queue_depth(self.name, self._queued)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+class AsyncVectorDBService:
+    def __init__(self, service: VectorDBService):
+        self.service = service
+        self.config = service.config
+        # Encoding is CPU-bound and Milvus calls are network-bound; separate
+        # pools keep a slow flush from starving search embeddings and vice versa.
+        self.encode_executor = MeteredExecutor("encode", self.config.encode_workers)
+        self.io_executor = MeteredExecutor("io", self.config.io_workers)
+        self.scheduler = EmbeddingScheduler(
+            self._encode_batch,
+            max_batch_size=self.config.embedding_max_batch_size,
+            window_ms=self.config.embedding_batch_window_ms,
+            max_concurrency=self.config.encode_workers,
+        )
+        self.cache = (
+            EmbeddingCache(
+                model_name=self.config.embedding_model,
+                dimension=service.embedding_model.get_sentence_embedding_dimension(),
+                max_entries=self.config.embedding_cache_size,
+                cache_dir=self.config.embedding_cache_dir,
+                dtype=self.config.embedding_cache_dtype,
+            )
+            if self.config.embedding_cache_size > 0
+            else None
+        )
+
+    async def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        return await self.encode_executor.run(self.service.encode, texts)
+
+    async def embed(
+        self,
+        texts: List[str],
+        priority: EmbeddingPriority = EmbeddingPriority.INTERACTIVE,
+    ) -> List[List[float]]:
+        if self.cache is None:
+            return await self.scheduler.encode(texts, priority)
+
+        embeddings = self.cache.get_many(texts)
+        missing = list({texts[i]: None for i, embedding in enumerate(embeddings) if embedding is None})
+        if missing:
+            computed = dict(zip(missing, await self.scheduler.encode(missing, priority)))
+            self.cache.put_many(missing, [computed[text] for text in missing])
+            embeddings = [
+                embedding if embedding is not None else computed[text] for text, embedding in zip(texts, embeddings)
+            ]
+        return embeddings
+
+    async def _embed_missing(self, records: List[ChunkRecord]):
+        pending = [record for record in records if record.embedding is None]
+        if pending:
+            embeddings = await self.embed([record.content for record in pending], EmbeddingPriority.BULK)
+            for record, embedding in zip(pending, embeddings):
+                record.embedding = embedding
+
+    async def add_records(self, records: List[ChunkRecord], flush: bool = True) -> List[str]:
+        await self._embed_missing(records)
+        return await self.io_executor.run(self.service.insert, records, flush)
+
+    async def upsert_records(self, records: List[ChunkRecord], flush: bool = True) -> List[str]:
+        await self._embed_missing(records)
+        return await self.io_executor.run(self.service.upsert, records, flush)
+
+    async def flush(self):
+        await self.io_executor.run(self.service.flush)
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        embeddings = await self.embed([query])
+        return await self.io_executor.run(
+            self.service.search_by_vector,
+            embeddings[0],
+            top_k,
+            filters,
+            search_params,
+        )
+
+    async def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        embeddings = await self.embed(queries)
+        return await self.io_executor.run(
+            self.service.search_many_by_vector,
+            embeddings,
+            top_k,
+            filters,
+            search_params,
+        )
+
+    async def get_document_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]:
+        return await self.io_executor.run(self.service.get_document_chunks, document_ids)
+
+    async def get_referencing_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]:
+        return await self.io_executor.run(self.service.get_referencing_chunks, document_ids)
+
+    async def get_embeddings(self, ids: List[str]) -> Dict[str, List[float]]:
+        return await self.io_executor.run(self.service.get_embeddings, ids)
+
+    async def delete_chunks(self, ids: List[str]) -> None:
+        await self.io_executor.run(self.service.delete_chunks, ids)
+
+    async def delete_documents(self, document_ids: List[str]) -> None:
+        await self.io_executor.run(self.service.delete_documents, document_ids)
+
+    async def get_document_count(self) -> int:
+        return await self.io_executor.run(self.service.get_document_count)
+
+    async def get_collection_stats(self) -> Dict[str, Any]:
+        return await self.io_executor.run(self.service.get_collection_stats)
+
+    def relevance(self, score: float) -> float:
+        return self.service.relevance(score)
+
+    def warm_up(self):
+        self.service.warm_up()
+
+    def close(self):
+        logger.info("Shutting down vector database executors...")
+        self.scheduler.close()
+        if self.cache is not None:
+            self.cache.close()
+        self.encode_executor.shutdown()
+        self.io_executor.shutdown()
+        self.service.close()
@@ -0,0 +1,139 @@
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Awaitable, Callable, Deque, Dict, List, Optional
+
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class EmbeddingPriority(IntEnum):
+    INTERACTIVE = 0
+    BULK = 1
+
+
+@dataclass
+class _EncodeRequest:
+    texts: List[str]
+    future: asyncio.Future
+
+
+class EmbeddingScheduler:
+    def __init__(
+        self,
+        encode: Callable[[List[str]], Awaitable[List[List[float]]]],
+        max_batch_size: int = 64,
+        window_ms: float = 5.0,
+        max_concurrency: int = 1,
+    ):
+        self._encode = encode
+        self.max_batch_size = max_batch_size
+        self.window = window_ms / 1000
+        self._queues: Dict[EmbeddingPriority, Deque[_EncodeRequest]] = {
+            priority: deque() for priority in EmbeddingPriority
+        }
+        self._pending_texts = 0
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._task: Optional[asyncio.Task] = None
+
+    async def encode(
+        self,
+        texts: List[str],
+        priority: EmbeddingPriority = EmbeddingPriority.INTERACTIVE,
+    ) -> List[List[float]]:
+        if not texts:
+            return []
+        self._ensure_started()
+
+        # Large requests are split so a bulk ingest never occupies the model
+        # for more than one batch while interactive queries are waiting.
+        loop = asyncio.get_running_loop()
+        requests = [
+            _EncodeRequest(texts[i : i + self.max_batch_size], loop.create_future())
+            for i in range(0, len(texts), self.max_batch_size)
+        ]
+        for request in requests:
+            self._queues[priority].append(request)
+            self._pending_texts += len(request.texts)
+        self._wakeup.set()
+
+        results = await asyncio.gather(*(request.future for request in requests))
+        return [embedding for result in results for embedding in result]
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if not self._pending_texts:
+                continue
+
+            # Give concurrent callers a short window to join the batch
+            deadline = loop.time() + self.window
+            while self._pending_texts < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except TimeoutError:
+                    break
+                self._wakeup.clear()
+
+            await self._slots.acquire()
+            batch = self._take_batch()
+            loop.create_task(self._dispatch(batch))
+            if self._pending_texts:
+                self._wakeup.set()
+
+    def _take_batch(self) -> List[_EncodeRequest]:
+        batch = []
+        size = 0
+        for priority in EmbeddingPriority:
+            queue = self._queues[priority]
+            while queue and size + len(queue[0].texts) <= self.max_batch_size:
+                request = queue.popleft()
+                batch.append(request)
+                size += len(request.texts)
+        self._pending_texts -= size
+        return batch
+
+    async def _dispatch(self, batch: List[_EncodeRequest]):
+        try:
+            texts = [text for request in batch for text in request.texts]
+            metrics.observe_embedding_batch(len(texts))
+            embeddings = await self._encode(texts)
+        except Exception as e:
+            logger.error("Embedding batch failed: %s", e)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+
+        offset = 0
+        for request in batch:
+            end = offset + len(request.texts)
+            if not request.future.done():
+                request.future.set_result(embeddings[offset:end])
+            offset = end
+
+    def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for queue in self._queues.values():
+            while queue:
+                request = queue.popleft()
+                if not request.future.done():
+                    request.future.cancel()
+        self._pending_texts = 0
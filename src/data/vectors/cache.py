@@ -0,0 +1,174 @@
+import hashlib
+import json
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class _DiskTier:
+    def __init__(self, path: Path, model_name: str, dimension: int, dtype: str):
+        self.path = path
+        self.model_name = model_name
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self.data_file = path / "embeddings.bin"
+        self.index_file = path / "index.json"
+
+        self.rows: Dict[str, int] = {}
+        self.capacity = 0
+        self._array: Optional[np.memmap] = None
+
+        path.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if self.index_file.exists() and self.data_file.exists():
+            index = json.loads(self.index_file.read_text())
+            if (
+                index.get("model_name") == self.model_name
+                and index.get("dimension") == self.dimension
+                and index.get("dtype") == self.dtype.name
+            ):
+                self.rows = index["rows"]
+                self.capacity = self.data_file.stat().st_size // (self.dimension * self.dtype.itemsize)
+                if self.capacity:
+                    self._array = np.memmap(
+                        self.data_file,
+                        dtype=self.dtype,
+                        mode="r+",
+                        shape=(self.capacity, self.dimension),
+                    )
+                logger.info("Loaded %d cached embeddings from %s", len(self.rows), self.path)
+                return
+            logger.warning("Embedding cache at %s was built for another model, resetting", self.path)
+
+        self.rows = {}
+        self.capacity = 0
+        self.data_file.write_bytes(b"")
+
+    def _grow(self, min_capacity: int):
+        capacity = max(min_capacity, self.capacity * 2, 1024)
+        if self._array is not None:
+            self._array.flush()
+            del self._array
+        with open(self.data_file, "r+b") as f:
+            f.truncate(capacity * self.dimension * self.dtype.itemsize)
+        self._array = np.memmap(
+            self.data_file,
+            dtype=self.dtype,
+            mode="r+",
+            shape=(capacity, self.dimension),
+        )
+        self.capacity = capacity
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return np.asarray(self._array[row], dtype=np.float32)
+
+    def put(self, key: str, embedding: np.ndarray):
+        if key in self.rows:
+            return
+        row = len(self.rows)
+        if row >= self.capacity:
+            self._grow(row + 1)
+        self._array[row] = embedding
+        self.rows[key] = row
+
+    def flush(self):
+        if self._array is not None:
+            self._array.flush()
+        index = {
+            "model_name": self.model_name,
+            "dimension": self.dimension,
+            "dtype": self.dtype.name,
+            "rows": self.rows,
+        }
+        tmp_file = self.index_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps(index))
+        tmp_file.replace(self.index_file)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+class EmbeddingCache:
+    def __init__(
+        self,
+        model_name: str,
+        dimension: int,
+        max_entries: int = 10_000,
+        cache_dir: Optional[Path] = None,
+        dtype: str = "float32",
+    ):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = _DiskTier(Path(cache_dir), model_name, dimension, dtype) if cache_dir is not None else None
+        if self._disk is not None:
+            metrics.update_embedding_cache_size("disk", len(self._disk))
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def key(self, text: str) -> str:
+        payload = f"{self.model_name}\0{self.normalize(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        results = []
+        with self._lock:
+            for text in texts:
+                key = self.key(text)
+                embedding = self._memory.get(key)
+                if embedding is not None:
+                    self._memory.move_to_end(key)
+                    metrics.track_embedding_cache("memory", "hit")
+                else:
+                    metrics.track_embedding_cache("memory", "miss")
+                    if self._disk is not None:
+                        embedding = self._disk.get(key)
+                        metrics.track_embedding_cache("disk", "hit" if embedding is not None else "miss")
+                        if embedding is not None:
+                            self._remember(key, embedding)
+                results.append(embedding.tolist() if embedding is not None else None)
+        return results
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]):
+        with self._lock:
+            for text, embedding in zip(texts, embeddings):
+                key = self.key(text)
+                array = np.asarray(embedding, dtype=np.float32)
+                self._remember(key, array)
+                if self._disk is not None:
+                    self._disk.put(key, array)
+            if self._disk is not None:
+                metrics.update_embedding_cache_size("disk", len(self._disk))
+
+    def _remember(self, key: str, embedding: np.ndarray):
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            metrics.track_embedding_cache("memory", "eviction")
+        metrics.update_embedding_cache_size("memory", len(self._memory))
+
+    def flush(self):
+        if self._disk is not None:
+            with self._lock:
+                self._disk.flush()
+
+    def close(self):
+        self.flush()
@@ -1,20 +1,61 @@
+from pathlib import Path
 from typing import Optional
 
 from pydantic_settings import BaseSettings
 
+from src.config import settings
+
 
 class VectorDBConfig(BaseSettings):
+    # "milvus" or "local" (embedded NumPy store for tests and small deployments)
+    backend: str = "milvus"
+    db_path: Path = settings.vector_db.db_path
     host: str = "localhost"
     port: str = "19530"
     collection_name: str = "medical_documents"
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     embedding_dimension: int = 768
     metric_type: str = "L2"
-    index_type: str = "IVF_FLAT"
-    nlist: int = 1024
+    # "AUTO" picks FLAT/HNSW/IVF_FLAT/IVF_SQ8 from the collection size;
+    # any other value pins that index type.
+    index_type: str = "AUTO"
+    nlist: Optional[int] = None  # derived from the collection size when unset
     nprobe: int = 10
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 200
+    hnsw_ef: int = 64
+    flat_index_max_entities: int = 10_000
+    hnsw_index_max_entities: int = 2_000_000
+    ivf_flat_index_max_entities: int = 10_000_000
+
+    # Typed, indexed scalar columns for hot metadata filter fields
+    promote_metadata_fields: bool = True
+    scalar_index_type: str = "INVERTED"  # "Trie" on Milvus < 2.4
+    # Expression templates need Milvus >= 2.5; otherwise literals are inlined
+    filter_templates: bool = True
+
+    # Route inserts into per-key partitions ("department", "document_type" or
+    # "month") that roll over at max_elements_per_shard, and prune searches
+    # to the partitions matching the query filters.
+    partition_by: Optional[str] = None
+    max_elements_per_shard: int = settings.vector_db.max_elements_per_shard
+    partition_refresh_seconds: float = 30.0
     consistency_level: str = "Strong"
     username: Optional[str] = None
     password: Optional[str] = None
 
+    # Executor pools used by AsyncVectorDBService
+    encode_workers: int = 1
+    io_workers: int = 8
+
+    # Micro-batching of concurrent embedding requests
+    embedding_batch_window_ms: float = 5.0
+    embedding_max_batch_size: int = 64
+
+    # Embedding cache; a cache_size of 0 disables it and cache_dir enables the on-disk tier
+    embedding_cache_size: int = 10_000
+    embedding_cache_dir: Optional[Path] = None
+    embedding_cache_dtype: str = "float32"
+
     class Config:
         env_prefix = "MILVUS_"
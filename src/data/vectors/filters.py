@@ -0,0 +1,171 @@
+import json
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import numpy as np
+
+
+def to_timestamp(value: Any) -> int:
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid date value: {value!r}")
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        return int(value.timestamp())
+    raise ValueError(f"Invalid date value: {value!r}")
+
+
+def _to_string(value: Any) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"Expected a string, got {value!r}")
+    return value
+
+
+# Metadata fields that can be filtered on, with the normaliser for their values.
+# When the collection schema has them, they are stored as typed scalar columns.
+FILTER_FIELDS: Dict[str, Callable[[Any], Any]] = {
+    "department": _to_string,
+    "document_type": _to_string,
+    "patient_id": _to_string,
+    "creation_date": to_timestamp,
+}
+
+RANGE_OPERATORS = {"gt": ">", "gte": ">=", "lt": "<", "lte": "<="}
+OPERATORS = {"eq", "ne", "in", *RANGE_OPERATORS}
+
+
+@dataclass
+class Condition:
+    field: str
+    operator: str
+    value: Any
+
+    def evaluate(self, column: np.ndarray) -> np.ndarray:
+        if self.operator == "eq":
+            return column == self.value
+        if self.operator == "ne":
+            return column != self.value
+        if self.operator == "in":
+            values = set(self.value)
+            return np.fromiter((value in values for value in column), dtype=bool, count=len(column))
+        valid = np.array([value is not None for value in column], dtype=bool)
+        mask = np.zeros(len(column), dtype=bool)
+        values = column[valid]
+        if self.operator == "gt":
+            mask[valid] = values > self.value
+        elif self.operator == "gte":
+            mask[valid] = values >= self.value
+        elif self.operator == "lt":
+            mask[valid] = values < self.value
+        else:
+            mask[valid] = values <= self.value
+        return mask
+
+    def matches(self, value: Any) -> bool:
+        column = np.empty(1, dtype=object)
+        column[0] = value
+        return bool(self.evaluate(column)[0])
+
+
+def matches_all(conditions: List[Condition], values: Dict[str, Any]) -> bool:
+    return all(condition.matches(values.get(condition.field)) for condition in conditions)
+
+
+def parse_filters(filters: Optional[Dict[str, Any]]) -> List[Condition]:
+    conditions = []
+    for field, spec in (filters or {}).items():
+        normalise = FILTER_FIELDS.get(field)
+        if normalise is None:
+            raise ValueError(f"Filtering on '{field}' is not supported; use one of {sorted(FILTER_FIELDS)}")
+
+        operations = spec if isinstance(spec, dict) else {"eq": spec}
+        if not operations:
+            raise ValueError(f"Empty filter for '{field}'")
+        for operator, value in operations.items():
+            if operator not in OPERATORS:
+                raise ValueError(f"Unsupported filter operator '{operator}' for '{field}'")
+            if operator == "in":
+                if not isinstance(value, (list, tuple)) or not value:
+                    raise ValueError(f"'in' filter for '{field}' needs a non-empty list")
+                value = [normalise(item) for item in value]
+            else:
+                value = normalise(value)
+            conditions.append(Condition(field, operator, value))
+    return conditions
+
+
+def normalise_field(field: str, value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        return FILTER_FIELDS[field](value)
+    except ValueError:
+        return None
+
+
+@dataclass
+class FilterExpression:
+    template: str
+    params: Dict[str, Any]
+
+    def render(self) -> str:
+        # Inline literals for servers without expression templates. Values were
+        # normalised to str/int by parse_filters, so json quoting is safe here.
+        return self.template.format(**{key: json.dumps(value) for key, value in self.params.items()})
+
+
+def compile_filter(
+    filters: Optional[Dict[str, Any]],
+    column_fields: Set[str],
+    references_path: Optional[str] = None,
+) -> Optional[FilterExpression]:
+    conditions = parse_filters(filters)
+    if not conditions:
+        return None
+
+    clauses: List[str] = []
+    params: Dict[str, Any] = {}
+    for position, condition in enumerate(conditions):
+        if condition.field in column_fields:
+            target = condition.field
+        elif condition.field == "creation_date":
+            raise ValueError("Date filters require the creation_date scalar column; re-create the collection")
+        else:
+            target = f'metadata["{condition.field}"]'
+        placeholder = f"p{position}"
+        params[placeholder] = condition.value
+        if condition.operator == "eq":
+            clauses.append(f"{target} == {{{placeholder}}}")
+        elif condition.operator == "ne":
+            clauses.append(f"{target} != {{{placeholder}}}")
+        elif condition.operator == "in":
+            clauses.append(f"{target} in {{{placeholder}}}")
+        else:
+            clauses.append(f"{target} {RANGE_OPERATORS[condition.operator]} {{{placeholder}}}")
+    template = " and ".join(clauses)
+
+    # Shared chunks also match through the values of their referencing
+    # documents. JSON lists only support membership tests, so this is done
+    # for eq/in filters; the caller re-checks which document matched.
+    if references_path is not None and all(condition.operator in ("eq", "in") for condition in conditions):
+        reference_clauses = []
+        for position, condition in enumerate(conditions):
+            placeholder = f"r{position}"
+            params[placeholder] = condition.value if condition.operator == "in" else [condition.value]
+            reference_clauses.append(f'json_contains_any({references_path}["{condition.field}"], {{{placeholder}}})')
+        template = f"({template}) or ({' and '.join(reference_clauses)})"
+    return FilterExpression(template, params)
+
+
+def extract_scalar_fields(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    # Scalar columns are not nullable, so missing values map to "" / 0
+    values = {}
+    for field in FILTER_FIELDS:
+        value = normalise_field(field, metadata.get(field))
+        values[field] = value if value is not None else (0 if field == "creation_date" else "")
+    return values
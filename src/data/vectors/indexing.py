@@ -0,0 +1,76 @@
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from src.data.vectors.config import VectorDBConfig
+
+INDEX_TYPES = ("FLAT", "IVF_FLAT", "IVF_SQ8", "HNSW")
+
+
+@dataclass
+class IndexSpec:
+    index_type: str
+    build_params: Dict[str, Any] = field(default_factory=dict)
+    search_params: Dict[str, Any] = field(default_factory=dict)
+
+    def to_index_params(self, metric_type: str) -> Dict[str, Any]:
+        return {
+            "metric_type": metric_type,
+            "index_type": self.index_type,
+            "params": self.build_params,
+        }
+
+    def to_search_params(
+        self,
+        metric_type: str,
+        top_k: int,
+        overrides: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        params = dict(self.search_params)
+        for key, value in (overrides or {}).items():
+            # Only forward effort knobs the index understands
+            if value is not None and key in params:
+                params[key] = value
+        if "ef" in params:
+            # HNSW requires ef >= limit
+            params["ef"] = max(params["ef"], top_k)
+        return {"metric_type": metric_type, "params": params}
+
+
+def select_index_type(num_entities: int, config: VectorDBConfig) -> str:
+    if config.index_type.upper() != "AUTO":
+        return config.index_type.upper()
+    if num_entities < config.flat_index_max_entities:
+        return "FLAT"
+    if num_entities < config.hnsw_index_max_entities:
+        return "HNSW"
+    if num_entities < config.ivf_flat_index_max_entities:
+        return "IVF_FLAT"
+    return "IVF_SQ8"
+
+
+def build_index_spec(
+    index_type: str,
+    num_entities: int,
+    config: VectorDBConfig,
+) -> IndexSpec:
+    index_type = index_type.upper()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unsupported index type: {index_type}")
+
+    if index_type == "FLAT":
+        return IndexSpec("FLAT")
+    if index_type == "HNSW":
+        return IndexSpec(
+            "HNSW",
+            {"M": config.hnsw_m, "efConstruction": config.hnsw_ef_construction},
+            {"ef": config.hnsw_ef},
+        )
+
+    # Rule of thumb: about 4 * sqrt(n) clusters, within Milvus' limits
+    nlist = config.nlist or min(max(int(4 * math.sqrt(max(num_entities, 1))), 16), 65_536)
+    return IndexSpec(index_type, {"nlist": nlist}, {"nprobe": min(config.nprobe, nlist)})
+
+
+def select_index(num_entities: int, config: VectorDBConfig) -> IndexSpec:
+    return build_index_spec(select_index_type(num_entities, config), num_entities, config)
@@ -0,0 +1,315 @@
+import json
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.filters import matches_all, normalise_field, parse_filters
+from src.data.vectors.store import REFERENCES_KEY, ChunkRecord, chunk_references, relevance
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CHUNK_FIELDS = ("id", "document_id", "chunk_index", "content", "content_hash", "metadata")
+
+
+class LocalVectorStore:
+    def __init__(self, config: VectorDBConfig, dimension: int):
+        self.config = config
+        self.dimension = dimension
+        self.metric = config.metric_type.upper()
+        if self.metric not in ("L2", "IP", "COSINE"):
+            raise ValueError(f"Unsupported metric for the local vector store: {config.metric_type}")
+
+        self.path = Path(config.db_path) / config.collection_name
+        self.vectors_file = self.path / "vectors.f32"
+        self.records_file = self.path / "records.jsonl"
+        self.deleted_file = self.path / "deleted.npy"
+        self.state_file = self.path / "state.json"
+
+        self._lock = threading.RLock()
+        self._columns: Dict[str, np.ndarray] = {}
+        self._open()
+
+    def _open(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        state = json.loads(self.state_file.read_text()) if self.state_file.exists() else {}
+        if state.get("dimension", self.dimension) != self.dimension:
+            raise ValueError(
+                f"Local vector store at {self.path} has dimension {state['dimension']}, expected {self.dimension}"
+            )
+        count = state.get("count", 0)
+
+        # Only the first `count` records were flushed; anything after that
+        # belongs to an interrupted write and is dropped.
+        self._records: List[Dict[str, Any]] = []
+        if self.records_file.exists():
+            with open(self.records_file, encoding="utf-8") as f:
+                for line in f:
+                    if len(self._records) >= count:
+                        break
+                    self._records.append(json.loads(line))
+        self._count = len(self._records)
+        self._rewrite_records_if_needed()
+
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        if self.vectors_file.exists() and self.vectors_file.stat().st_size:
+            self._capacity = self.vectors_file.stat().st_size // (self.dimension * 4)
+            self._vectors = np.memmap(
+                self.vectors_file,
+                dtype=np.float32,
+                mode="r+",
+                shape=(self._capacity, self.dimension),
+            )
+        else:
+            self.vectors_file.write_bytes(b"")
+
+        self._deleted = np.zeros(self._count, dtype=bool)
+        if self.deleted_file.exists():
+            deleted = np.load(self.deleted_file)[: self._count]
+            self._deleted[: len(deleted)] = deleted
+        self._row_of = {record["id"]: row for row, record in enumerate(self._records) if not self._deleted[row]}
+
+        self._norms = (
+            np.einsum("ij,ij->i", self._vectors[: self._count], self._vectors[: self._count])
+            if self._count
+            else np.zeros(0, dtype=np.float32)
+        )
+        logger.info("Opened local vector store at %s with %d vectors", self.path, len(self._row_of))
+
+    def _rewrite_records_if_needed(self):
+        if not self.records_file.exists():
+            return
+        with open(self.records_file, encoding="utf-8") as f:
+            line_count = sum(1 for _ in f)
+        if line_count == self._count:
+            return
+        tmp_file = self.records_file.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            for record in self._records:
+                f.write(json.dumps(record) + "\n")
+        tmp_file.replace(self.records_file)
+
+    def _grow(self, min_capacity: int):
+        capacity = max(min_capacity, self._capacity * 2, 1024)
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        with open(self.vectors_file, "r+b") as f:
+            f.truncate(capacity * self.dimension * 4)
+        self._vectors = np.memmap(
+            self.vectors_file,
+            dtype=np.float32,
+            mode="r+",
+            shape=(capacity, self.dimension),
+        )
+        self._capacity = capacity
+
+    def load(self):
+        pass
+
+    def ensure_index(self) -> bool:
+        # Brute-force search has no index to migrate
+        return False
+
+    def add(self, records: List[ChunkRecord]) -> List[str]:
+        vectors = np.asarray([record.embedding for record in records], dtype=np.float32).reshape(-1, self.dimension)
+        if self.metric == "COSINE":
+            vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+        with self._lock:
+            # Rows are append-only; re-adding an id supersedes the old row
+            self._mark_deleted([record.id for record in records])
+
+            start = self._count
+            end = start + len(vectors)
+            if end > self._capacity:
+                self._grow(end)
+            self._vectors[start:end] = vectors
+
+            rows = []
+            with open(self.records_file, "a", encoding="utf-8") as f:
+                for record in records:
+                    row = asdict(record)
+                    del row["embedding"]
+                    f.write(json.dumps(row) + "\n")
+                    rows.append(row)
+
+            self._records.extend(rows)
+            for row, record in enumerate(records, start):
+                self._row_of[record.id] = row
+            self._deleted = np.concatenate([self._deleted, np.zeros(len(vectors), dtype=bool)])
+            self._norms = np.concatenate([self._norms, np.einsum("ij,ij->i", vectors, vectors)])
+            self._columns.clear()
+            self._count = end
+            return [record.id for record in records]
+
+    def upsert(self, records: List[ChunkRecord]) -> List[str]:
+        return self.add(records)
+
+    def flush(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            np.save(self.deleted_file, self._deleted)
+            tmp_file = self.state_file.with_suffix(".tmp")
+            tmp_file.write_text(json.dumps({"dimension": self.dimension, "count": self._count}))
+            tmp_file.replace(self.state_file)
+
+    def _column(self, key: str) -> np.ndarray:
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(self._count, dtype=object)
+            if key == "document_id":
+                column[:] = [record["document_id"] for record in self._records]
+            elif key == REFERENCES_KEY:
+                column[:] = [chunk_references(record["metadata"]) or None for record in self._records]
+            else:
+                column[:] = [normalise_field(key, record["metadata"].get(key)) for record in self._records]
+            self._columns[key] = column
+        return column
+
+    def _filter_mask(self, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        conditions = parse_filters(filters)
+        mask = ~self._deleted
+        for condition in conditions:
+            mask &= condition.evaluate(self._column(condition.field))
+        if conditions:
+            # Shared chunks also match when any referencing document does
+            references = self._column(REFERENCES_KEY)
+            for row in np.flatnonzero(~self._deleted & ~mask & np.not_equal(references, None)):
+                if any(matches_all(conditions, reference) for reference in references[row]):
+                    mask[row] = True
+        return mask
+
+    def search(
+        self,
+        embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        return self.search_many([embedding], top_k, filters, search_params)[0]
+
+    def search_many(
+        self,
+        embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        # Brute force is exact, so per-request effort parameters do not apply
+        queries = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dimension)
+        if self.metric == "COSINE":
+            queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        with self._lock:
+            count = self._count
+            candidates = np.flatnonzero(self._filter_mask(filters)) if count else np.zeros(0, dtype=np.int64)
+            if not len(candidates):
+                return [[] for _ in range(len(queries))]
+
+            vectors = self._vectors[:count]
+            if len(candidates) < count:
+                vectors = vectors[candidates]
+                norms = self._norms[candidates]
+            else:
+                norms = self._norms
+
+            # One matrix product scores every query against the candidates.
+            # Work with "lower is better" so one top-k path serves every metric.
+            if self.metric == "L2":
+                scores = norms[:, None] - 2 * (vectors @ queries.T) + np.einsum("ij,ij->i", queries, queries)[None, :]
+                order_keys = scores
+            else:
+                scores = vectors @ queries.T
+                order_keys = -scores
+
+            k = min(top_k, len(candidates))
+            if k < len(candidates):
+                top = np.argpartition(order_keys, k - 1, axis=0)[:k]
+            else:
+                top = np.broadcast_to(np.arange(len(candidates))[:, None], order_keys.shape)
+            top = np.take_along_axis(top, np.argsort(np.take_along_axis(order_keys, top, axis=0), axis=0), axis=0)
+
+            results = []
+            for column in range(len(queries)):
+                hits = []
+                for i in top[:, column]:
+                    record = self._records[candidates[i]]
+                    hits.append(
+                        {
+                            "id": record["id"],
+                            "document_id": record["document_id"],
+                            "chunk_index": record["chunk_index"],
+                            "content": record["content"],
+                            "metadata": record["metadata"],
+                            "score": float(scores[i, column]),
+                        }
+                    )
+                results.append(hits)
+            return results
+
+    def get_document_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]:
+        wanted = set(document_ids)
+        with self._lock:
+            return [
+                {field: self._records[row][field] for field in CHUNK_FIELDS}
+                for row in self._row_of.values()
+                if self._records[row]["document_id"] in wanted
+            ]
+
+    def get_referencing_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]:
+        wanted = set(document_ids)
+        with self._lock:
+            return [
+                {field: self._records[row][field] for field in CHUNK_FIELDS}
+                for row in self._row_of.values()
+                if wanted.intersection(self._records[row]["metadata"].get(REFERENCES_KEY, ()))
+            ]
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, List[float]]:
+        with self._lock:
+            return {
+                chunk_id: self._vectors[self._row_of[chunk_id]].tolist() for chunk_id in ids if chunk_id in self._row_of
+            }
+
+    def _mark_deleted(self, ids: List[str]):
+        rows = [self._row_of.pop(chunk_id) for chunk_id in ids if chunk_id in self._row_of]
+        if rows:
+            self._deleted[np.asarray(rows, dtype=np.int64)] = True
+
+    def delete(self, ids: List[str]) -> None:
+        with self._lock:
+            self._mark_deleted(ids)
+
+    def delete_documents(self, document_ids: List[str]) -> None:
+        wanted = set(document_ids)
+        with self._lock:
+            self._mark_deleted(
+                [chunk_id for chunk_id, row in self._row_of.items() if self._records[row]["document_id"] in wanted]
+            )
+
+    def relevance(self, score: float) -> float:
+        return relevance(self.config.metric_type, score)
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._row_of)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "local",
+                "path": str(self.path),
+                "document_count": self.count(),
+                "deleted_count": int(self._deleted.sum()),
+            }
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,328 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from pymilvus import (
+    Collection,
+    CollectionSchema,
+    DataType,
+    FieldSchema,
+    connections,
+    utility,
+)
+
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.filters import FILTER_FIELDS, compile_filter, extract_scalar_fields
+from src.data.vectors.indexing import IndexSpec, build_index_spec, select_index, select_index_type
+from src.data.vectors.sharding import PartitionRouter
+from src.data.vectors.store import REFERENCE_FIELDS_KEY, REFERENCES_KEY, ChunkRecord, relevance
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+EMBEDDING_INDEX_NAME = "embedding_index"
+CHUNK_FIELDS = ["id", "document_id", "chunk_index", "content", "content_hash", "metadata"]
+
+
+class MilvusVectorStore:
+    def __init__(self, config: VectorDBConfig, dimension: int):
+        self.config = config
+        self.dimension = dimension
+        self.index: Optional[IndexSpec] = None
+        self._connect()
+        self._setup_collection()
+
+    def _connect(self):
+        connections.connect(
+            alias="default",
+            host=self.config.host,
+            port=self.config.port,
+            user=self.config.username,
+            password=self.config.password,
+        )
+
+    def _setup_collection(self):
+        if not utility.has_collection(self.config.collection_name):
+            fields = [
+                FieldSchema(
+                    name="id",
+                    dtype=DataType.VARCHAR,
+                    max_length=128,
+                    is_primary=True,
+                ),
+                FieldSchema(name="document_id", dtype=DataType.VARCHAR, max_length=64),
+                FieldSchema(name="chunk_index", dtype=DataType.INT64),
+                FieldSchema(name="content_hash", dtype=DataType.VARCHAR, max_length=64),
+                FieldSchema(
+                    name="content",
+                    dtype=DataType.VARCHAR,
+                    max_length=65535,
+                ),
+                FieldSchema(
+                    name="embedding",
+                    dtype=DataType.FLOAT_VECTOR,
+                    dim=self.dimension,
+                ),
+                FieldSchema(name="metadata", dtype=DataType.JSON),
+            ]
+            if self.config.promote_metadata_fields:
+                # Hot filter fields live in typed columns so Milvus can index them
+                fields.extend(self._scalar_field_schemas())
+            schema = CollectionSchema(
+                fields=fields,
+                description="Medical documents collection",
+            )
+            self.collection = Collection(
+                name=self.config.collection_name,
+                schema=schema,
+            )
+
+            self._create_index(select_index(0, self.config))
+            self._create_scalar_indexes()
+        else:
+            self.collection = Collection(self.config.collection_name)
+            self.index = self._current_index()
+            self.collection.load()
+
+        field_names = {field.name for field in self.collection.schema.fields}
+        if "document_id" not in field_names:
+            raise ValueError(
+                f"Collection {self.config.collection_name} predates document ids and cannot be "
+                "updated incrementally; drop it and re-ingest, or configure another collection_name"
+            )
+        self.scalar_columns = {name for name in FILTER_FIELDS if name in field_names}
+        self.router = (
+            PartitionRouter(
+                self.collection,
+                self.config.partition_by,
+                self.config.max_elements_per_shard,
+                self.config.partition_refresh_seconds,
+            )
+            if self.config.partition_by
+            else None
+        )
+
+    @staticmethod
+    def _scalar_field_schemas() -> List[FieldSchema]:
+        return [
+            FieldSchema(name="department", dtype=DataType.VARCHAR, max_length=128),
+            FieldSchema(name="document_type", dtype=DataType.VARCHAR, max_length=128),
+            FieldSchema(name="patient_id", dtype=DataType.VARCHAR, max_length=128),
+            FieldSchema(name="creation_date", dtype=DataType.INT64),
+        ]
+
+    def _create_scalar_indexes(self):
+        fields = [FieldSchema(name="document_id", dtype=DataType.VARCHAR, max_length=64)]
+        if self.config.promote_metadata_fields:
+            fields.extend(self._scalar_field_schemas())
+        for field in fields:
+            if field.dtype == DataType.VARCHAR:
+                index_type = self.config.scalar_index_type
+            else:
+                index_type = "STL_SORT"
+            self.collection.create_index(
+                field_name=field.name,
+                index_params={"index_type": index_type},
+                index_name=f"{field.name}_index",
+            )
+
+    def _embedding_index(self):
+        for index in self.collection.indexes:
+            if index.field_name == "embedding":
+                return index
+        return None
+
+    def _current_index(self) -> Optional[IndexSpec]:
+        index = self._embedding_index()
+        if index is None:
+            return None
+        build_params = index.params.get("params", {})
+        if isinstance(build_params, str):
+            build_params = json.loads(build_params)
+        spec = build_index_spec(index.params["index_type"], self.collection.num_entities, self.config)
+        spec.build_params = build_params
+        return spec
+
+    def _create_index(self, spec: IndexSpec):
+        self.collection.create_index(
+            field_name="embedding",
+            index_params=spec.to_index_params(self.config.metric_type),
+            index_name=EMBEDDING_INDEX_NAME,
+        )
+        self.index = spec
+
+    def index_outdated(self) -> bool:
+        index_type = select_index_type(self.collection.num_entities, self.config)
+        return self.index is None or self.index.index_type != index_type
+
+    def ensure_index(self) -> bool:
+        # Rebuilding releases the collection, so searches fail until it is
+        # loaded again; only run this at startup or from scripts/init_milvus.py
+        if not self.index_outdated():
+            return False
+        num_entities = self.collection.num_entities
+        self.rebuild_index(build_index_spec(select_index_type(num_entities, self.config), num_entities, self.config))
+        return True
+
+    def rebuild_index(self, spec: IndexSpec):
+        logger.info(
+            "Rebuilding %s index: %s -> %s %s",
+            self.config.collection_name,
+            self.index.index_type if self.index else None,
+            spec.index_type,
+            spec.build_params,
+        )
+        self.collection.release()
+        index = self._embedding_index()
+        if index is not None:
+            self.collection.drop_index(index_name=index.index_name)
+        self._create_index(spec)
+        self.collection.load()
+
+    def load(self):
+        # Called at startup, before the collection serves searches
+        if not self.ensure_index():
+            self.collection.load()
+
+    def add(self, records: List[ChunkRecord]) -> List[str]:
+        rows = []
+        for record in records:
+            row = {
+                "id": record.id,
+                "document_id": record.document_id,
+                "chunk_index": record.chunk_index,
+                "content_hash": record.content_hash,
+                "content": record.content,
+                "embedding": record.embedding,
+                "metadata": record.metadata,
+            }
+            if self.scalar_columns:
+                row.update(extract_scalar_fields(record.metadata))
+            rows.append(row)
+        if self.router is not None:
+            return self.router.insert(rows)
+        insert_result = self.collection.insert(rows)
+        return insert_result.primary_keys
+
+    def upsert(self, records: List[ChunkRecord]) -> List[str]:
+        # Delete + insert rather than Milvus upsert, so that a row whose
+        # partition key changed moves to the right partition.
+        self.delete([record.id for record in records])
+        return self.add(records)
+
+    def flush(self):
+        self.collection.flush()
+        # num_entities is only exact after a flush. The rebuild itself is left
+        # to startup or an admin run, since it would fail concurrent searches.
+        if self.index_outdated():
+            logger.warning(
+                "The %s index no longer fits %d entities; run scripts/init_milvus.py to rebuild it",
+                self.config.collection_name,
+                self.collection.num_entities,
+            )
+
+    def search(
+        self,
+        embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        return self.search_many([embedding], top_k, filters, search_params)[0]
+
+    def search_many(
+        self,
+        embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        partition_names = self.router.partitions_for(filters) if self.router is not None else None
+        # One request for all queries: Milvus searches the vectors together
+        # and returns one hit list per query, in order.
+        results = self.collection.search(
+            data=embeddings,
+            anns_field="embedding",
+            param=self.index.to_search_params(self.config.metric_type, top_k, search_params),
+            limit=top_k,
+            output_fields=["document_id", "chunk_index", "content", "metadata"],
+            partition_names=partition_names,
+            **self._filter_kwargs(filters),
+        )
+
+        return [
+            [
+                {
+                    "id": hit.id,
+                    "document_id": hit.entity.get("document_id"),
+                    "chunk_index": hit.entity.get("chunk_index"),
+                    "content": hit.entity.get("content"),
+                    "metadata": hit.entity.get("metadata"),
+                    "score": hit.score,
+                }
+                for hit in hits
+            ]
+            for hits in results
+        ]
+
+    def _filter_kwargs(self, filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        expression = compile_filter(filters, self.scalar_columns, f'metadata["{REFERENCE_FIELDS_KEY}"]')
+        if expression is None:
+            return {"expr": None}
+        if self.config.filter_templates:
+            # Values travel separately from the expression, so they are never parsed as syntax
+            return {"expr": expression.template, "expr_params": expression.params}
+        return {"expr": expression.render()}
+
+    def _in_kwargs(self, field: str, values: List[str]) -> Dict[str, Any]:
+        if self.config.filter_templates:
+            return {"expr": f"{field} in {{values}}", "expr_params": {"values": list(values)}}
+        return {"expr": f"{field} in {json.dumps([str(value) for value in values])}"}
+
+    def get_document_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]:
+        if not document_ids:
+            return []
+        return self.collection.query(output_fields=CHUNK_FIELDS, **self._in_kwargs("document_id", document_ids))
+
+    def get_referencing_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]:
+        # Chunks stored once for several documents list the others in their metadata
+        if not document_ids:
+            return []
+        path = f'metadata["{REFERENCES_KEY}"]'
+        if self.config.filter_templates:
+            kwargs = {"expr": f"json_contains_any({path}, {{values}})", "expr_params": {"values": list(document_ids)}}
+        else:
+            kwargs = {"expr": f"json_contains_any({path}, {json.dumps([str(value) for value in document_ids])})"}
+        return self.collection.query(output_fields=CHUNK_FIELDS, **kwargs)
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, List[float]]:
+        if not ids:
+            return {}
+        rows = self.collection.query(output_fields=["id", "embedding"], **self._in_kwargs("id", ids))
+        return {row["id"]: list(row["embedding"]) for row in rows}
+
+    def delete(self, ids: List[str]) -> None:
+        if ids:
+            self.collection.delete(**self._in_kwargs("id", ids))
+
+    def delete_documents(self, document_ids: List[str]) -> None:
+        if document_ids:
+            self.collection.delete(**self._in_kwargs("document_id", document_ids))
+
+    def relevance(self, score: float) -> float:
+        return relevance(self.config.metric_type, score)
+
+    def count(self) -> int:
+        return self.collection.num_entities
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "milvus",
+            "collection_name": self.config.collection_name,
+            "document_count": self.count(),
+            "index_type": self.index.index_type if self.index else None,
+            "index_params": self.index.build_params if self.index else None,
+            **(self.router.stats() if self.router is not None else {}),
+        }
+
+    def close(self):
+        connections.disconnect("default")
@@ -1,131 +1,120 @@
 from typing import Any, Dict, List, Optional
 
-from pymilvus import (
-    Collection,
-    CollectionSchema,
-    DataType,
-    FieldSchema,
-    connections,
-    utility,
-)
 from sentence_transformers import SentenceTransformer
 
 from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.store import ChunkRecord, VectorStore, create_vector_store
 
 
 class VectorDBService:
     def __init__(self, config: VectorDBConfig):
         self.config = config
-        self.embedding_model = SentenceTransformer(
-            "sentence-transformers/all-MiniLM-L6-v2",
-        )
-        self._connect()
-        self._setup_collection()
-
-    def _connect(self):
-        connections.connect(
-            alias="default",
-            host=self.config.host,
-            port=self.config.port,
-            user=self.config.username,
-            password=self.config.password,
+        self.embedding_model = SentenceTransformer(self.config.embedding_model)
+        self.store: VectorStore = create_vector_store(
+            config,
+            self.embedding_model.get_sentence_embedding_dimension(),
         )
 
-    def _setup_collection(self):
-        if not utility.has_collection(self.config.collection_name):
-            fields = [
-                FieldSchema(
-                    name="id",
-                    dtype=DataType.INT64,
-                    is_primary=True,
-                    auto_id=True,
-                ),
-                FieldSchema(
-                    name="content",
-                    dtype=DataType.VARCHAR,
-                    max_length=65535,
-                ),
-                FieldSchema(
-                    name="embedding",
-                    dtype=DataType.FLOAT_VECTOR,
-                    dim=self.config.embedding_dimension,
-                ),
-                FieldSchema(name="metadata", dtype=DataType.JSON),
-            ]
-            schema = CollectionSchema(
-                fields=fields,
-                description="Medical documents collection",
-            )
-            self.collection = Collection(
-                name=self.config.collection_name,
-                schema=schema,
-            )
-
-            index_params = {
-                "metric_type": self.config.metric_type,
-                "index_type": self.config.index_type,
-                "params": {"nlist": self.config.nlist},
-            }
-            self.collection.create_index(
-                field_name="embedding",
-                index_params=index_params,
-            )
-        else:
-            self.collection = Collection(self.config.collection_name)
-            self.collection.load()
-
-    def add_documents(self, documents: List[Dict[str, Any]]) -> List[int]:
-        contents = [doc["content"] for doc in documents]
-        embeddings = self.embedding_model.encode(contents).tolist()
-        metadata = [doc.get("metadata", {}) for doc in documents]
-
-        entities = [
-            contents,
-            embeddings,
-            metadata,
-        ]
-
-        insert_result = self.collection.insert(entities)
-        self.collection.flush()
-        return insert_result.primary_keys
+    def warm_up(self):
+        # Load the collection into memory and run one encode so the first
+        # request does not pay for lazy model and kernel initialisation.
+        self.store.load()
+        self.embedding_model.encode(["warm-up"])
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_model.encode(
+            texts,
+            batch_size=self.config.embedding_max_batch_size,
+        ).tolist()
+
+    def _embed_missing(self, records: List[ChunkRecord]):
+        pending = [record for record in records if record.embedding is None]
+        if pending:
+            embeddings = self.encode([record.content for record in pending])
+            for record, embedding in zip(pending, embeddings):
+                record.embedding = embedding
+
+    def insert(self, records: List[ChunkRecord], flush: bool = True) -> List[str]:
+        self._embed_missing(records)
+        ids = self.store.add(records)
+        if flush:
+            self.store.flush()
+        return ids
+
+    def upsert(self, records: List[ChunkRecord], flush: bool = True) -> List[str]:
+        self._embed_missing(records)
+        ids = self.store.upsert(records)
+        if flush:
+            self.store.flush()
+        return ids
+
+    def flush(self):
+        self.store.flush()
+
+    def ensure_index(self) -> bool:
+        return self.store.ensure_index()
+
+    def search_by_vector(
+        self,
+        embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        return self.store.search(embedding, top_k, filters, search_params)
 
     def search(
         self,
         query: str,
         top_k: int = 5,
-        search_filter: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
     ) -> List[Dict[str, Any]]:
-        query_embedding = self.embedding_model.encode([query])[0].tolist()
-
-        search_params = {
-            "metric_type": self.config.metric_type,
-            "params": {"nprobe": self.config.nprobe},
-        }
-
-        results = self.collection.search(
-            data=[query_embedding],
-            anns_field="embedding",
-            param=search_params,
-            limit=top_k,
-            expr=search_filter,
-            output_fields=["content", "metadata"],
-        )
+        query_embedding = self.encode([query])[0]
+        return self.search_by_vector(query_embedding, top_k, filters, search_params)
+
+    def search_many_by_vector(
+        self,
+        embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        return self.store.search_many(embeddings, top_k, filters, search_params)
 
-        return [
-            {
-                "content": hit.entity.get("content"),
-                "metadata": hit.entity.get("metadata"),
-                "score": hit.score,
-            }
-            for hit in results[0]
-        ]
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        query_embeddings = self.encode(queries)
+        return self.search_many_by_vector(query_embeddings, top_k, filters, search_params)
+
+    def get_document_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]:
+        return self.store.get_document_chunks(document_ids)
+
+    def get_referencing_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]:
+        return self.store.get_referencing_chunks(document_ids)
 
-    def delete_documents(self, ids: List[int]) -> None:
-        expr = f"id in {ids}"
-        self.collection.delete(expr)
+    def get_embeddings(self, ids: List[str]) -> Dict[str, List[float]]:
+        return self.store.get_embeddings(ids)
+
+    def delete_chunks(self, ids: List[str]) -> None:
+        self.store.delete(ids)
+
+    def delete_documents(self, document_ids: List[str]) -> None:
+        self.store.delete_documents(document_ids)
+
+    def relevance(self, score: float) -> float:
+        return self.store.relevance(score)
 
     def get_document_count(self) -> int:
-        return self.collection.num_entities
+        return self.store.count()
+
+    def get_collection_stats(self) -> Dict[str, Any]:
+        return self.store.stats()
 
     def close(self):
-        connections.disconnect("default")
+        self.store.close()
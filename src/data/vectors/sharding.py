@@ -0,0 +1,209 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import UTC, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymilvus import Collection
+from pymilvus.exceptions import MilvusException
+
+from src.data.vectors.filters import Condition, normalise_field, parse_filters
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PARTITION_FIELDS = ("department", "document_type", "month")
+UNASSIGNED = "unassigned"
+DEFAULT_PARTITION = "_default"
+
+
+def _month_bounds(key: str) -> Tuple[int, int]:
+    year, month = (int(part) for part in key.split("_"))
+    start = datetime(year, month, 1, tzinfo=UTC)
+    end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=UTC)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+class PartitionRouter:
+    def __init__(
+        self,
+        collection: Collection,
+        partition_by: str,
+        max_elements_per_shard: int,
+        refresh_seconds: float = 30.0,
+    ):
+        if partition_by not in PARTITION_FIELDS:
+            raise ValueError(f"Cannot partition by '{partition_by}'; use one of {PARTITION_FIELDS}")
+        self.collection = collection
+        self.partition_by = partition_by
+        self.filter_field = "creation_date" if partition_by == "month" else partition_by
+        self.max_elements_per_shard = max_elements_per_shard
+        # Other workers and scripts/ingest.py create partitions too; the list
+        # is reloaded after this long, and whenever a lookup misses
+        self.refresh_seconds = refresh_seconds
+
+        self._lock = threading.Lock()
+        # partition key -> [(partition name, entity count)], oldest shard first
+        self._shards: Dict[str, List[List[Any]]] = defaultdict(list)
+        self._search_default = False
+        self._loaded_at = 0.0
+        with self._lock:
+            self._load_partitions()
+
+    def _load_partitions(self):
+        # Called with self._lock held
+        shards: Dict[str, List[List[Any]]] = defaultdict(list)
+        search_default = False
+        for partition in self.collection.partitions:
+            if partition.name == DEFAULT_PARTITION:
+                # Data written before partitioning was enabled must stay searchable
+                search_default = partition.num_entities > 0
+                continue
+            try:
+                key = json.loads(partition.description)["key"]
+            except (ValueError, KeyError, TypeError):
+                continue
+            shards[key].append([partition.name, partition.num_entities])
+        for key_shards in shards.values():
+            key_shards.sort(key=lambda shard: shard[0])
+        # num_entities lags unflushed inserts; keep the larger count for shards
+        # this process has been writing to
+        for key, key_shards in shards.items():
+            known = dict(self._shards.get(key, []))
+            for shard in key_shards:
+                shard[1] = max(shard[1], known.get(shard[0], 0))
+        self._shards = shards
+        self._search_default = search_default
+        self._loaded_at = time.monotonic()
+        logger.debug(
+            "Loaded %d partitions for %d %s keys",
+            sum(len(key_shards) for key_shards in shards.values()),
+            len(shards),
+            self.partition_by,
+        )
+
+    def _load_if_stale(self):
+        if time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            self._load_partitions()
+
+    def partition_key(self, metadata: Dict[str, Any]) -> str:
+        value = normalise_field(self.filter_field, metadata.get(self.filter_field))
+        if value is None or value == "":
+            return UNASSIGNED
+        if self.partition_by == "month":
+            date = datetime.fromtimestamp(value, tz=UTC)
+            return f"{date.year:04d}_{date.month:02d}"
+        return value
+
+    def _partition_name(self, key: str, shard: int) -> str:
+        # Partition names only allow [A-Za-z0-9_]; the hash keeps distinct keys
+        # distinct after the readable part is sanitised and truncated.
+        slug = re.sub(r"\W+", "_", key.lower()).strip("_")[:48] or "key"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+        return f"p_{slug}_{digest}_{shard:04d}"
+
+    def _writable_shard(self, key: str) -> List[Any]:
+        shards = self._shards[key]
+        if shards and shards[-1][1] < self.max_elements_per_shard:
+            return shards[-1]
+
+        # Another writer may already have rolled this key over
+        self._load_partitions()
+        shards = self._shards[key]
+        if shards and shards[-1][1] < self.max_elements_per_shard:
+            return shards[-1]
+
+        name = self._partition_name(key, len(shards))
+        try:
+            self.collection.create_partition(name, description=json.dumps({"key": key}))
+            logger.info("Created partition %s for %s=%s", name, self.partition_by, key)
+        except MilvusException:
+            # Lost the race to another writer creating the same shard
+            if not self.collection.has_partition(name):
+                raise
+        shards.append([name, 0])
+        return shards[-1]
+
+    def insert(self, rows: List[Dict[str, Any]]) -> List[Any]:
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for position, row in enumerate(rows):
+            groups[self.partition_key(row["metadata"])].append(position)
+
+        primary_keys: List[Any] = [None] * len(rows)
+        with self._lock:
+            for key, positions in groups.items():
+                offset = 0
+                while offset < len(positions):
+                    shard = self._writable_shard(key)
+                    room = self.max_elements_per_shard - shard[1]
+                    batch = positions[offset : offset + room]
+                    result = self.collection.insert([rows[i] for i in batch], partition_name=shard[0])
+                    for position, primary_key in zip(batch, result.primary_keys):
+                        primary_keys[position] = primary_key
+                    shard[1] += len(batch)
+                    offset += len(batch)
+        return primary_keys
+
+    def _key_matches(self, key: str, condition: Condition) -> bool:
+        if key == UNASSIGNED:
+            return False
+        if self.partition_by != "month":
+            if condition.operator == "eq":
+                return key == condition.value
+            if condition.operator == "in":
+                return key in condition.value
+            return True
+
+        start, end = _month_bounds(key)
+        if condition.operator == "eq":
+            return start <= condition.value < end
+        if condition.operator == "in":
+            return any(start <= value < end for value in condition.value)
+        if condition.operator in ("gt", "gte"):
+            return end > condition.value
+        if condition.operator in ("lt", "lte"):
+            return start < condition.value or (condition.operator == "lte" and start == condition.value)
+        return True
+
+    def _matching_partitions(self, conditions: List[Condition]) -> List[str]:
+        return [
+            name
+            for key, shards in self._shards.items()
+            if all(self._key_matches(key, condition) for condition in conditions)
+            for name, _ in shards
+        ]
+
+    def partitions_for(self, filters: Optional[Dict[str, Any]]) -> Optional[List[str]]:
+        # None searches the whole collection
+        conditions = [
+            condition
+            for condition in parse_filters(filters)
+            if condition.field == self.filter_field and condition.operator != "ne"
+        ]
+        if not conditions:
+            return None
+
+        with self._lock:
+            self._load_if_stale()
+            names = self._matching_partitions(conditions)
+            if not names:
+                self._load_partitions()
+                names = self._matching_partitions(conditions)
+            if not names:
+                # A partition this process has not seen yet may still hold matches
+                return None
+            if self._search_default:
+                names.append(DEFAULT_PARTITION)
+        return names
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load_if_stale()
+            return {
+                "partition_by": self.partition_by,
+                "partition_keys": len(self._shards),
+                "partitions": sum(len(shards) for shards in self._shards.values()),
+            }
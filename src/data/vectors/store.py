@@ -0,0 +1,151 @@
+import hashlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Protocol
+
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.filters import FILTER_FIELDS, normalise_field
+
+# Other documents sharing a deduplicated chunk, listed in its metadata
+REFERENCES_KEY = "references"
+# The filterable fields of those documents, one list per field in the same
+# order as REFERENCES_KEY, so filters can match the chunk for any of them
+REFERENCE_FIELDS_KEY = "reference_fields"
+
+
+@dataclass
+class ChunkRecord:
+    id: str
+    document_id: str
+    chunk_index: int
+    content: str
+    content_hash: str
+    metadata: Dict[str, Any]
+    embedding: Optional[List[float]] = None
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def relevance(metric_type: str, score: float) -> float:
+    # Search scores as "higher is more relevant": COSINE and IP scores are
+    # similarities already, L2 scores are (squared) distances
+    if metric_type.upper() == "L2":
+        return 1.0 / (1.0 + score)
+    return score
+
+
+def chunk_references(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Each referencing document with its (normalised) filterable fields
+    fields = metadata.get(REFERENCE_FIELDS_KEY) or {}
+    references = []
+    for position, document_id in enumerate(metadata.get(REFERENCES_KEY) or []):
+        reference = {"document_id": document_id}
+        for field in FILTER_FIELDS:
+            values = fields.get(field) or []
+            reference[field] = values[position] if position < len(values) else None
+        references.append(reference)
+    return references
+
+
+def document_reference(document_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "document_id": document_id,
+        **{field: normalise_field(field, metadata.get(field)) for field in FILTER_FIELDS},
+    }
+
+
+def with_references(metadata: Dict[str, Any], references: List[Dict[str, Any]]) -> Dict[str, Any]:
+    metadata = {key: value for key, value in metadata.items() if key not in (REFERENCES_KEY, REFERENCE_FIELDS_KEY)}
+    if not references:
+        return metadata
+    return {
+        **metadata,
+        REFERENCES_KEY: [reference["document_id"] for reference in references],
+        REFERENCE_FIELDS_KEY: {field: [reference[field] for reference in references] for field in FILTER_FIELDS},
+    }
+
+
+def build_chunk_records(
+    document_id: str,
+    chunks: List[str],
+    metadata: Dict[str, Any],
+) -> List[ChunkRecord]:
+    # Chunk ids derive from the content hash (plus an occurrence counter for
+    # repeated chunks), so an unchanged chunk keeps its id across updates.
+    occurrences: Counter = Counter()
+    records = []
+    for chunk_index, chunk in enumerate(chunks):
+        digest = content_hash(chunk)
+        occurrence = occurrences[digest]
+        occurrences[digest] += 1
+        records.append(
+            ChunkRecord(
+                id=f"{document_id}-{digest[:16]}-{occurrence}",
+                document_id=document_id,
+                chunk_index=chunk_index,
+                content=chunk,
+                content_hash=digest,
+                metadata=metadata,
+            )
+        )
+    return records
+
+
+class VectorStore(Protocol):
+    def add(self, records: List[ChunkRecord]) -> List[str]: ...
+
+    def upsert(self, records: List[ChunkRecord]) -> List[str]: ...
+
+    def search(
+        self,
+        embedding: List[float],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]: ...
+
+    def search_many(
+        self,
+        embeddings: List[List[float]],
+        top_k: int = 5,
+        filters: Optional[Dict[str, Any]] = None,
+        search_params: Optional[Dict[str, Any]] = None,
+    ) -> List[List[Dict[str, Any]]]: ...
+
+    def get_document_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]: ...
+
+    def get_referencing_chunks(self, document_ids: List[str]) -> List[Dict[str, Any]]: ...
+
+    def get_embeddings(self, ids: List[str]) -> Dict[str, List[float]]: ...
+
+    def delete(self, ids: List[str]) -> None: ...
+
+    def delete_documents(self, document_ids: List[str]) -> None: ...
+
+    def relevance(self, score: float) -> float: ...
+
+    def count(self) -> int: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+    def flush(self) -> None: ...
+
+    def ensure_index(self) -> bool: ...
+
+    def load(self) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def create_vector_store(config: VectorDBConfig, dimension: int) -> VectorStore:
+    if config.backend == "milvus":
+        from src.data.vectors.milvus_store import MilvusVectorStore
+
+        return MilvusVectorStore(config, dimension)
+    if config.backend == "local":
+        from src.data.vectors.local_store import LocalVectorStore
+
+        return LocalVectorStore(config, dimension)
+    raise ValueError(f"Unknown vector store backend: {config.backend}")
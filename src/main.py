@@ -1,4 +1,4 @@
-# pylint: disable=W0603, W0613, W0621
+# pylint: disable=W0613
 from contextlib import asynccontextmanager
 from typing import Any, Dict
 
@@ -9,35 +9,28 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from prometheus_client import make_asgi_app
 
+from src.api.answer import router as answer_router
 from src.api.routes import router as document_router
-from src.data.processors.document_processor import DocumentProcessor
-from src.data.services.document_service import DocumentService
-from src.data.vectors.config import VectorDBConfig
-from src.data.vectors.service import VectorDBService
+from src.data.services.container import ServiceContainer
 from src.utils.logger import get_logger
 from src.utils.metrics import metrics
 
 logger = get_logger(__name__)
 
 
-vector_db = None
-document_service = None
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global vector_db, document_service
-
     logger.info("Starting up application...")
 
-    config = VectorDBConfig()
-    vector_db = VectorDBService(config)
-    processor = DocumentProcessor()
-    document_service = DocumentService(vector_db, processor)
-
-    yield
+    services = ServiceContainer()
+    services.start()
+    app.state.services = services
 
-    logger.info("Shutting down application...")
+    try:
+        yield
+    finally:
+        logger.info("Shutting down application...")
+        services.close()
 
 
 app = FastAPI(
@@ -83,20 +76,38 @@ async def general_exception_handler(
 
 
 app.include_router(document_router)
+app.include_router(answer_router)
 
 
 @app.get("/health", tags=["health"])
 @metrics.track_request("health_check")
-async def health_check() -> Dict[str, Any]:
+async def health_check(request: Request) -> Dict[str, Any]:
+    services = getattr(request.app.state, "services", None)
     return {
         "status": "healthy",
         "version": "1.0.0",
         "services": {
-            "vector_db": vector_db is not None,
-            "document_service": document_service is not None,
+            "vector_db": services is not None and services.vector_db is not None,
+            "document_service": services is not None and services.document_service is not None,
+            "answer_service": services is not None and services.answer_service is not None,
+            "model_loaded": (
+                services is not None and services.answer_service is not None and services.answer_service.model.loaded
+            ),
         },
     }
 
 
+@app.get("/ready", tags=["health"])
+async def readiness(request: Request) -> JSONResponse:
+    # Readiness probe for the document API; the generation model is reported
+    # separately, as only /api/v1/answer waits for its weights
+    services = getattr(request.app.state, "services", None)
+    ready = services is not None and services.ready
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"ready": ready, "model_ready": ready and services.model_ready},
+    )
+
+
 if __name__ == "__main__":
     uvicorn.run("dr_llama.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,126 @@
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# peft's name for rows of a mixed batch that run on the base weights only
+BASE_ADAPTER = "__base__"
+_ADAPTER_CONFIG = "adapter_config.json"
+_NAME_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]*")
+
+
+class AdapterManager:
+    # LoRA adapters written by ModelTrainer, one sub-directory per adapter,
+    # attached on demand to a single shared base model. Loading and unloading
+    # rewrite the model's modules, so they take the owner's forward_lock
+    # (always before self._lock), which every forward pass holds, and are
+    # called from the thread about to run the forward pass.
+
+    def __init__(self, owner: Any, adapter_dir: Path, max_bytes: int):
+        # owner is the BaseModel whose .model gets wrapped in a PeftModel
+        self.owner = owner
+        self.adapter_dir = Path(adapter_dir)
+        self.max_bytes = max_bytes
+        self.bytes = 0
+
+        self._loaded: OrderedDict[str, int] = OrderedDict()
+        self._in_use: Dict[str, int] = defaultdict(int)
+        self._lock = threading.RLock()
+
+    def path(self, name: str) -> Path:
+        if not _NAME_PATTERN.fullmatch(name) or not (self.adapter_dir / name / _ADAPTER_CONFIG).is_file():
+            raise KeyError(f"Unknown adapter: {name}")
+        return self.adapter_dir / name
+
+    def available(self) -> List[str]:
+        if not self.adapter_dir.is_dir():
+            return []
+        return sorted(path.parent.name for path in self.adapter_dir.glob(f"*/{_ADAPTER_CONFIG}"))
+
+    @property
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return list(self._loaded)
+
+    def acquire(self, name: str):
+        start = time.perf_counter()
+        with self.owner.forward_lock, self._lock:
+            if name in self._loaded:
+                self._loaded.move_to_end(name)
+                event = "hit"
+            else:
+                self._load(name)
+                event = "load"
+            self._in_use[name] += 1
+            self._evict()
+        metrics.observe_adapter_switch(event, time.perf_counter() - start)
+
+    def release(self, name: str):
+        with self.owner.forward_lock, self._lock:
+            self._in_use[name] -= 1
+            if self._in_use[name] <= 0:
+                del self._in_use[name]
+            self._evict()
+
+    def forward_kwargs(self, names: List[Optional[str]]) -> Dict[str, Any]:
+        # Selects an adapter per row so requests for different adapters share
+        # one forward pass; nothing to select until an adapter is attached
+        if not self._loaded:
+            return {}
+        return {"adapter_names": [name or BASE_ADAPTER for name in names]}
+
+    def _load(self, name: str):
+        # Imported here so serving without adapters does not need peft
+        from peft import PeftModel
+
+        path = self.path(name)
+        logger.info("Loading adapter %s from %s", name, path)
+        try:
+            if isinstance(self.owner.model, PeftModel):
+                self.owner.model.load_adapter(str(path), adapter_name=name)
+            else:
+                self.owner.model = PeftModel.from_pretrained(self.owner.model, str(path), adapter_name=name)
+        except Exception as e:
+            logger.error("Failed to load adapter %s: %s", name, e)
+            raise
+        self.owner.model.eval()
+
+        size = sum(
+            param.numel() * param.element_size()
+            for param_name, param in self.owner.model.named_parameters()
+            if "lora_" in param_name and param_name.endswith(f".{name}.weight")
+        )
+        self._loaded[name] = size
+        self.bytes += size
+        metrics.update_adapter_memory(self.bytes, len(self._loaded))
+
+    def _evict(self):
+        # Least recently used first; adapters serving a request stay
+        for name in list(self._loaded):
+            if self.bytes <= self.max_bytes:
+                break
+            if name not in self._in_use:
+                self.unload(name)
+                metrics.track_adapter_eviction()
+
+    def unload(self, name: str):
+        with self.owner.forward_lock, self._lock:
+            if name not in self._loaded:
+                return
+            if name in self._in_use:
+                raise RuntimeError(f"Adapter {name} is serving requests")
+            logger.info("Unloading adapter %s", name)
+            if len(self._loaded) == 1:
+                # peft needs at least one adapter; drop the wrapper instead
+                self.owner.model = self.owner.model.unload()
+            else:
+                self.owner.model.delete_adapter(name)
+            self.bytes -= self._loaded.pop(name)
+            metrics.update_adapter_memory(self.bytes, len(self._loaded))
@@ -1,14 +1,49 @@
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
 
 import torch
-from transformers import AutoModelForCausalLM, AutoTokenizer
+from transformers import (
+    AutoModelForCausalLM,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer,
+)
 
-from src.utils.logger import get_logger
+from src.models.inference.adapters import AdapterManager
+from src.models.inference.loader import ModelLoader, load_phase
+from src.models.inference.prefix_cache import PrefixCache, cache_tensors, make_cache
 from src.models.model_config import InferenceConfig, ModelConfig
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
 
 logger = get_logger(__name__)
 
 
+class _StopOnEvent(StoppingCriteria):
+    def __init__(self, event: threading.Event):
+        self.event = event
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor, **kwargs) -> bool:
+        return self.event.is_set()
+
+
+class _ForwardCounter:
+    # Forward passes made by the calling thread, to account for the draft
+    # tokens a speculative generate() proposed and the target verified
+    def __init__(self, module: torch.nn.Module):
+        self._local = threading.local()
+        module.register_forward_hook(self._hook)
+
+    def _hook(self, module: torch.nn.Module, args: Any, output: Any):
+        self._local.count = self.count + 1
+
+    @property
+    def count(self) -> int:
+        return getattr(self._local, "count", 0)
+
+
 class BaseModel:
     def __init__(
         self,
@@ -20,29 +55,108 @@ class BaseModel:
         self.device = torch.device(
             "cuda" if torch.cuda.is_available() else "cpu",
         )
+        self.loader = ModelLoader(model_config)
+        self.model: Any = None
+        self.draft_model: Any = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        # Held for every forward pass and while adapters are attached or
+        # detached, so modules are never rewritten under a running forward
+        self.forward_lock = threading.RLock()
 
-        self._load_model()
+        # The tokenizer and config are enough to build prompts before the
+        # weights are in
         self._load_tokenizer()
+        self.prefix_cache = (
+            PrefixCache(model_config.prefix_cache_bytes) if model_config.prefix_cache_bytes > 0 else None
+        )
+        self.adapters = (
+            AdapterManager(self, model_config.adapter_dir, model_config.adapter_cache_bytes)
+            if model_config.adapter_dir
+            else None
+        )
+        if not model_config.lazy_load:
+            self.load()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self):
+        # Safe to call from any thread; only the first call loads
+        with self._load_lock:
+            if self._loaded:
+                return
+            start = time.perf_counter()
+            self._load_model()
+            if self.model_config.on_cpu:
+                self._optimize_for_cpu()
+            self._load_draft_model()
+            # device_map decides where the weights live; inputs must follow them
+            self.device = self.model.device
+            self._loaded = True
+        metrics.observe_model_load_phase("total", time.perf_counter() - start)
+        metrics.update_model_loaded(True)
 
     def _load_model(self):
         logger.info("Loading model %s", self.model_config.model_name)
         try:
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_config.model_name,
-                **self.model_config.to_transformers_config(),
-            )
+            self.model = self.loader.load_model(self.tokenizer)
         except Exception as e:
             logger.error("Failed to load model: %s", e)
             raise
 
+    def _optimize_for_cpu(self):
+        if self.model_config.cpu_threads > 0:
+            torch.set_num_threads(self.model_config.cpu_threads)
+
+        if self.model_config.quantization_bits:
+            # int8 weights with activations quantized on the fly; 4-bit has no
+            # CPU kernel, so it also maps to int8 here.
+            logger.info("Applying dynamic int8 quantization to linear layers")
+            with load_phase("quantize"):
+                self.model = torch.ao.quantization.quantize_dynamic(
+                    self.model,
+                    {torch.nn.Linear},
+                    dtype=torch.qint8,
+                    inplace=True,
+                )
+
+        if self.model_config.compile:
+            if hasattr(torch, "compile"):
+                logger.info("Compiling model forward with torch.compile")
+                # Prompt and cache lengths change every call
+                self.model.forward = torch.compile(self.model.forward, dynamic=True)
+            else:
+                logger.warning("torch.compile is not available in torch %s", torch.__version__)
+
+        self.model.eval()
+
+    def _load_draft_model(self):
+        if not self.model_config.draft_model_name:
+            return
+
+        logger.info("Loading draft model %s", self.model_config.draft_model_name)
+        try:
+            # The draft shares the target's tokenizer and runs beside it
+            with load_phase("draft_model"):
+                self.draft_model = AutoModelForCausalLM.from_pretrained(
+                    self.model_config.draft_model_name,
+                    torch_dtype=self.model.dtype,
+                    low_cpu_mem_usage=self.model_config.low_cpu_mem_usage,
+                ).to(self.model.device)
+        except Exception as e:
+            logger.error("Failed to load draft model: %s", e)
+            raise
+        self.draft_model.eval()
+        self.draft_model.generation_config.num_assistant_tokens = self.model_config.num_draft_tokens
+        self._target_calls = _ForwardCounter(self.model)
+        self._draft_calls = _ForwardCounter(self.draft_model)
+
     def _load_tokenizer(self):
         logger.info("Loading tokenizer for %s", self.model_config.model_name)
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained(
-                self.model_config.model_name,
-                revision=self.model_config.revision,
-                use_fast=True,
-            )
+            self.tokenizer = self.loader.load_tokenizer()
             self.tokenizer.pad_token = self.tokenizer.eos_token
         except Exception as e:
             logger.error("Failed to load tokenizer: %s", e)
@@ -53,9 +167,11 @@ class BaseModel:
         self,
         prompt: str,
         max_new_tokens: Optional[int] = None,
+        adapter: Optional[str] = None,
         **kwargs,
     ) -> List[str]:
         try:
+            self.load()
             inputs = self.tokenizer(
                 prompt,
                 return_tensors="pt",
@@ -64,12 +180,22 @@ class BaseModel:
                 max_length=self.model_config.max_sequence_length,
             ).to(self.device)
 
-            generate_config = self.inference_config.to_generate_config()
-            if max_new_tokens is not None:
-                generate_config["max_new_tokens"] = max_new_tokens
-            generate_config.update(kwargs)
-
-            outputs = self.model.generate(**inputs, **generate_config)
+            generate_config = self._generate_config(max_new_tokens, **kwargs)
+            with self.forward_lock, self._use_adapter(adapter) as adapter_names:
+                if adapter is not None:
+                    # The draft model has no copy of the adapter
+                    generate_config["assistant_model"] = None
+                if adapter_names:
+                    rows = len(inputs["input_ids"]) * generate_config["num_return_sequences"]
+                    generate_config["adapter_names"] = adapter_names * rows
+                if (
+                    self.prefix_cache is not None
+                    and generate_config["num_return_sequences"] == 1
+                    and generate_config.get("assistant_model") is None
+                ):
+                    outputs = self._generate_with_prefix_cache(inputs, generate_config, namespace=adapter or "")
+                else:
+                    outputs = self._run_generate(**inputs, **generate_config)
 
             return self.tokenizer.batch_decode(
                 outputs,
@@ -80,15 +206,152 @@ class BaseModel:
             logger.error("Generation failed: %s", e)
             raise
 
+    def _generate_with_prefix_cache(
+        self,
+        inputs: Dict[str, torch.Tensor],
+        generate_config: Dict[str, Any],
+        namespace: str = "",
+    ) -> torch.Tensor:
+        token_ids = inputs["input_ids"][0].tolist()
+        _, tensors = self.prefix_cache.lookup(token_ids, namespace)
+        if tensors is not None:
+            # generate() only runs the prompt tokens past the cached prefix
+            generate_config["past_key_values"] = make_cache(tensors)
+        outputs = self.model.generate(**inputs, **generate_config, return_dict_in_generate=True)
+
+        length = self.prefix_cache.observe(token_ids, namespace)
+        if length:
+            self.prefix_cache.store(
+                token_ids[:length],
+                [(k[:, :, :length], v[:, :, :length]) for k, v in cache_tensors(outputs.past_key_values)],
+                namespace,
+            )
+        return outputs.sequences
+
+    @contextmanager
+    def _use_adapter(self, adapter: Optional[str]) -> Iterator[List[str]]:
+        # Entered with forward_lock held on the thread that runs the forward
+        # pass. Keeps the adapter attached for the duration and yields the
+        # adapter name for this request's rows; once any adapter is attached
+        # peft would apply it to unnamed rows, so base rows get __base__.
+        if adapter is not None:
+            if self.adapters is None:
+                raise KeyError(f"Unknown adapter: {adapter}")
+            self.adapters.acquire(adapter)
+        try:
+            forward_kwargs = self.adapters.forward_kwargs([adapter]) if self.adapters is not None else {}
+            yield forward_kwargs.get("adapter_names", [])
+        finally:
+            if adapter is not None:
+                self.adapters.release(adapter)
+
+    def _run_generate(self, **kwargs) -> torch.Tensor:
+        if kwargs.get("assistant_model") is None:
+            return self.model.generate(**kwargs)
+
+        steps, proposed = self._target_calls.count, self._draft_calls.count
+        outputs = self.model.generate(**kwargs)
+        # Every target pass verifies the draft tokens and adds one of its own,
+        # so the tokens beyond one per pass are accepted draft tokens.
+        steps = self._target_calls.count - steps
+        proposed = self._draft_calls.count - proposed
+        generated = outputs.shape[1] - kwargs["input_ids"].shape[1]
+        metrics.track_speculative_decoding(proposed, min(max(generated - steps, 0), proposed))
+        return outputs
+
+    def _generate_config(self, max_new_tokens: Optional[int] = None, **kwargs) -> Dict[str, Any]:
+        generate_config = self.inference_config.to_generate_config()
+        # The inference defaults carry GPT-2 token ids; use the loaded tokenizer's
+        generate_config["pad_token_id"] = self.tokenizer.pad_token_id
+        generate_config["eos_token_id"] = self.tokenizer.eos_token_id
+        if max_new_tokens is not None:
+            generate_config["max_new_tokens"] = max_new_tokens
+        generate_config.update(kwargs)
+        # Assisted generation is single-sequence; pass assistant_model=None to skip it
+        if self.draft_model is not None and generate_config["num_return_sequences"] == 1:
+            generate_config.setdefault("assistant_model", self.draft_model)
+        return generate_config
+
+    def generate_stream(
+        self,
+        prompt: str,
+        max_new_tokens: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None,
+        adapter: Optional[str] = None,
+        **kwargs,
+    ) -> Iterator[str]:
+        self.load()
+        inputs = self.tokenizer(
+            prompt,
+            return_tensors="pt",
+            truncation=True,
+            max_length=self.max_sequence_length,
+        ).to(self.device)
+
+        streamer = TextIteratorStreamer(
+            self.tokenizer,
+            skip_prompt=True,
+            skip_special_tokens=True,
+        )
+        stop_event = stop_event or threading.Event()
+        generate_config = self._generate_config(max_new_tokens, **kwargs)
+        generate_config["num_return_sequences"] = 1
+
+        errors: List[Exception] = []
+
+        def run():
+            try:
+                # The adapter is attached on this thread, which runs the forward passes
+                with torch.inference_mode(), self.forward_lock, self._use_adapter(adapter) as adapter_names:
+                    if adapter is not None:
+                        generate_config["assistant_model"] = None
+                    if adapter_names:
+                        generate_config["adapter_names"] = adapter_names * len(inputs["input_ids"])
+                    self._run_generate(
+                        **inputs,
+                        **generate_config,
+                        streamer=streamer,
+                        stopping_criteria=StoppingCriteriaList([_StopOnEvent(stop_event)]),
+                    )
+            except Exception as e:
+                logger.error("Streaming generation failed: %s", e)
+                errors.append(e)
+                streamer.end()
+
+        # generate() blocks until the last token, so it runs on its own thread
+        # and the streamer hands decoded text back as soon as it is sampled.
+        thread = threading.Thread(target=run, name="generate-stream", daemon=True)
+        thread.start()
+        try:
+            yield from streamer
+            if errors:
+                raise errors[0]
+        finally:
+            # Stops generation early if the consumer goes away mid-stream
+            stop_event.set()
+            thread.join()
+
     def get_model_info(self) -> Dict[str, Any]:
         return {
             "model_name": self.model_config.model_name,
             "revision": self.model_config.revision,
             "device": str(self.device),
-            "quantization": f"{self.model_config.quantization_bits}-bit",
+            "quantization": self._quantization_name(),
             "max_sequence_length": self.model_config.max_sequence_length,
+            "loaded": self.loaded,
+            "adapters": self.adapters.loaded if self.adapters is not None else [],
         }
 
+    def _quantization_name(self) -> str:
+        if not self.model_config.quantization_bits:
+            return "none"
+        if self.model_config.on_cpu:
+            return "dynamic-int8"
+        return f"{self.model_config.quantization_bits}-bit"
+
     @property
     def max_sequence_length(self) -> int:
-        return self.model_config.max_sequence_length
+        max_positions = getattr(self.loader.config, "max_position_embeddings", None)
+        if max_positions is None:
+            return self.model_config.max_sequence_length
+        return min(self.model_config.max_sequence_length, max_positions)
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from transformers import AutoConfig, AutoModelForCausalLM, AutoTokenizer
+
+from src.models.model_config import ModelConfig
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+# Bump when the artifact layout changes
+_ARTIFACT_VERSION = 1
+_MANIFEST = "artifact.json"
+
+
+@contextmanager
+def load_phase(phase: str) -> Iterator[None]:
+    start = time.perf_counter()
+    yield
+    seconds = time.perf_counter() - start
+    metrics.observe_model_load_phase(phase, seconds)
+    logger.info("Model load phase %s took %.2fs", phase, seconds)
+
+
+class ModelLoader:
+    # Keeps the weights as safetensors in artifact_dir, already in the dtype
+    # (and on GPU the bitsandbytes quantization) they are served in, together
+    # with the config and tokenizer. Later starts skip the hub and the
+    # conversion; as no cast is needed, CPU weights stay memory-mapped and
+    # processes serving the same artifact share its pages.
+
+    def __init__(self, model_config: ModelConfig):
+        self.model_config = model_config
+        self.artifact_dir = Path(model_config.artifact_dir) if model_config.artifact_dir else None
+
+    @cached_property
+    def artifact_path(self) -> Optional[Path]:
+        if self.artifact_dir is None:
+            return None
+        key = {
+            "version": _ARTIFACT_VERSION,
+            "model_name": self.model_config.model_name,
+            "revision": self.model_config.revision,
+            "torch_dtype": str(self.model_config.load_dtype),
+            # CPU quantization is applied after every load
+            "quantization_bits": 0 if self.model_config.on_cpu else self.model_config.quantization_bits,
+        }
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "--", self.model_config.model_name).strip("-")
+        return self.artifact_dir / f"{name}-{digest}"
+
+    @property
+    def cached(self) -> bool:
+        return self.artifact_path is not None and (self.artifact_path / _MANIFEST).is_file()
+
+    @cached_property
+    def config(self) -> Any:
+        with load_phase("config"):
+            if self.cached:
+                return AutoConfig.from_pretrained(self.artifact_path)
+            return self.model_config.transformers_config
+
+    def load_tokenizer(self) -> Any:
+        with load_phase("tokenizer"):
+            if self.cached:
+                return AutoTokenizer.from_pretrained(self.artifact_path, use_fast=True)
+            return AutoTokenizer.from_pretrained(
+                self.model_config.model_name,
+                revision=self.model_config.revision,
+                use_fast=True,
+            )
+
+    def load_model(self, tokenizer: Any = None) -> Any:
+        if self.cached:
+            logger.info("Loading model from artifact %s", self.artifact_path)
+            with load_phase("weights"):
+                return AutoModelForCausalLM.from_pretrained(self.artifact_path, **self._artifact_kwargs())
+
+        kwargs = {**self.model_config.to_transformers_config(), "config": self.config}
+        with load_phase("weights"):
+            model = AutoModelForCausalLM.from_pretrained(
+                self.model_config.model_name,
+                revision=self.model_config.revision,
+                **kwargs,
+            )
+        if self.artifact_path is not None:
+            with load_phase("convert"):
+                self._save_artifact(model, tokenizer)
+        return model
+
+    def _artifact_kwargs(self) -> Dict[str, Any]:
+        # A pre-quantized artifact carries its quantization config
+        return {
+            "config": self.config,
+            "device_map": None if self.model_config.on_cpu else self.model_config.device_map,
+            "torch_dtype": self.model_config.load_dtype,
+            "low_cpu_mem_usage": self.model_config.low_cpu_mem_usage,
+        }
+
+    def _save_artifact(self, model: Any, tokenizer: Any):
+        target = self.artifact_path
+        # Replicas starting together each write their own copy; the first
+        # to finish wins
+        staging = target.with_name(f"{target.name}.tmp-{os.getpid()}")
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            model.save_pretrained(staging, safe_serialization=True)
+            if tokenizer is not None:
+                tokenizer.save_pretrained(staging)
+            manifest = {
+                "model_name": self.model_config.model_name,
+                "revision": self.model_config.revision,
+                "torch_dtype": str(self.model_config.load_dtype),
+                "quantization_bits": 0 if self.model_config.on_cpu else self.model_config.quantization_bits,
+            }
+            (staging / _MANIFEST).write_text(json.dumps(manifest))
+            if (target / _MANIFEST).is_file():
+                shutil.rmtree(staging)
+                return
+            shutil.rmtree(target, ignore_errors=True)
+            staging.rename(target)
+            logger.info("Cached model artifact in %s", target)
+        except Exception as e:
+            # Serving works without the cache; the next start tries again
+            logger.warning("Failed to cache model artifact in %s: %s", target, e)
+            shutil.rmtree(staging, ignore_errors=True)
@@ -0,0 +1,118 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import torch
+from transformers import DynamicCache
+
+from src.utils.metrics import metrics
+
+KVTensors = List[Tuple[torch.Tensor, torch.Tensor]]
+
+
+def cache_tensors(cache: Any) -> KVTensors:
+    # Per-layer (key, value) pairs across the transformers cache layouts
+    if hasattr(cache, "layers"):
+        return [(layer.keys, layer.values) for layer in cache.layers]
+    if hasattr(cache, "key_cache"):
+        return list(zip(cache.key_cache, cache.value_cache))
+    return [(layer[0], layer[1]) for layer in cache]
+
+
+def make_cache(tensors: KVTensors) -> Any:
+    if hasattr(DynamicCache, "from_legacy_cache"):
+        return DynamicCache.from_legacy_cache(tuple(tensors))
+    return DynamicCache(tensors)
+
+
+class PrefixCache:
+    def __init__(
+        self,
+        max_bytes: int,
+        block_size: int = 16,
+        min_hits: int = 2,
+        max_tracked_prefixes: int = 10_000,
+    ):
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.min_hits = min_hits
+        self.max_tracked_prefixes = max_tracked_prefixes
+        self.bytes = 0
+
+        self._entries: OrderedDict[str, Tuple[KVTensors, int]] = OrderedDict()
+        # How often each block-aligned prefix has been seen, so only prefixes
+        # shared between requests are worth device memory.
+        self._seen: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _prefix_keys(self, token_ids: List[int], namespace: str = "") -> List[Tuple[int, str]]:
+        # One key per block boundary, each covering every token before it.
+        # The namespace keeps keys/values computed under different weights,
+        # e.g. LoRA adapters, apart.
+        ids = np.asarray(token_ids, dtype=np.int64)
+        digest = hashlib.blake2b(namespace.encode("utf-8"), digest_size=16)
+        keys = []
+        for end in range(self.block_size, len(ids) + 1, self.block_size):
+            digest.update(ids[end - self.block_size : end].tobytes())
+            keys.append((end, digest.hexdigest()))
+        return keys
+
+    def lookup(self, token_ids: List[int], namespace: str = "") -> Tuple[int, Optional[KVTensors]]:
+        # At least one prompt token has to run through the model for logits
+        keys = self._prefix_keys(token_ids[:-1], namespace)
+        with self._lock:
+            for length, key in reversed(keys):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    metrics.track_prefix_cache("hit", saved_tokens=length)
+                    return length, entry[0]
+        metrics.track_prefix_cache("miss")
+        return 0, None
+
+    def observe(self, token_ids: List[int], namespace: str = "") -> int:
+        # Returns the length of a newly frequent prefix the caller should store
+        deepest = None
+        with self._lock:
+            for length, key in self._prefix_keys(token_ids[:-1], namespace):
+                count = self._seen.pop(key, 0) + 1
+                self._seen[key] = count
+                if count >= self.min_hits:
+                    deepest = (length, key)
+            while len(self._seen) > self.max_tracked_prefixes:
+                self._seen.popitem(last=False)
+            if deepest is None or deepest[1] in self._entries:
+                return 0
+        return deepest[0]
+
+    def store(self, token_ids: List[int], tensors: KVTensors, namespace: str = ""):
+        _, key = self._prefix_keys(token_ids, namespace)[-1]
+        # Copy so a slice does not keep the whole batch cache alive
+        tensors = [(k.clone(), v.clone()) for k, v in tensors]
+        size = sum(k.numel() * k.element_size() + v.numel() * v.element_size() for k, v in tensors)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (tensors, size)
+            self.bytes += size
+            metrics.track_prefix_cache("store")
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                metrics.track_prefix_cache("eviction")
+            metrics.update_prefix_cache_size(self.bytes)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._seen.clear()
+            self.bytes = 0
+        metrics.update_prefix_cache_size(0)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,40 @@
+from typing import Any, List, Tuple
+
+RAG_INSTRUCTIONS = (
+    "You are a clinical assistant. Answer the question using only the context below. "
+    "If the context does not contain the answer, say that you do not know."
+)
+# Context chunks cut below this many tokens carry too little to be worth including
+MIN_CONTEXT_TOKENS = 32
+
+
+def build_rag_prompt(
+    tokenizer: Any,
+    question: str,
+    contexts: List[str],
+    max_tokens: int,
+) -> Tuple[str, int]:
+    def count(text: str) -> int:
+        return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    header = f"{RAG_INSTRUCTIONS}\n\nContext:\n"
+    footer = f"\nQuestion: {question}\nAnswer:"
+    # Room for special tokens and merges across the pieces counted separately
+    budget = max_tokens - count(header) - count(footer) - 8
+    if budget < 0:
+        raise ValueError(f"Question does not fit in the {max_tokens}-token prompt budget")
+
+    # Contexts arrive most relevant first, so the least relevant are dropped
+    sections = []
+    for number, context in enumerate(contexts, 1):
+        section = f"[{number}] {context}\n"
+        tokens = count(section)
+        if tokens > budget:
+            if budget >= MIN_CONTEXT_TOKENS:
+                input_ids = tokenizer(section, add_special_tokens=False)["input_ids"][:budget]
+                sections.append(tokenizer.decode(input_ids, skip_special_tokens=True).rstrip() + "\n")
+            break
+        sections.append(section)
+        budget -= tokens
+
+    return header + "".join(sections) + footer, len(sections)
@@ -0,0 +1,450 @@
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import torch
+from torch.nn.functional import pad
+
+from src.models.inference.base_model import BaseModel
+from src.models.inference.prefix_cache import KVTensors, cache_tensors, make_cache
+from src.utils.logger import get_logger
+from src.utils.metrics import metrics
+
+logger = get_logger(__name__)
+
+_DONE = object()
+
+
+class SchedulerOverloadedError(RuntimeError):
+    pass
+
+
+@dataclass
+class SamplingParams:
+    temperature: float = 0.7
+    top_p: float = 0.95
+    top_k: int = 50
+    repetition_penalty: float = 1.1
+    do_sample: bool = True
+
+
+@dataclass
+class GenerationHandle:
+    prompt: str
+    max_new_tokens: int
+    sampling: SamplingParams
+    loop: asyncio.AbstractEventLoop
+    # LoRA adapter the request runs through; None is the base model
+    adapter: Optional[str] = None
+    submitted_at: float = field(default_factory=time.perf_counter)
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    cancelled: bool = False
+
+    # Filled in by the scheduler thread
+    prompt_ids: List[int] = field(default_factory=list)
+    token_ids: List[int] = field(default_factory=list)
+    admitted_at: Optional[float] = None
+    time_to_first_token: Optional[float] = None
+    _emitted: int = 0
+
+    @property
+    def generated_tokens(self) -> int:
+        return len(self.token_ids)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _publish(self, item: Any):
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, item)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        try:
+            while True:
+                item = await self.queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.cancel()
+
+
+class InferenceScheduler:
+    def __init__(
+        self,
+        model: BaseModel,
+        max_batch_size: int = 32,
+        max_concurrent_requests: int = 10,
+        max_queued_requests: int = 100,
+        preload: bool = True,
+    ):
+        self.model = model
+        self.tokenizer = model.tokenizer
+        # Prompts in a prefill batch are aligned on their last token, and an
+        # over-long prompt loses its oldest context rather than the question.
+        self.tokenizer.padding_side = "left"
+        self.tokenizer.truncation_side = "left"
+        self.max_batch_size = max_batch_size
+        self.max_concurrent_requests = max_concurrent_requests
+        self.max_queued_requests = max_queued_requests
+        self.eos_token_id = self.tokenizer.eos_token_id
+        self.prefix_cache = model.prefix_cache
+        # Without preload, weights not yet loaded load with the first request
+        self.preload = preload
+
+        self._slots = asyncio.Semaphore(max_concurrent_requests)
+        self._waiting = 0
+        self._pending: queue.Queue[Optional[GenerationHandle]] = queue.Queue()
+        self._closed = False
+
+        # Batch state, only touched by the scheduler thread
+        self._active: List[GenerationHandle] = []
+        self._cache: Any = None
+        self._attention_mask: Optional[torch.Tensor] = None
+
+        self._thread = threading.Thread(target=self._run, name="inference-scheduler", daemon=True)
+        self._thread.start()
+
+    def default_sampling(self) -> SamplingParams:
+        config = self.model.inference_config
+        return SamplingParams(
+            temperature=config.temperature,
+            top_p=config.top_p,
+            top_k=config.top_k,
+            repetition_penalty=config.repetition_penalty,
+            do_sample=config.do_sample,
+        )
+
+    async def submit(
+        self,
+        prompt: str,
+        max_new_tokens: Optional[int] = None,
+        adapter: Optional[str] = None,
+        **sampling,
+    ) -> GenerationHandle:
+        if self._closed:
+            raise RuntimeError("Inference scheduler is closed")
+        if adapter is not None:
+            if self.model.adapters is None:
+                raise KeyError(f"Unknown adapter: {adapter}")
+            self.model.adapters.path(adapter)
+        # Beyond max_concurrent_requests callers wait for a slot; beyond the
+        # queue bound they are turned away instead of piling up.
+        if self._slots.locked() and self._waiting >= self.max_queued_requests:
+            raise SchedulerOverloadedError(f"More than {self.max_queued_requests} generation requests are queued")
+
+        params = self.default_sampling()
+        for name, value in sampling.items():
+            setattr(params, name, value)
+        handle = GenerationHandle(
+            prompt=prompt,
+            max_new_tokens=max_new_tokens or self.model.inference_config.max_new_tokens,
+            sampling=params,
+            loop=asyncio.get_running_loop(),
+            adapter=adapter,
+        )
+
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        self._pending.put(handle)
+        return handle
+
+    def _release(self, handle: GenerationHandle):
+        handle.loop.call_soon_threadsafe(self._slots.release)
+
+    def _finish(self, handle: GenerationHandle, error: Optional[Exception] = None):
+        if error is None and handle.admitted_at is not None and handle.token_ids:
+            elapsed = time.perf_counter() - handle.admitted_at
+            metrics.track_tokens("generation", len(handle.token_ids))
+            metrics.observe_generation_throughput(len(handle.token_ids) / max(elapsed, 1e-9))
+        if handle.adapter is not None and handle.admitted_at is not None:
+            self.model.adapters.release(handle.adapter)
+        handle._publish(error if error is not None else _DONE)
+        self._release(handle)
+
+    def _run(self):
+        if self.preload:
+            try:
+                self.model.load()
+            except Exception as e:
+                # Retried when the first request arrives
+                logger.error("Model preload failed: %s", e)
+        while not self._closed:
+            admitted = []
+            try:
+                admitted = self._admit()
+                if admitted:
+                    self._prefill(admitted)
+                if self._active:
+                    self._decode_step()
+            except Exception as e:
+                logger.error("Inference step failed: %s", e)
+                for handle in {id(h): h for h in self._active + admitted}.values():
+                    self._finish(handle, e)
+                self._reset()
+
+    def _admit(self) -> List[GenerationHandle]:
+        admitted = []
+        free = self.max_batch_size - len(self._active)
+        while free > 0:
+            try:
+                # Only block when idle; otherwise keep decoding the running batch
+                handle = self._pending.get(block=not self._active and not admitted)
+            except queue.Empty:
+                break
+            if handle is None:
+                break
+            if handle.cancelled:
+                self._release(handle)
+                continue
+            try:
+                self.model.load()
+            except Exception as e:
+                self._finish(handle, e)
+                continue
+            if handle.adapter is not None:
+                # Attaching an adapter rewrites the model's modules, so it
+                # happens here between forward passes
+                try:
+                    self.model.adapters.acquire(handle.adapter)
+                except Exception as e:
+                    self._finish(handle, e)
+                    continue
+            handle.admitted_at = time.perf_counter()
+            metrics.observe_inference_queue_wait(handle.admitted_at - handle.submitted_at)
+            admitted.append(handle)
+            free -= 1
+        return admitted
+
+    @torch.inference_mode()
+    def _prefill(self, handles: List[GenerationHandle]):
+        max_prompt_tokens = self.model.max_sequence_length - 1
+        encoded = self.tokenizer(
+            [handle.prompt for handle in handles],
+            truncation=True,
+            max_length=max_prompt_tokens,
+        )
+        prefixes = []
+        for handle, ids in zip(handles, encoded["input_ids"]):
+            handle.prompt_ids = ids
+            prefixes.append(
+                self.prefix_cache.lookup(ids, handle.adapter or "") if self.prefix_cache is not None else (0, None)
+            )
+
+        # Each row is [padding, cached prefix, padding, uncached suffix]; the
+        # mask hides both gaps and positions count only real tokens.
+        past_len = max(length for length, _ in prefixes)
+        input_len = max(len(handle.prompt_ids) - length for handle, (length, _) in zip(handles, prefixes))
+        input_ids = torch.full((len(handles), input_len), self.tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(handles), past_len + input_len), dtype=torch.long)
+        for row, (handle, (length, _)) in enumerate(zip(handles, prefixes)):
+            suffix = handle.prompt_ids[length:]
+            input_ids[row, input_len - len(suffix) :] = torch.tensor(suffix)
+            attention_mask[row, past_len - length : past_len] = 1
+            attention_mask[row, past_len + input_len - len(suffix) :] = 1
+        input_ids = input_ids.to(self.model.device)
+        attention_mask = attention_mask.to(self.model.device)
+
+        with self.model.forward_lock:
+            outputs = self.model.model(
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                position_ids=(attention_mask.cumsum(-1) - 1).clamp(min=0)[:, past_len:],
+                past_key_values=self._prefix_batch(prefixes, past_len) if past_len else None,
+                use_cache=True,
+                **self._adapter_kwargs(handles),
+            )
+        if self.prefix_cache is not None:
+            self._store_prefixes(handles, outputs.past_key_values, attention_mask)
+        self._merge(handles, outputs.past_key_values, attention_mask)
+        self._emit(handles, outputs.logits[:, -1, :])
+        # The first token may already end a sequence
+        self._retire()
+
+    def _prefix_batch(self, prefixes: List[Tuple[int, Optional[KVTensors]]], past_len: int) -> Any:
+        reference = next(tensors for _, tensors in prefixes if tensors is not None)
+        layers = []
+        for layer, (ref_k, ref_v) in enumerate(reference):
+            keys, values = [], []
+            for _, tensors in prefixes:
+                # Rows without a cached prefix get an all-padding past
+                k, v = tensors[layer] if tensors is not None else (ref_k[:, :, :0], ref_v[:, :, :0])
+                keys.append(pad(k, (0, 0, past_len - k.shape[2], 0)))
+                values.append(pad(v, (0, 0, past_len - v.shape[2], 0)))
+            layers.append((torch.cat(keys), torch.cat(values)))
+        return make_cache(layers)
+
+    def _store_prefixes(self, handles: List[GenerationHandle], cache: Any, attention_mask: torch.Tensor):
+        tensors = None
+        for row, handle in enumerate(handles):
+            length = self.prefix_cache.observe(handle.prompt_ids, handle.adapter or "")
+            if not length:
+                continue
+            if tensors is None:
+                tensors = cache_tensors(cache)
+            columns = attention_mask[row].nonzero().squeeze(-1)[:length]
+            self.prefix_cache.store(
+                handle.prompt_ids[:length],
+                [(k[row : row + 1, :, columns], v[row : row + 1, :, columns]) for k, v in tensors],
+                handle.adapter or "",
+            )
+
+    def _merge(self, handles: List[GenerationHandle], cache: Any, attention_mask: torch.Tensor):
+        if not self._active:
+            self._active = list(handles)
+            self._cache = cache
+            self._attention_mask = attention_mask
+            return
+
+        # Left-pad whichever side is shorter so all rows end on the same
+        # column, then stack the new sequences under the running ones.
+        running_len = self._attention_mask.shape[1]
+        new_len = attention_mask.shape[1]
+        length = max(running_len, new_len)
+        tensors = []
+        for (old_k, old_v), (new_k, new_v) in zip(cache_tensors(self._cache), cache_tensors(cache)):
+            old_pad, new_pad = (0, 0, length - running_len, 0), (0, 0, length - new_len, 0)
+            tensors.append(
+                (
+                    torch.cat([pad(old_k, old_pad), pad(new_k, new_pad)]),
+                    torch.cat([pad(old_v, old_pad), pad(new_v, new_pad)]),
+                )
+            )
+        self._cache = make_cache(tensors)
+        self._attention_mask = torch.cat(
+            [
+                pad(self._attention_mask, (length - running_len, 0)),
+                pad(attention_mask, (length - new_len, 0)),
+            ]
+        )
+        self._active.extend(handles)
+
+    @torch.inference_mode()
+    def _decode_step(self):
+        metrics.observe_batch_occupancy(len(self._active) / self.max_batch_size)
+        last_tokens = torch.tensor(
+            [[handle.token_ids[-1]] for handle in self._active],
+            device=self._attention_mask.device,
+        )
+        self._attention_mask = pad(self._attention_mask, (0, 1), value=1)
+        with self.model.forward_lock:
+            outputs = self.model.model(
+                input_ids=last_tokens,
+                attention_mask=self._attention_mask,
+                position_ids=self._attention_mask.sum(-1, keepdim=True) - 1,
+                past_key_values=self._cache,
+                use_cache=True,
+                **self._adapter_kwargs(self._active),
+            )
+        self._cache = outputs.past_key_values
+        self._emit(self._active, outputs.logits[:, -1, :])
+        self._retire()
+
+    def _adapter_kwargs(self, handles: List[GenerationHandle]) -> Dict[str, Any]:
+        # Rows for different adapters (and the base model) share the batch
+        if self.model.adapters is None:
+            return {}
+        return self.model.adapters.forward_kwargs([handle.adapter for handle in handles])
+
+    def _emit(self, handles: List[GenerationHandle], logits: torch.Tensor):
+        next_tokens = self._sample(handles, logits.float()).tolist()
+        now = time.perf_counter()
+        for handle, token in zip(handles, next_tokens):
+            if handle.cancelled:
+                continue
+            handle.token_ids.append(token)
+            if handle.time_to_first_token is None:
+                handle.time_to_first_token = now - handle.submitted_at
+                metrics.observe_time_to_first_token(handle.time_to_first_token)
+            # Decode the whole suffix so multi-token characters come out whole
+            text = self.tokenizer.decode(handle.token_ids, skip_special_tokens=True)
+            if len(text) > handle._emitted and not text.endswith("�"):
+                handle._publish(text[handle._emitted :])
+                handle._emitted = len(text)
+
+    def _sample(self, handles: List[GenerationHandle], logits: torch.Tensor) -> torch.Tensor:
+        device = logits.device
+        for row, handle in enumerate(handles):
+            penalty = handle.sampling.repetition_penalty
+            if penalty != 1.0:
+                seen = torch.tensor(handle.prompt_ids + handle.token_ids, device=device, dtype=torch.long)
+                scores = logits[row, seen]
+                logits[row, seen] = torch.where(scores < 0, scores * penalty, scores / penalty)
+
+        greedy = logits.argmax(-1)
+        if not any(handle.sampling.do_sample for handle in handles):
+            return greedy
+
+        temperature = torch.tensor([max(h.sampling.temperature, 1e-5) for h in handles], device=device)
+        top_k = torch.tensor([h.sampling.top_k or logits.shape[-1] for h in handles], device=device)
+        top_p = torch.tensor([h.sampling.top_p for h in handles], device=device)
+        do_sample = torch.tensor([h.sampling.do_sample for h in handles], device=device)
+
+        sorted_logits, sorted_ids = (logits / temperature[:, None]).sort(dim=-1, descending=True)
+        ranks = torch.arange(logits.shape[-1], device=device)
+        probs = sorted_logits.softmax(-1)
+        # Keep the top-k tokens and the smallest prefix whose mass reaches top-p
+        remove = (ranks[None, :] >= top_k[:, None]) | (probs.cumsum(-1) - probs > top_p[:, None])
+        sorted_logits = sorted_logits.masked_fill(remove, float("-inf"))
+        choice = torch.multinomial(sorted_logits.softmax(-1), 1)
+        sampled = sorted_ids.gather(-1, choice).squeeze(-1)
+        return torch.where(do_sample, sampled, greedy)
+
+    def _retire(self):
+        keep = []
+        for row, handle in enumerate(self._active):
+            finished = (
+                handle.cancelled
+                or handle.token_ids[-1] == self.eos_token_id
+                or len(handle.token_ids) >= handle.max_new_tokens
+                or len(handle.prompt_ids) + len(handle.token_ids) >= self.model.max_sequence_length
+            )
+            if finished:
+                self._finish(handle)
+            else:
+                keep.append(row)
+        if len(keep) == len(self._active):
+            return
+        if not keep:
+            self._reset()
+            return
+
+        index = torch.tensor(keep, device=self._attention_mask.device)
+        mask = self._attention_mask.index_select(0, index)
+        # Drop the left padding columns no remaining sequence needs
+        start = int(mask.any(0).nonzero()[0])
+        self._attention_mask = mask[:, start:]
+        self._cache = make_cache(
+            [
+                (k.index_select(0, index)[:, :, start:], v.index_select(0, index)[:, :, start:])
+                for k, v in cache_tensors(self._cache)
+            ]
+        )
+        self._active = [self._active[row] for row in keep]
+
+    def _reset(self):
+        self._active = []
+        self._cache = None
+        self._attention_mask = None
+
+    def close(self):
+        self._closed = True
+        self._pending.put(None)
+        self._thread.join()
+        for handle in self._active:
+            self._finish(handle, RuntimeError("Inference scheduler is closed"))
+        self._reset()
+        while True:
+            try:
+                handle = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if handle is not None:
+                self._finish(handle, RuntimeError("Inference scheduler is closed"))
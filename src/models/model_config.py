@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import Any, Dict
+from functools import cached_property
+from typing import Any, Dict, List, Optional
 
 import torch
 from transformers import AutoConfig
@@ -10,21 +11,66 @@ class ModelConfig:
     model_name: str
     revision: str
     quantization_bits: int
-    device_map: str = "auto"
+    max_sequence_length: int = 2048
+    device_map: Optional[str] = "auto"
+    # Device memory for reusable prompt prefix keys/values; 0 disables it
+    prefix_cache_bytes: int = 0
     torch_dtype: torch.dtype = torch.bfloat16
     low_cpu_mem_usage: bool = True
+    device: str = "cuda"
+    # Small model sharing the tokenizer that proposes tokens for the target
+    # to verify (assisted generation); None disables speculative decoding
+    draft_model_name: Optional[str] = None
+    num_draft_tokens: int = 5
+    # CPU only: intra-op threads (0 keeps torch's default) and torch.compile
+    cpu_threads: int = 0
+    compile: bool = False
+    # Directory of LoRA adapters (one sub-directory each, as ModelTrainer
+    # saves them) that requests can select; loaded ones share this budget
+    adapter_dir: Optional[str] = None
+    adapter_cache_bytes: int = 1024**3
+    # Loaded weights are kept here as safetensors for faster restarts; None
+    # always loads from the hub
+    artifact_dir: Optional[str] = None
+    # Defer loading the weights until BaseModel.load() is called
+    lazy_load: bool = False
 
-    def to_transformers_config(self) -> Dict[str, Any]:
-        config = AutoConfig.from_pretrained(
+    @property
+    def on_cpu(self) -> bool:
+        return self.device == "cpu"
+
+    @property
+    def load_dtype(self) -> torch.dtype:
+        # bitsandbytes needs CUDA; CPU quantization happens after loading
+        # and works on float32 weights.
+        if self.on_cpu and self.quantization_bits:
+            return torch.float32
+        return self.torch_dtype
+
+    @cached_property
+    def transformers_config(self) -> Any:
+        # Resolved once; every lookup otherwise goes back to the hub
+        return AutoConfig.from_pretrained(
             self.model_name,
             revision=self.revision,
         )
 
+    def to_transformers_config(self) -> Dict[str, Any]:
+        config = self.transformers_config
+
         # Set optimizations for inference
         config.use_cache = True
         config.output_attentions = False
         config.output_hidden_states = False
 
+        if self.on_cpu:
+            return {
+                "config": config,
+                "device_map": None,
+                "torch_dtype": self.load_dtype,
+                "low_cpu_mem_usage": self.low_cpu_mem_usage,
+            }
+
         return {
             "config": config,
             "device_map": self.device_map,
@@ -69,9 +115,17 @@ class TrainingConfig:
     weight_decay: float = 0.01
 
     # LoRA specific settings
+    use_lora: bool = True
     lora_r: int = 8
     lora_alpha: int = 32
     lora_dropout: float = 0.1
+    # None adapts every linear layer except the output head
+    lora_target_modules: Optional[List[str]] = None
+
+    # Memory savings: recompute activations in the backward pass and keep
+    # AdamW states in 8 bits (needs bitsandbytes)
+    gradient_checkpointing: bool = True
+    optim_8bit: bool = False
 
     def to_training_arguments(self) -> Dict[str, Any]:
         return {
@@ -85,4 +139,16 @@ class TrainingConfig:
             "logging_steps": 10,
             "save_steps": 1000,
             "eval_steps": 500,
+            "gradient_checkpointing": self.gradient_checkpointing,
+            "gradient_checkpointing_kwargs": {"use_reentrant": False},
+            "optim": "adamw_bnb_8bit" if self.optim_8bit else "adamw_torch",
+        }
+
+    def to_lora_config(self) -> Dict[str, Any]:
+        return {
+            "r": self.lora_r,
+            "lora_alpha": self.lora_alpha,
+            "lora_dropout": self.lora_dropout,
+            "target_modules": self.lora_target_modules or "all-linear",
+            "task_type": "CAUSAL_LM",
         }
@@ -0,0 +1,99 @@
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+import torch
+
+IGNORE_INDEX = -100
+
+
+def iter_packed_blocks(
+    sequences: Iterable[List[int]],
+    block_size: int,
+    eos_token_id: int,
+) -> Iterator[Tuple[List[int], List[int]]]:
+    # Documents are joined with EOS and cut into block_size rows. Positions
+    # restart at every document (and at every block a long document spills
+    # into) so attention stays inside a document.
+    block: List[int] = []
+    positions: List[int] = []
+    for ids in sequences:
+        ids = ids + [eos_token_id]
+        start = 0
+        while start < len(ids):
+            take = min(block_size - len(block), len(ids) - start)
+            block.extend(ids[start : start + take])
+            positions.extend(range(take))
+            start += take
+            if len(block) == block_size:
+                yield block, positions
+                block, positions = [], []
+    if block:
+        yield block, positions
+
+
+def pack_sequences(
+    examples: Dict[str, List[List[int]]],
+    block_size: int,
+    eos_token_id: int,
+) -> Dict[str, List[List[int]]]:
+    # Batched Dataset.map function
+    blocks = list(iter_packed_blocks(examples["input_ids"], block_size, eos_token_id))
+    return {
+        "input_ids": [input_ids for input_ids, _ in blocks],
+        "position_ids": [position_ids for _, position_ids in blocks],
+    }
+
+
+def _pad(rows: List[List[int]], length: int, value: int) -> torch.Tensor:
+    return torch.tensor([row + [value] * (length - len(row)) for row in rows], dtype=torch.long)
+
+
+def _padded_length(rows: List[List[int]], pad_to_multiple_of: int) -> int:
+    length = max(len(row) for row in rows)
+    return -(-length // pad_to_multiple_of) * pad_to_multiple_of
+
+
+class PackedSequenceCollator:
+    # No attention_mask: transformers derives block-diagonal attention from
+    # position_ids that restart at 0 (flash-attention 2, and the sdpa/eager
+    # masks in recent releases) as long as the model runs with use_cache=False.
+
+    def __init__(self, pad_token_id: int, pad_to_multiple_of: int = 8):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features: List[Dict[str, Any]]) -> Dict[str, torch.Tensor]:
+        input_ids = [feature["input_ids"] for feature in features]
+        length = _padded_length(input_ids, self.pad_to_multiple_of)
+        batch = {
+            "input_ids": _pad(input_ids, length, self.pad_token_id),
+            "position_ids": _pad([feature["position_ids"] for feature in features], length, 0),
+        }
+        # The first token of each document would be predicted from the one
+        # before it; padding is never a target.
+        labels = batch["input_ids"].clone()
+        labels[batch["position_ids"] == 0] = IGNORE_INDEX
+        for row, ids in enumerate(input_ids):
+            labels[row, len(ids) :] = IGNORE_INDEX
+        batch["labels"] = labels
+        return batch
+
+
+class DynamicPaddingCollator:
+    # Pads each batch to its longest row; pair with length-grouped sampling so
+    # rows in a batch have similar lengths.
+
+    def __init__(self, pad_token_id: int, pad_to_multiple_of: int = 8):
+        self.pad_token_id = pad_token_id
+        self.pad_to_multiple_of = pad_to_multiple_of
+
+    def __call__(self, features: List[Dict[str, Any]]) -> Dict[str, torch.Tensor]:
+        input_ids = [feature["input_ids"] for feature in features]
+        length = _padded_length(input_ids, self.pad_to_multiple_of)
+        attention_mask = _pad([[1] * len(ids) for ids in input_ids], length, 0)
+        # Masks by position rather than token id, since pad is often EOS
+        labels = _pad(input_ids, length, IGNORE_INDEX)
+        return {
+            "input_ids": _pad(input_ids, length, self.pad_token_id),
+            "attention_mask": attention_mask,
+            "labels": labels,
+        }
@@ -0,0 +1,194 @@
+import hashlib
+import itertools
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import pyarrow as pa
+from datasets import IterableDataset
+
+from src.models.document import Document
+from src.models.training.collators import iter_packed_blocks
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the row layout or the document formatting changes
+_CACHE_VERSION = 1
+_MANIFEST = "manifest.json"
+# Document JSON files; .txt as in ingestion.iter_records and the sample data
+_DOCUMENT_SUFFIXES = (".json", ".txt")
+
+_tokenizer: Any = None
+
+
+def format_document(document: Document) -> str:
+    return f"Title: {document.title}\n\nContent: {document.get_text_content()}"
+
+
+def _init_worker(tokenizer: Any):
+    global _tokenizer
+    _tokenizer = tokenizer
+
+
+def _tokenize_file(path: str, max_length: Optional[int] = None) -> Optional[List[int]]:
+    try:
+        document = Document.model_validate_json(Path(path).read_bytes())
+    except ValueError as e:
+        logger.warning("Skipping %s: %s", path, e)
+        return None
+    return _tokenizer(
+        format_document(document),
+        truncation=max_length is not None,
+        max_length=max_length,
+    )["input_ids"]
+
+
+def _iter_shards(shards: List[str]) -> Iterator[Dict[str, List[int]]]:
+    # Shards are memory-mapped, so only the current record batch is in RAM
+    for shard in shards:
+        with pa.memory_map(shard) as source:
+            reader = pa.ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                yield from reader.get_batch(index).to_pylist()
+
+
+class StreamingCorpus:
+    def __init__(
+        self,
+        data_dir: Path,
+        tokenizer: Any,
+        max_length: int,
+        packing: bool = True,
+        cache_dir: Optional[Path] = None,
+        workers: int = 4,
+        shard_size: int = 10_000,
+        tokenize_chunksize: int = 16,
+    ):
+        self.data_dir = Path(data_dir)
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.packing = packing
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.data_dir.parent / "tokenized"
+        self.workers = workers
+        self.shard_size = shard_size
+        self.tokenize_chunksize = tokenize_chunksize
+        self._path: Optional[Path] = None
+        self._manifest: Optional[Dict[str, Any]] = None
+
+    def _files(self) -> List[Path]:
+        return sorted(file for file in self.data_dir.rglob("*") if file.suffix in _DOCUMENT_SUFFIXES and file.is_file())
+
+    def fingerprint(self, files: List[Path]) -> str:
+        digest = hashlib.sha256()
+        backend = getattr(self.tokenizer, "backend_tokenizer", None)
+        # The serialized fast tokenizer covers vocab, merges and normalization
+        tokenizer_state = backend.to_str() if backend is not None else self.tokenizer.name_or_path
+        digest.update(tokenizer_state.encode("utf-8"))
+        config = {
+            "version": _CACHE_VERSION,
+            "max_length": self.max_length,
+            "packing": self.packing,
+            "eos_token_id": self.tokenizer.eos_token_id,
+        }
+        digest.update(json.dumps(config, sort_keys=True).encode("utf-8"))
+        # Edited, added or removed documents produce a new cache
+        for file in files:
+            stat = file.stat()
+            digest.update(f"{file.relative_to(self.data_dir)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+        return digest.hexdigest()[:32]
+
+    def build(self) -> Dict[str, Any]:
+        if self._manifest is not None:
+            return self._manifest
+
+        files = self._files()
+        target = self.cache_dir / self.fingerprint(files)
+        manifest_path = target / _MANIFEST
+        if manifest_path.exists():
+            logger.info("Using tokenized cache %s", target)
+            self._path, self._manifest = target, json.loads(manifest_path.read_text())
+            return self._manifest
+
+        logger.info("Tokenizing %d documents from %s into %s", len(files), self.data_dir, target)
+        # Written under a temporary name so an interrupted run is never reused
+        staging = target.with_name(target.name + ".tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+
+        shards: List[str] = []
+        rows = 0
+        for shard_rows in self._batched(self._rows(files), self.shard_size):
+            name = f"shard-{len(shards):05d}.arrow"
+            self._write_shard(staging / name, shard_rows)
+            shards.append(name)
+            rows += len(shard_rows)
+
+        manifest = {"shards": shards, "rows": rows, "documents": len(files)}
+        (staging / _MANIFEST).write_text(json.dumps(manifest))
+        shutil.rmtree(target, ignore_errors=True)
+        staging.rename(target)
+        logger.info("Tokenized cache ready: %d rows in %d shards", rows, len(shards))
+
+        self._path, self._manifest = target, manifest
+        return self._manifest
+
+    def _token_ids(self, files: List[Path]) -> Iterator[List[int]]:
+        # Packed documents are split across blocks instead of truncated
+        tokenize = partial(_tokenize_file, max_length=None if self.packing else self.max_length)
+        window = self.workers * self.tokenize_chunksize * 4
+        paths = iter(str(file) for file in files)
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.tokenizer,),
+        ) as pool:
+            while True:
+                # Executor.map submits its whole input, so feed it bounded windows
+                batch = list(itertools.islice(paths, window))
+                if not batch:
+                    break
+                for input_ids in pool.map(tokenize, batch, chunksize=self.tokenize_chunksize):
+                    if input_ids:
+                        yield input_ids
+
+    def _rows(self, files: List[Path]) -> Iterator[Dict[str, List[int]]]:
+        token_ids = self._token_ids(files)
+        if not self.packing:
+            for input_ids in token_ids:
+                yield {"input_ids": input_ids}
+            return
+        for input_ids, position_ids in iter_packed_blocks(token_ids, self.max_length, self.tokenizer.eos_token_id):
+            yield {"input_ids": input_ids, "position_ids": position_ids}
+
+    @staticmethod
+    def _batched(rows: Iterator[Dict[str, List[int]]], size: int) -> Iterator[List[Dict[str, List[int]]]]:
+        while True:
+            batch = list(itertools.islice(rows, size))
+            if not batch:
+                return
+            yield batch
+
+    @staticmethod
+    def _write_shard(path: Path, rows: List[Dict[str, List[int]]]):
+        columns = {name: pa.array([row[name] for row in rows], type=pa.list_(pa.int32())) for name in rows[0]}
+        table = pa.table(columns)
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=1024)
+
+    @property
+    def num_rows(self) -> int:
+        return self.build()["rows"]
+
+    def dataset(self, shuffle_buffer: int = 1000, seed: int = 42) -> IterableDataset:
+        manifest = self.build()
+        if not manifest["rows"]:
+            raise ValueError(f"No training documents found in {self.data_dir}")
+        shards = [str(self._path / name) for name in manifest["shards"]]
+        # A list in gen_kwargs lets datasets split shards across dataloader
+        # workers and shuffle their order each epoch
+        dataset = IterableDataset.from_generator(_iter_shards, gen_kwargs={"shards": shards})
+        return dataset.shuffle(seed=seed, buffer_size=shuffle_buffer)
@@ -0,0 +1,21 @@
+from typing import Any
+
+from src.models.model_config import TrainingConfig
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def apply_lora(model: Any, config: TrainingConfig) -> Any:
+    # Imported here so inference and full fine-tuning run without peft installed
+    from peft import LoraConfig, get_peft_model
+
+    if config.gradient_checkpointing:
+        # The frozen embeddings would otherwise give checkpointed blocks no
+        # input that requires grad
+        model.enable_input_require_grads()
+
+    model = get_peft_model(model, LoraConfig(**config.to_lora_config()))
+    trainable, total = model.get_nb_trainable_parameters()
+    logger.info("LoRA trains %d of %d parameters (%.2f%%)", trainable, total, 100 * trainable / total)
+    return model
@@ -1,4 +1,6 @@
-from typing import List
+import math
+from pathlib import Path
+from typing import Any, List, Optional
 
 import torch
 from datasets import Dataset
@@ -10,6 +12,13 @@ from transformers import (
 )
 
 from src.models.document import Document
+from src.models.model_config import TrainingConfig
+from src.models.training.collators import DynamicPaddingCollator, PackedSequenceCollator, pack_sequences
+from src.models.training.data import StreamingCorpus, format_document
+from src.models.training.lora import apply_lora
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 
 class ModelTrainer:
@@ -20,12 +29,20 @@ class ModelTrainer:
         batch_size: int = 4,
         learning_rate: float = 2e-5,
         num_epochs: int = 3,
+        packing: bool = True,
+        training_config: Optional[TrainingConfig] = None,
     ):
         self.model_name = model_name
         self.max_length = max_length
         self.batch_size = batch_size
         self.learning_rate = learning_rate
         self.num_epochs = num_epochs
+        # Packing fills every row with real tokens; otherwise rows are padded
+        # per batch and batched by similar length
+        self.packing = packing
+        # With a TrainingConfig, its arguments drive the Trainer and LoRA
+        # adapters are trained instead of the full model when use_lora is set
+        self.training_config = training_config
 
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.model = AutoModelForCausalLM.from_pretrained(
@@ -38,22 +55,26 @@ class ModelTrainer:
             self.tokenizer.pad_token = self.tokenizer.eos_token
             self.model.config.pad_token_id = self.tokenizer.eos_token_id
 
+        if training_config is not None and training_config.use_lora:
+            self.model = apply_lora(self.model, training_config)
+
     def prepare_document(self, document: Document) -> str:
-        title = document.title
-        content = document.get_text_content()
-        return f"Title: {title}\n\nContent: {content}"
+        return format_document(document)
 
     def create_dataset(self, documents: List[Document]) -> Dataset:
         texts = [self.prepare_document(doc) for doc in documents]
 
         def tokenize_function(examples):
-            return self.tokenizer(
+            # Packed documents are split across blocks instead of truncated
+            encoded = self.tokenizer(
                 examples["text"],
-                padding="max_length",
-                truncation=True,
-                max_length=self.max_length,
-                return_tensors="pt",
+                truncation=not self.packing,
+                max_length=None if self.packing else self.max_length,
             )
+            return {
+                "input_ids": encoded["input_ids"],
+                "length": [len(ids) for ids in encoded["input_ids"]],
+            }
 
         dataset = Dataset.from_dict({"text": texts})
         tokenized_dataset = dataset.map(
@@ -62,38 +83,117 @@ class ModelTrainer:
             remove_columns=["text"],
         )
 
+        if self.packing:
+            tokenized_dataset = tokenized_dataset.map(
+                pack_sequences,
+                batched=True,
+                remove_columns=tokenized_dataset.column_names,
+                fn_kwargs={"block_size": self.max_length, "eos_token_id": self.tokenizer.eos_token_id},
+            )
+
         return tokenized_dataset
 
+    def data_collator(self) -> Any:
+        if self.packing:
+            return PackedSequenceCollator(self.tokenizer.pad_token_id)
+        return DynamicPaddingCollator(self.tokenizer.pad_token_id)
+
+    def create_streaming_dataset(
+        self,
+        data_dir: Path,
+        cache_dir: Optional[Path] = None,
+        workers: int = 4,
+    ) -> StreamingCorpus:
+        return StreamingCorpus(
+            data_dir,
+            self.tokenizer,
+            self.max_length,
+            packing=self.packing,
+            cache_dir=cache_dir,
+            workers=workers,
+        )
+
     def train(
         self,
-        documents: List[Document],
+        documents: List[Document] | Path,
         output_dir: str = "output",
         save_steps: int = 500,
         logging_steps: int = 100,
+        cache_dir: Optional[Path] = None,
+        workers: int = 4,
     ):
-        dataset = self.create_dataset(documents)
+        # A directory of Document JSON files is streamed from a tokenized
+        # on-disk cache instead of being loaded into memory
+        corpus = None
+        if isinstance(documents, Path):
+            corpus = self.create_streaming_dataset(documents, cache_dir=cache_dir, workers=workers)
+            dataset = corpus.dataset()
+        else:
+            dataset = self.create_dataset(documents)
+        # Training needs no KV cache, and with one transformers ignores the
+        # packed-sequence boundaries in position_ids
+        self.model.config.use_cache = False
 
+        if self.training_config is not None:
+            arguments = self.training_config.to_training_arguments()
+        else:
+            arguments = {
+                "learning_rate": self.learning_rate,
+                "save_steps": save_steps,
+                "logging_steps": logging_steps,
+                "fp16": True,
+                "gradient_accumulation_steps": 4,
+                "warmup_steps": 100,
+                "weight_decay": 0.01,
+            }
+        # Length grouping needs random access, so it is in-memory only.
+        # transformers 5 replaced group_by_length with train_sampling_strategy.
+        group_by_length = corpus is None and not self.packing
+        if "group_by_length" in TrainingArguments.__dataclass_fields__:
+            arguments["group_by_length"] = group_by_length
+        else:
+            arguments["train_sampling_strategy"] = "group_by_length" if group_by_length else "random"
         training_args = TrainingArguments(
             output_dir=output_dir,
             per_device_train_batch_size=self.batch_size,
-            learning_rate=self.learning_rate,
             num_train_epochs=self.num_epochs,
-            save_steps=save_steps,
-            logging_steps=logging_steps,
             save_total_limit=2,
-            fp16=True,
-            gradient_accumulation_steps=4,
-            warmup_steps=100,
-            weight_decay=0.01,
+            length_column_name="length",
+            **arguments,
         )
+        if corpus is not None:
+            # An optimizer step never completes when one pass over an iterable
+            # dataset yields fewer batches than it accumulates
+            batches = math.ceil(
+                corpus.num_rows / (training_args.per_device_train_batch_size * training_args.world_size)
+            )
+            if training_args.gradient_accumulation_steps > batches:
+                logger.warning(
+                    "Only %d batches per epoch; accumulating %d instead of %d",
+                    batches,
+                    batches,
+                    training_args.gradient_accumulation_steps,
+                )
+                training_args.gradient_accumulation_steps = batches
+        if corpus is not None and training_args.max_steps <= 0:
+            # An iterable dataset has no length, so the epochs become steps
+            rows_per_step = (
+                training_args.per_device_train_batch_size
+                * training_args.gradient_accumulation_steps
+                * training_args.world_size
+            )
+            training_args.max_steps = math.ceil(corpus.num_rows / rows_per_step) * self.num_epochs
 
         trainer = Trainer(
             model=self.model,
             args=training_args,
             train_dataset=dataset,
-            tokenizer=self.tokenizer,
+            data_collator=self.data_collator(),
+            processing_class=self.tokenizer,
         )
 
         trainer.train()
+        # For a LoRA model this writes only the adapter weights and config,
+        # as do the intermediate checkpoints
         trainer.save_model(output_dir)
         self.tokenizer.save_pretrained(output_dir)
@@ -4,7 +4,7 @@ from typing import Any, Callable
 
 from prometheus_client import Counter, Gauge, Histogram
 
-from app.utils.logger import get_logger
+from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
@@ -36,6 +36,39 @@ class MetricsCollector:
             ["device"],
         )
 
+        self.time_to_first_token = Histogram(
+            "model_time_to_first_token_seconds",
+            "Time from the start of generation until the first token is streamed",
+            buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, float("inf")),
+        )
+
+        self.generation_throughput = Histogram(
+            "model_generation_tokens_per_second",
+            "Decode throughput of each generation request",
+            buckets=(1, 5, 10, 20, 50, 100, 200, float("inf")),
+        )
+        self.inference_queue_wait = Histogram(
+            "model_inference_queue_wait_seconds",
+            "Time generation requests wait before joining a running batch",
+            buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf")),
+        )
+        self.batch_occupancy = Histogram(
+            "model_batch_occupancy_ratio",
+            "Fraction of the maximum batch size in use at each decode step",
+            buckets=(0.1, 0.25, 0.5, 0.75, 0.9, 1.0),
+        )
+
+        # Model startup metrics
+        self.model_load_phase = Gauge(
+            "model_load_phase_seconds",
+            "Duration of each phase of the last generation model load",
+            ["phase"],
+        )
+        self.model_loaded = Gauge(
+            "model_loaded",
+            "Whether the generation model weights are loaded",
+        )
+
         # System metrics
         self.gpu_memory_usage = Gauge(
             "gpu_memory_usage_bytes",
@@ -48,6 +81,94 @@ class MetricsCollector:
             ["device"],
         )
 
+        # Executor metrics
+        self.executor_queue_depth = Gauge(
+            "executor_queue_depth",
+            "Number of tasks submitted to an executor pool and not yet started",
+            ["pool"],
+        )
+        self.executor_queue_wait = Histogram(
+            "executor_queue_wait_seconds",
+            "Time tasks spend waiting for a free worker in an executor pool",
+            ["pool"],
+            buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, float("inf")),
+        )
+
+        # Embedding metrics
+        self.embedding_batch_size = Histogram(
+            "embedding_batch_size",
+            "Number of texts encoded per embedding model call",
+            buckets=(1, 2, 4, 8, 16, 32, 64, 128, float("inf")),
+        )
+        self.embedding_cache_events = Counter(
+            "embedding_cache_events_total",
+            "Embedding cache hits, misses and evictions",
+            ["tier", "event"],
+        )
+        self.embedding_cache_entries = Gauge(
+            "embedding_cache_entries",
+            "Number of embeddings held by each cache tier",
+            ["tier"],
+        )
+
+        # Search result cache metrics
+        self.search_cache_events = Counter(
+            "search_cache_events_total",
+            "Search result cache hits, misses, coalesced requests, evictions and invalidations",
+            ["event"],
+        )
+        self.search_cache_entries = Gauge(
+            "search_cache_entries",
+            "Number of query results held by the search result cache",
+        )
+
+        # Speculative decoding metrics
+        self.speculative_draft_tokens = Counter(
+            "speculative_draft_tokens_total",
+            "Draft model tokens proposed to the target model, by verification result",
+            ["result"],
+        )
+        self.speculative_acceptance = Histogram(
+            "speculative_acceptance_ratio",
+            "Fraction of proposed draft tokens accepted per generation request",
+            buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+        )
+
+        # LoRA adapter metrics
+        self.adapter_switch_latency = Histogram(
+            "adapter_switch_seconds",
+            "Time to make a requested LoRA adapter available, by whether it was already loaded",
+            ["event"],
+            buckets=(0.0001, 0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf")),
+        )
+        self.adapter_evictions = Counter(
+            "adapter_evictions_total",
+            "LoRA adapters unloaded to stay within the adapter memory budget",
+        )
+        self.adapter_memory = Gauge(
+            "adapter_memory_bytes",
+            "Memory held by loaded LoRA adapter weights",
+        )
+        self.adapters_loaded = Gauge(
+            "adapters_loaded",
+            "Number of LoRA adapters attached to the base model",
+        )
+
+        # Prompt prefix KV cache metrics
+        self.prefix_cache_events = Counter(
+            "prefix_cache_events_total",
+            "Prompt prefix cache hits, misses, stores and evictions",
+            ["event"],
+        )
+        self.prefix_cache_saved_tokens = Counter(
+            "prefix_cache_saved_prefill_tokens_total",
+            "Prompt tokens whose keys and values were reused instead of recomputed",
+        )
+        self.prefix_cache_bytes = Gauge(
+            "prefix_cache_bytes",
+            "Device memory held by cached prompt prefixes",
+        )
+
     def track_request(self, endpoint: str) -> Callable:
         def decorator(func: Callable) -> Callable:
             @wraps(func)
@@ -71,9 +192,72 @@ class MetricsCollector:
     def track_tokens(self, operation: str, num_tokens: int):
         self.token_counter.labels(operation=operation).inc(num_tokens)
 
+    def observe_time_to_first_token(self, seconds: float):
+        self.time_to_first_token.observe(seconds)
+
+    def observe_generation_throughput(self, tokens_per_second: float):
+        self.generation_throughput.observe(tokens_per_second)
+
+    def observe_inference_queue_wait(self, seconds: float):
+        self.inference_queue_wait.observe(seconds)
+
+    def observe_batch_occupancy(self, ratio: float):
+        self.batch_occupancy.observe(ratio)
+
     def update_model_memory(self, device: str, bytes_used: int):
         self.model_memory.labels(device=device).set(bytes_used)
 
+    def update_executor_queue_depth(self, pool: str, depth: int):
+        self.executor_queue_depth.labels(pool=pool).set(depth)
+
+    def observe_executor_wait(self, pool: str, seconds: float):
+        self.executor_queue_wait.labels(pool=pool).observe(seconds)
+
+    def observe_embedding_batch(self, size: int):
+        self.embedding_batch_size.observe(size)
+
+    def track_embedding_cache(self, tier: str, event: str):
+        self.embedding_cache_events.labels(tier=tier, event=event).inc()
+
+    def update_embedding_cache_size(self, tier: str, entries: int):
+        self.embedding_cache_entries.labels(tier=tier).set(entries)
+
+    def track_search_cache(self, event: str):
+        self.search_cache_events.labels(event=event).inc()
+
+    def update_search_cache_size(self, entries: int):
+        self.search_cache_entries.set(entries)
+
+    def track_speculative_decoding(self, proposed: int, accepted: int):
+        self.speculative_draft_tokens.labels(result="accepted").inc(accepted)
+        self.speculative_draft_tokens.labels(result="rejected").inc(proposed - accepted)
+        if proposed:
+            self.speculative_acceptance.observe(accepted / proposed)
+
+    def observe_adapter_switch(self, event: str, seconds: float):
+        self.adapter_switch_latency.labels(event=event).observe(seconds)
+
+    def track_adapter_eviction(self):
+        self.adapter_evictions.inc()
+
+    def update_adapter_memory(self, num_bytes: int, adapters: int):
+        self.adapter_memory.set(num_bytes)
+        self.adapters_loaded.set(adapters)
+
+    def track_prefix_cache(self, event: str, saved_tokens: int = 0):
+        self.prefix_cache_events.labels(event=event).inc()
+        if saved_tokens:
+            self.prefix_cache_saved_tokens.inc(saved_tokens)
+
+    def update_prefix_cache_size(self, num_bytes: int):
+        self.prefix_cache_bytes.set(num_bytes)
+
+    def observe_model_load_phase(self, phase: str, seconds: float):
+        self.model_load_phase.labels(phase=phase).set(seconds)
+
+    def update_model_loaded(self, loaded: bool):
+        self.model_loaded.set(int(loaded))
+
     def update_gpu_metrics(self, device: str, memory_used: int, utilization: float):
         self.gpu_memory_usage.labels(device=device).set(memory_used)
         self.gpu_utilization.labels(device=device).set(utilization)
@@ -0,0 +1,85 @@
+import hashlib
+import re
+
+import numpy as np
+import pytest
+
+from src.config import settings
+from src.data.vectors import service as vector_service
+
+
+class FakeSentenceTransformer:
+    # Bag-of-words hashing stand-in for the embedding model; counts loads
+    loads = 0
+    dimension = 32
+    max_seq_length = 256
+
+    def __init__(self, model_name: str, *args, **kwargs):
+        type(self).loads += 1
+        self.model_name = model_name
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, texts, batch_size: int = 32, **kwargs) -> np.ndarray:
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                bucket = int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % self.dimension
+                embeddings[row, bucket] += 1.0
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-6)
+
+
+@pytest.fixture
+def embedding_model(monkeypatch):
+    FakeSentenceTransformer.loads = 0
+    monkeypatch.setattr(vector_service, "SentenceTransformer", FakeSentenceTransformer)
+    return FakeSentenceTransformer
+
+
+@pytest.fixture
+def local_backend(monkeypatch, tmp_path, embedding_model):
+    # Embedded store under a temporary directory, character chunking and no
+    # generation model, so services start without Milvus or torch
+    monkeypatch.setenv("MILVUS_BACKEND", "local")
+    monkeypatch.setenv("MILVUS_DB_PATH", str(tmp_path / "vector_store"))
+    monkeypatch.setenv("MILVUS_METRIC_TYPE", "COSINE")
+    monkeypatch.setattr(settings.processing, "chunk_by_tokens", False)
+    monkeypatch.setattr(settings.model, "enable_generation", False)
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def tiny_llama(tmp_path_factory):
+    # A randomly initialised two-layer Llama with a word-level vocabulary
+    # ("w0" ... "w199"), small enough to generate with on CPU
+    torch = pytest.importorskip("torch")
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers
+    from transformers import LlamaConfig, LlamaForCausalLM, PreTrainedTokenizerFast
+
+    path = tmp_path_factory.mktemp("tiny") / "model"
+    vocab = {"<pad>": 0, "<eos>": 1, "<unk>": 2, **{f"w{i}": i + 3 for i in range(200)}}
+    backend = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    backend.pre_tokenizer = pre_tokenizers.WhitespaceSplit()
+    backend.decoder = decoders.WordPiece()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=backend, eos_token="<eos>", pad_token="<pad>", unk_token="<unk>"
+    )
+
+    torch.manual_seed(0)
+    config = LlamaConfig(
+        vocab_size=len(vocab),
+        hidden_size=64,
+        intermediate_size=128,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        num_key_value_heads=2,
+        max_position_embeddings=256,
+        pad_token_id=0,
+        eos_token_id=1,
+        bos_token_id=1,
+    )
+    LlamaForCausalLM(config).save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path
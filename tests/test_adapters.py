@@ -0,0 +1,49 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("peft")
+
+from peft import LoraConfig, get_peft_model  # noqa: E402
+from transformers import LlamaForCausalLM  # noqa: E402
+
+from src.models.inference.base_model import BaseModel  # noqa: E402
+from src.models.model_config import InferenceConfig, ModelConfig  # noqa: E402
+
+GREEDY = {"do_sample": False, "repetition_penalty": 1.0}
+PROMPT = " ".join(f"w{i % 50}" for i in range(24))
+
+
+@pytest.fixture(scope="module")
+def adapter_dir(tiny_llama, tmp_path_factory):
+    # One LoRA adapter with non-zero weights
+    root = tmp_path_factory.mktemp("adapters")
+    torch.manual_seed(0)
+    adapter = get_peft_model(
+        LlamaForCausalLM.from_pretrained(tiny_llama),
+        LoraConfig(r=4, lora_alpha=64, target_modules="all-linear", init_lora_weights=False),
+    )
+    adapter.save_pretrained(root / "a")
+    return root
+
+
+def test_base_requests_bypass_attached_adapters(tiny_llama, adapter_dir):
+    model = BaseModel(
+        ModelConfig(
+            model_name=str(tiny_llama),
+            revision="main",
+            quantization_bits=0,
+            device="cpu",
+            torch_dtype=torch.float32,
+            prefix_cache_bytes=0,
+            adapter_dir=str(adapter_dir),
+        ),
+        InferenceConfig(),
+    )
+    base = model.generate(PROMPT, max_new_tokens=8, **GREEDY)
+    adapted = model.generate(PROMPT, max_new_tokens=8, adapter="a", **GREEDY)
+    assert adapted != base
+    assert model.adapters.loaded == ["a"]
+
+    assert model.generate(PROMPT, max_new_tokens=8, **GREEDY) == base
+    assert base[0].endswith("".join(model.generate_stream(PROMPT, max_new_tokens=8, **GREEDY)))
+    assert adapted[0].endswith("".join(model.generate_stream(PROMPT, max_new_tokens=8, adapter="a", **GREEDY)))
@@ -0,0 +1,103 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.config import settings
+from src.data.services.answer_service import AnswerService, PreparedAnswer
+from src.data.services.container import ServiceContainer
+from src.main import app
+
+SOURCES = [{"document_id": "doc-1", "chunk_index": 0, "relevance": 0.9}]
+
+
+class FakeHandle:
+    def __init__(self, pieces, error=None):
+        self.pieces = pieces
+        self.error = error
+        self.cancelled = False
+        self.generated_tokens = len(pieces)
+        self.time_to_first_token = 0.01
+
+    def cancel(self):
+        self.cancelled = True
+
+    async def __aiter__(self):
+        for piece in self.pieces:
+            yield piece
+        if self.error is not None:
+            raise self.error
+
+
+class StubAnswerService:
+    # Canned retrieval and generation behind the real event stream
+    stream = AnswerService.stream
+
+    def __init__(self, loaded=True, error=None):
+        self.model = SimpleNamespace(loaded=loaded)
+        self.scheduler = SimpleNamespace(close=lambda: None)
+        self.error = error
+        self.handles = []
+
+    async def prepare(self, question, **kwargs):
+        return PreparedAnswer(prompt=question, sources=SOURCES, max_new_tokens=kwargs["max_new_tokens"] or 8)
+
+    async def start(self, prepared, **generate_kwargs):
+        self.handles.append(FakeHandle(["Chest pain", " is noted."], self.error))
+        return self.handles[-1]
+
+
+@pytest.fixture
+def answer_client(local_backend, monkeypatch):
+    def serve(service):
+        monkeypatch.setattr(ServiceContainer, "_build_answer_service", lambda self: service)
+        return TestClient(app)
+
+    monkeypatch.setattr(settings.model, "lazy_load", False)
+    return serve
+
+
+def _events(response) -> list:
+    events = []
+    for frame in response.text.split("\n\n"):
+        if frame:
+            event, data = frame.split("\n")
+            assert event.startswith("event: ") and data.startswith("data: ")
+            events.append((event[len("event: ") :], json.loads(data[len("data: ") :])))
+    return events
+
+
+def test_answer_streams_citations_tokens_and_done(answer_client):
+    service = StubAnswerService()
+    with answer_client(service) as client:
+        response = client.post("/api/v1/answer", json={"question": "chest pain", "max_new_tokens": 4})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.endswith("\n\n")
+    events = _events(response)
+    assert events[0] == ("context", {"sources": SOURCES})
+    assert events[1:3] == [("token", {"text": "Chest pain"}), ("token", {"text": " is noted."})]
+    assert events[3][0] == "done"
+    assert events[3][1]["generated_tokens"] == 2
+    assert len(events) == 4
+    assert service.handles[0].cancelled
+
+
+def test_generation_failure_is_reported_in_band(answer_client):
+    with answer_client(StubAnswerService(error=RuntimeError("CUDA out of memory"))) as client:
+        response = client.post("/api/v1/answer", json={"question": "chest pain"})
+
+    assert response.status_code == 200
+    events = _events(response)
+    assert [event for event, _ in events] == ["context", "token", "token", "error"]
+    assert events[-1][1] == {"detail": "Generation failed"}
+
+
+def test_answer_is_unavailable_while_the_model_loads(answer_client):
+    with answer_client(StubAnswerService(loaded=False)) as client:
+        response = client.post("/api/v1/answer", json={"question": "chest pain"})
+
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Answer model is still loading"
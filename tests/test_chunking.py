@@ -0,0 +1,57 @@
+import pytest
+
+from src.data.processors.chunking import TextChunker
+
+
+class WhitespaceTokenizer:
+    # Fast-tokenizer shaped stand-in: one token per word, with offsets
+    def __call__(self, texts, add_special_tokens=False, return_offsets_mapping=True):
+        offsets = []
+        for text in texts:
+            spans, start = [], None
+            for index, char in enumerate(text + " "):
+                if char.isspace() and start is not None:
+                    spans.append((start, index))
+                    start = None
+                elif not char.isspace() and start is None:
+                    start = index
+            offsets.append(spans)
+        return {"offset_mapping": offsets}
+
+
+def _assert_progress(chunker, text):
+    spans = list(chunker.iter_spans(text))
+    ends = [end for _, end in spans]
+    assert ends == sorted(set(ends)), "every chunk must end past the previous one"
+    covered = set()
+    for start, end in spans:
+        covered.update(range(start, end))
+    assert all(index in covered for index, char in enumerate(text) if not char.isspace())
+    return [text[start:end] for start, end in spans]
+
+
+def test_short_sentence_before_long_unbroken_run():
+    chunks = _assert_progress(TextChunker(1000, 100), "Patient seen today. " + "x" * 3000)
+    assert chunks[0] == "Patient seen today."
+    assert chunks[1:] == ["x" * 1000] * 3 + ["x" * 300]
+
+
+def test_sentence_breaks_inside_the_overlap_are_not_reused():
+    text = " ".join(f"Sentence number {i} is here." for i in range(40)) + " " + "y" * 3000
+    chunks = _assert_progress(TextChunker(1000, 100), text)
+    assert len(chunks) < 10
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+
+
+def test_token_chunks_overlap_and_respect_the_limit():
+    text = " ".join(f"word{i}." if i % 7 == 6 else f"word{i}" for i in range(500))
+    chunker = TextChunker(50, 10, WhitespaceTokenizer())
+    chunks = _assert_progress(chunker, text)
+    assert all(len(chunk.split()) <= 50 for chunk in chunks)
+    first, second = chunks[0].split(), chunks[1].split()
+    assert second[0] in first
+
+
+def test_overlap_must_be_smaller_than_chunk():
+    with pytest.raises(ValueError):
+        TextChunker(100, 100)
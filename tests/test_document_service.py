@@ -0,0 +1,149 @@
+import asyncio
+
+import pytest
+
+from src.data.services.container import ServiceContainer
+from src.data.vectors.store import REFERENCES_KEY
+
+TEXT = "Patient presents with chest pain radiating to the left arm after exertion."
+
+
+def _metadata(patient_id: str = "P1", creation_date: str = "2024-03-01T10:00:00") -> dict:
+    return {
+        "document_type": "note",
+        "creation_date": creation_date,
+        "author": "Dr. House",
+        "department": "cardiology",
+        "patient_id": patient_id,
+    }
+
+
+@pytest.fixture
+def services(local_backend):
+    container = ServiceContainer()
+    container.start()
+    yield container
+    container.close()
+
+
+def _document_ids(hits) -> set:
+    return {hit["document_id"] for hit in hits}
+
+
+def test_dedup_collapses_boilerplate_across_patients(services):
+    documents = services.document_service
+
+    async def scenario():
+        first = (await documents.ingest_document(TEXT, _metadata("P1")))["document_id"]
+        second = await documents.ingest_document(TEXT, _metadata("P2", "2024-05-02T09:00:00"))
+        assert second["stats"]["duplicate_chunks"] == 1
+        assert await services.vector_db.get_document_count() == 1
+
+        # The shared chunk is still found, and reported, for each patient
+        for patient_id, document_id in (("P1", first), ("P2", second["document_id"])):
+            hits = await documents.retrieve_similar_documents("chest pain", filters={"patient_id": patient_id})
+            assert _document_ids(hits) == {document_id}
+            assert hits[0]["metadata"]["patient_id"] == patient_id
+        hits = await documents.retrieve_similar_documents(
+            "chest pain", filters={"creation_date": {"gte": "2024-05-01T00:00:00"}}
+        )
+        assert _document_ids(hits) == {second["document_id"]}
+
+    asyncio.run(scenario())
+
+
+def test_near_duplicates_keep_their_own_text(services):
+    documents = services.document_service
+
+    async def scenario():
+        gain = "Weight change since the last visit: +2 kg, diet and exercise plan unchanged."
+        loss = "Weight change since the last visit: -2 kg, diet and exercise plan unchanged."
+        await documents.ingest_document(gain, _metadata())
+        result = await documents.ingest_document(loss, _metadata())
+        assert result["stats"]["duplicate_chunks"] == 0
+
+        hits = await documents.retrieve_similar_documents("weight change")
+        assert {hit["document_id"]: hit["content"] for hit in hits}[result["document_id"]] == loss
+
+    asyncio.run(scenario())
+
+
+def test_deleted_reference_is_not_handed_the_chunk(services):
+    documents = services.document_service
+
+    async def scenario():
+        owner = (await documents.ingest_document(TEXT, _metadata()))["document_id"]
+        duplicate = await documents.ingest_document(TEXT, _metadata("P2"))
+        assert duplicate["stats"]["duplicate_chunks"] == 1
+
+        await documents.delete_document([duplicate["document_id"]])
+        chunks = await services.vector_db.get_document_chunks([owner])
+        assert all(not chunk["metadata"].get(REFERENCES_KEY) for chunk in chunks)
+        assert await documents.retrieve_similar_documents("chest pain", filters={"patient_id": "P2"}) == []
+
+        await documents.delete_document([owner])
+        assert await documents.retrieve_similar_documents("chest pain") == []
+        assert await services.vector_db.get_document_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_shared_chunk_is_handed_to_the_next_reference(services):
+    documents = services.document_service
+
+    async def scenario():
+        owner = (await documents.ingest_document(TEXT, _metadata("P1")))["document_id"]
+        duplicate = (await documents.ingest_document(TEXT, _metadata("P2")))["document_id"]
+
+        await documents.delete_document([owner])
+        assert await documents.retrieve_similar_documents("chest pain", filters={"patient_id": "P1"}) == []
+        hits = await documents.retrieve_similar_documents("chest pain", filters={"patient_id": "P2"})
+        assert _document_ids(hits) == {duplicate}
+        assert hits[0]["metadata"]["patient_id"] == "P2"
+
+    asyncio.run(scenario())
+
+
+def test_update_finds_a_fully_deduplicated_document(services):
+    documents = services.document_service
+
+    async def scenario():
+        owner = (await documents.ingest_document(TEXT, _metadata()))["document_id"]
+        duplicate = (await documents.ingest_document(TEXT, _metadata()))["document_id"]
+
+        # Still the same text in the same scope, so it stays deduplicated
+        result = await documents.update_document(duplicate, metadata=_metadata("P2"))
+        assert result == {"document_id": duplicate, "embedded": 0, "reused": 1, "deleted": 0}
+        for patient_id, document_id in (("P1", owner), ("P2", duplicate)):
+            hits = await documents.retrieve_similar_documents("chest pain", filters={"patient_id": patient_id})
+            assert _document_ids(hits) == {document_id}
+
+        result = await documents.update_document(duplicate, text="Follow-up visit, chest pain resolved on medication.")
+        assert result["embedded"] == 1
+        chunks = await services.vector_db.get_document_chunks([owner])
+        assert all(duplicate not in chunk["metadata"].get(REFERENCES_KEY, []) for chunk in chunks)
+        hits = await documents.retrieve_similar_documents("resolved medication", filters={"patient_id": "P2"})
+        assert _document_ids(hits) == {duplicate}
+        assert hits[0]["metadata"]["patient_id"] == "P2"
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("metric_type", ["COSINE", "IP", "L2"])
+def test_relevance_ranks_the_best_match_first(local_backend, monkeypatch, metric_type):
+    monkeypatch.setenv("MILVUS_METRIC_TYPE", metric_type)
+    container = ServiceContainer()
+    container.start()
+    documents = container.document_service
+
+    async def scenario():
+        match = (await documents.ingest_document(TEXT, _metadata()))["document_id"]
+        await documents.ingest_document("Routine dermatology follow-up for eczema on both hands.", _metadata())
+        return match, await documents.retrieve_similar_documents("chest pain radiating to the arm")
+
+    try:
+        match, hits = asyncio.run(scenario())
+    finally:
+        container.close()
+    assert hits[0]["document_id"] == match
+    assert hits[0]["relevance"] > hits[1]["relevance"]
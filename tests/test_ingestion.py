@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from src.data.services.ingestion import BulkIngestionPipeline, iter_records
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.local_store import LocalVectorStore
+from src.data.vectors.service import VectorDBService
+
+
+def _records(count: int, fail_after: int):
+    for index in range(count):
+        if index == fail_after:
+            raise RuntimeError("Ingestion interrupted")
+        yield {
+            "text": f"Follow-up visit number {index} for hypertension.",
+            "metadata": {"document_type": "note", "creation_date": "2024-01-01", "author": "Dr. Grey"},
+        }
+
+
+def test_checkpoint_never_ahead_of_stored_rows(local_backend):
+    config = VectorDBConfig()
+    service = VectorDBService(config)
+    checkpoint = local_backend / "checkpoint.json"
+    pipeline = BulkIngestionPipeline(
+        service,
+        workers=1,
+        insert_batch_size=1,
+        prepare_chunksize=1,
+        checkpoint_path=checkpoint,
+    )
+    with pytest.raises(RuntimeError):
+        pipeline.run(_records(20, fail_after=10), source="notes")
+
+    # Reopen without closing, as after a crash; each record is one chunk
+    checkpointed = json.loads(checkpoint.read_text())["records"]
+    assert checkpointed > 0
+    assert LocalVectorStore(config, service.store.dimension).count() >= checkpointed
+
+
+def test_records_without_metadata_get_the_defaults(tmp_path):
+    path = tmp_path / "records.jsonl"
+    lines = [
+        {"text": "No metadata key."},
+        {"text": "Null metadata.", "metadata": None},
+        {"text": "Own author.", "metadata": {"author": "Dr. Grey"}},
+    ]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+
+    defaults = {"document_type": "note", "author": "import"}
+    records = list(iter_records(path, default_metadata=defaults))
+    assert [record["metadata"] for record in records] == [
+        defaults,
+        defaults,
+        {"document_type": "note", "author": "Dr. Grey"},
+    ]
@@ -0,0 +1,58 @@
+from src.data.vectors.config import VectorDBConfig
+from src.data.vectors.indexing import build_index_spec
+from src.data.vectors.milvus_store import MilvusVectorStore
+
+
+class FakeCollection:
+    def __init__(self, num_entities: int):
+        self.num_entities = num_entities
+        self.indexes = []
+        self.calls = []
+
+    def flush(self):
+        self.calls.append("flush")
+
+    def release(self):
+        self.calls.append("release")
+
+    def load(self):
+        self.calls.append("load")
+
+    def drop_index(self, index_name: str):
+        self.calls.append("drop_index")
+
+    def create_index(self, field_name: str, index_params, index_name: str):
+        self.calls.append("create_index")
+
+
+def _store(collection: FakeCollection, config: VectorDBConfig) -> MilvusVectorStore:
+    # Skips connecting; the store only talks to its collection
+    store = MilvusVectorStore.__new__(MilvusVectorStore)
+    store.config = config
+    store.collection = collection
+    store.index = build_index_spec("FLAT", 0, config)
+    store.router = None
+    return store
+
+
+def test_flush_never_rebuilds_the_index():
+    config = VectorDBConfig(flat_index_max_entities=10)
+    collection = FakeCollection(num_entities=1000)
+    store = _store(collection, config)
+
+    store.flush()
+
+    assert collection.calls == ["flush"]
+    assert store.index_outdated()
+
+
+def test_load_migrates_an_outdated_index():
+    config = VectorDBConfig(flat_index_max_entities=10)
+    collection = FakeCollection(num_entities=1000)
+    store = _store(collection, config)
+
+    store.load()
+
+    assert collection.calls == ["release", "create_index", "load"]
+    assert store.index.index_type == "HNSW"
+    assert not store.index_outdated()
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.models.inference.base_model import BaseModel  # noqa: E402
+from src.models.inference.prefix_cache import PrefixCache  # noqa: E402
+from src.models.inference.scheduler import InferenceScheduler  # noqa: E402
+from src.models.model_config import InferenceConfig, ModelConfig  # noqa: E402
+
+GREEDY = {"do_sample": False, "repetition_penalty": 1.0}
+# Two block-aligned prefix blocks shared by every prompt, then a distinct question
+SHARED = " ".join(f"w{(5 * i) % 97}" for i in range(32))
+PROMPTS = [f"{SHARED} w{150 + i} w{160 + i} w{170 + i}" for i in range(3)]
+
+
+def _model(path, prefix_cache_bytes: int) -> BaseModel:
+    return BaseModel(
+        ModelConfig(
+            model_name=str(path),
+            revision="main",
+            quantization_bits=0,
+            device="cpu",
+            torch_dtype=torch.float32,
+            prefix_cache_bytes=prefix_cache_bytes,
+        ),
+        InferenceConfig(),
+    )
+
+
+def _kv(fill: float) -> list:
+    # One layer of (1, heads, 16 tokens, head_dim) keys and values: 1 KiB
+    return [(torch.full((1, 2, 16, 4), fill), torch.full((1, 2, 16, 4), fill))]
+
+
+def test_disabled_without_a_byte_budget(tiny_llama):
+    assert _model(tiny_llama, 0).prefix_cache is None
+    assert _model(tiny_llama, 1 << 20).prefix_cache.max_bytes == 1 << 20
+
+
+def test_cache_hits_match_cold_generation(tiny_llama):
+    cold = _model(tiny_llama, 0)
+    expected = [cold.generate(prompt, max_new_tokens=8, **GREEDY)[0] for prompt in PROMPTS]
+
+    model = _model(tiny_llama, 1 << 20)
+    # The shared prefix is stored once it has been seen twice
+    assert [model.generate(prompt, max_new_tokens=8, **GREEDY)[0] for prompt in PROMPTS[:2]] == expected[:2]
+    assert len(model.prefix_cache) == 1
+    assert model.prefix_cache.lookup(model.tokenizer(PROMPTS[2])["input_ids"])[0] == 32
+    assert model.generate(PROMPTS[2], max_new_tokens=8, **GREEDY)[0] == expected[2]
+
+    async def scheduled():
+        # One prefill batch mixing a cached prefix with an uncached prompt
+        scheduler = InferenceScheduler(model, max_batch_size=4)
+        try:
+            handles = [
+                await scheduler.submit(prompt, max_new_tokens=8, **GREEDY) for prompt in (PROMPTS[1], "w1 w2 w3")
+            ]
+            for handle in handles:
+                async for _ in handle:
+                    pass
+        finally:
+            scheduler.close()
+        return [
+            model.tokenizer.decode(handle.prompt_ids + handle.token_ids, skip_special_tokens=True) for handle in handles
+        ]
+
+    cached, uncached = asyncio.run(scheduled())
+    assert cached == expected[1]
+    assert uncached == cold.generate("w1 w2 w3", max_new_tokens=8, **GREEDY)[0]
+
+
+def test_least_recently_used_prefix_is_evicted():
+    cache = PrefixCache(max_bytes=2048, block_size=16)
+    prompts = [[token] * 17 for token in (3, 4, 5)]
+
+    cache.store(prompts[0][:16], _kv(0.0))
+    cache.store(prompts[1][:16], _kv(1.0))
+    assert cache.bytes == 2048
+    # Touching the first prefix makes the second the least recently used
+    assert cache.lookup(prompts[0])[0] == 16
+    cache.store(prompts[2][:16], _kv(2.0))
+
+    assert cache.bytes <= cache.max_bytes
+    assert len(cache) == 2
+    assert cache.lookup(prompts[1]) == (0, None)
+    assert cache.lookup(prompts[0])[1][0][0][0, 0, 0, 0] == 0.0
+    assert cache.lookup(prompts[2])[1][0][0][0, 0, 0, 0] == 2.0
+
+    # A prefix larger than the whole budget is never stored
+    cache.store(prompts[1][:16], _kv(3.0) * 3)
+    assert cache.lookup(prompts[1]) == (0, None)
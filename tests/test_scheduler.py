@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from src.models.inference.base_model import BaseModel  # noqa: E402
+from src.models.inference.scheduler import InferenceScheduler  # noqa: E402
+from src.models.model_config import InferenceConfig, ModelConfig  # noqa: E402
+
+GREEDY = {"do_sample": False, "repetition_penalty": 1.0}
+# Different lengths, so batched prompts are left-padded
+PROMPTS = [
+    " ".join(f"w{i % 50}" for i in range(24)),
+    " ".join(f"w{(7 * i) % 90}" for i in range(9)),
+    " ".join(f"w{(3 * i + 11) % 120}" for i in range(16)),
+]
+
+
+@pytest.fixture(scope="module")
+def model(tiny_llama):
+    model = BaseModel(
+        ModelConfig(
+            model_name=str(tiny_llama),
+            revision="main",
+            quantization_bits=0,
+            device="cpu",
+            torch_dtype=torch.float32,
+            prefix_cache_bytes=0,
+        ),
+        InferenceConfig(),
+    )
+    model.load()
+    return model
+
+
+def _completion(model: BaseModel, prompt: str, max_new_tokens: int) -> list:
+    # Token ids BaseModel.generate adds to the prompt
+    text = model.generate(prompt, max_new_tokens=max_new_tokens, **GREEDY)[0]
+    prompt_ids = model.tokenizer(prompt)["input_ids"]
+    ids = model.tokenizer(text)["input_ids"]
+    assert ids[: len(prompt_ids)] == prompt_ids
+    return ids[len(prompt_ids) :]
+
+
+async def _collect(handle) -> str:
+    return "".join([text async for text in handle])
+
+
+def test_staggered_requests_match_generate(model):
+    expected = [_completion(model, prompt, 12) for prompt in PROMPTS]
+
+    async def scenario():
+        scheduler = InferenceScheduler(model, max_batch_size=4)
+        try:
+            # Hold the forward pass so the first request is mid-batch when
+            # the others arrive and get merged into the running batch
+            with model.forward_lock:
+                first = await scheduler.submit(PROMPTS[0], max_new_tokens=12, **GREEDY)
+                while not first.prompt_ids:
+                    await asyncio.sleep(0.001)
+                rest = [await scheduler.submit(prompt, max_new_tokens=12, **GREEDY) for prompt in PROMPTS[1:]]
+            handles = [first, *rest]
+            texts = await asyncio.gather(*(_collect(handle) for handle in handles))
+        finally:
+            scheduler.close()
+
+        assert first.admitted_at < min(handle.admitted_at for handle in rest)
+        for handle, text, ids in zip(handles, texts, expected):
+            assert handle.token_ids == ids
+            assert text == model.tokenizer.decode(ids, skip_special_tokens=True)
+
+    asyncio.run(scenario())
+
+
+def test_sequences_stop_independently(model):
+    stopping = _completion(model, PROMPTS[2], 16)
+    other = _completion(model, PROMPTS[0], 16)
+    # Treat a token only the first request generates as end-of-sequence
+    stop = next(token for token in stopping[1:] if token not in other and token not in stopping[:1])
+    stop_at = stopping.index(stop) + 1
+
+    async def scenario():
+        scheduler = InferenceScheduler(model, max_batch_size=4)
+        scheduler.eos_token_id = stop
+        try:
+            handles = [
+                await scheduler.submit(PROMPTS[2], max_new_tokens=16, **GREEDY),
+                await scheduler.submit(PROMPTS[0], max_new_tokens=5, **GREEDY),
+                await scheduler.submit(PROMPTS[0], max_new_tokens=16, **GREEDY),
+            ]
+            await asyncio.gather(*(_collect(handle) for handle in handles))
+        finally:
+            scheduler.close()
+        return [handle.token_ids for handle in handles]
+
+    stopped, truncated, full = asyncio.run(scenario())
+    assert stopped == stopping[:stop_at]
+    assert truncated == other[:5]
+    assert full == other
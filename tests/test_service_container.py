@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from src.config import settings
+from src.data.services.container import ServiceContainer
+from src.main import app
+
+DOCUMENT = {
+    "text": "Patient presents with chest pain radiating to the left arm.",
+    "metadata": {
+        "document_type": "note",
+        "creation_date": "2024-03-01T10:00:00",
+        "author": "Dr. House",
+        "department": "cardiology",
+    },
+}
+
+
+def test_requests_share_one_embedding_model(local_backend, embedding_model):
+    with TestClient(app) as client:
+        for _ in range(5):
+            assert client.post("/api/v1/documents/", json=DOCUMENT).status_code == 200
+            response = client.request("GET", "/api/v1/documents/search", json={"query": "chest pain"})
+            assert response.status_code == 200
+            assert response.json()
+            assert client.get("/api/v1/documents/stats").status_code == 200
+
+    assert embedding_model.loads == 1
+
+
+def test_shutdown_releases_services(local_backend):
+    with TestClient(app) as client:
+        services = client.app.state.services
+        assert services.ready
+    assert not services.ready
+    assert services.vector_db is None
+
+
+def test_documents_are_ready_while_the_model_loads(local_backend, monkeypatch):
+    # An answer service whose weights never finish loading
+    loading = SimpleNamespace(model=SimpleNamespace(loaded=False), scheduler=SimpleNamespace(close=lambda: None))
+    monkeypatch.setattr(ServiceContainer, "_build_answer_service", lambda self: loading)
+    monkeypatch.setattr(settings.model, "lazy_load", False)
+
+    with TestClient(app) as client:
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json() == {"ready": True, "model_ready": False}
+        assert client.post("/api/v1/documents/", json=DOCUMENT).status_code == 200
+
+        response = client.post("/api/v1/answer", json={"question": "chest pain"})
+        assert response.status_code == 503
+        assert response.json()["detail"] == "Answer model is still loading"
+
+
+def test_served_model_skips_the_draft(local_backend, monkeypatch, tiny_llama):
+    monkeypatch.setattr(settings.model, "enable_generation", True)
+    monkeypatch.setattr(settings.model, "base_model_name", str(tiny_llama))
+    monkeypatch.setattr(settings.model, "draft_model_name", str(tiny_llama))
+    monkeypatch.setattr(settings.model, "device", "cpu")
+    monkeypatch.setattr(settings.model, "quantization_bits", 0)
+    monkeypatch.setattr(settings.model, "model_artifact_dir", None)
+    monkeypatch.setattr(settings.model, "lazy_load", True)
+
+    container = ServiceContainer()
+    container.start()
+    try:
+        model = container.answer_service.model
+        model.load()
+        assert model.model_config.draft_model_name is None
+        assert model.draft_model is None
+    finally:
+        container.close()
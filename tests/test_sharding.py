@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from pymilvus.exceptions import MilvusException
+
+from src.data.vectors.sharding import PartitionRouter
+
+
+class FakePartitionedCollection:
+    # Partition list shared by every router built on it, as the real
+    # collection is shared by every worker
+    def __init__(self):
+        self.partition_map = {"_default": SimpleNamespace(name="_default", description="", num_entities=0)}
+
+    @property
+    def partitions(self):
+        return list(self.partition_map.values())
+
+    def has_partition(self, name: str) -> bool:
+        return name in self.partition_map
+
+    def create_partition(self, name: str, description: str = ""):
+        if name in self.partition_map:
+            raise MilvusException(message=f"partition {name} already exists")
+        self.partition_map[name] = SimpleNamespace(name=name, description=description, num_entities=0)
+
+    def insert(self, rows, partition_name: str):
+        self.partition_map[partition_name].num_entities += len(rows)
+        return SimpleNamespace(primary_keys=list(range(len(rows))))
+
+
+def _rows(department: str, count: int):
+    return [{"metadata": {"department": department}} for _ in range(count)]
+
+
+def test_search_sees_partitions_created_by_another_worker():
+    collection = FakePartitionedCollection()
+    reader = PartitionRouter(collection, "department", 10, refresh_seconds=3600)
+    writer = PartitionRouter(collection, "department", 10, refresh_seconds=3600)
+
+    writer.insert(_rows("cardiology", 3))
+
+    assert reader.partitions_for({"department": "cardiology"}) == [writer._shards["cardiology"][0][0]]
+
+
+def test_unknown_key_searches_the_whole_collection():
+    router = PartitionRouter(FakePartitionedCollection(), "department", 10)
+
+    assert router.partitions_for({"department": "oncology"}) is None
+
+
+def test_losing_a_partition_create_race_is_not_an_error():
+    collection = FakePartitionedCollection()
+    router = PartitionRouter(collection, "department", 10)
+    create_partition = collection.create_partition
+
+    def create_after_another_worker(name: str, description: str = ""):
+        # Another worker creates the partition between our refresh and create
+        create_partition(name, description)
+        create_partition(name, description)
+
+    collection.create_partition = create_after_another_worker
+    router.insert(_rows("cardiology", 2))
+
+    assert [partition.num_entities for partition in collection.partitions] == [0, 2]
@@ -0,0 +1,24 @@
+from pathlib import Path
+
+from src.models.training.data import StreamingCorpus
+
+SAMPLE_DIR = Path(__file__).parent.parent / "scripts" / "data" / "documents"
+
+
+class CharTokenizer:
+    # Picklable stand-in for the tokenizer handed to the worker processes
+    eos_token_id = 0
+    name_or_path = "char"
+
+    def __call__(self, text: str, truncation: bool = False, max_length=None):
+        input_ids = [ord(char) % 1000 + 1 for char in text]
+        return {"input_ids": input_ids[:max_length] if truncation else input_ids}
+
+
+def test_corpus_reads_the_sample_documents(tmp_path):
+    corpus = StreamingCorpus(SAMPLE_DIR, CharTokenizer(), max_length=64, cache_dir=tmp_path, workers=1)
+
+    manifest = corpus.build()
+
+    assert manifest["documents"] == len(list(SAMPLE_DIR.glob("*.txt"))) > 0
+    assert manifest["rows"] > 0